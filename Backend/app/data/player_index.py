@@ -0,0 +1,271 @@
+import json
+import base64
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from app.data.player_records import flatten_player
+
+logger = logging.getLogger(__name__)
+
+NUMERIC_FIELDS = ('age', 'market_value', 'career_minutes', 'career_games', 'career_goals', 'career_assists')
+CATEGORICAL_FIELDS = ('career_phase', 'position', 'club', 'nationality')
+SORT_FIELDS = NUMERIC_FIELDS + ('name',)
+
+# Pending rows are merged into the sorted indexes past this share of the corpus
+MERGE_RATIO = 0.05
+MAX_LIMIT = 1000
+
+
+def encode_cursor(key: float, row: int) -> str:
+    return base64.urlsafe_b64encode(json.dumps([key, row]).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    key, row = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+    return float(key), int(row)
+
+
+class PlayerIndex:
+    """Secondary indexes for filtered queries over the stored player corpus.
+
+    Numeric fields keep a row order sorted by value, so a range becomes two
+    ``searchsorted`` calls. Categorical fields keep a sorted row list per
+    value. A query starts from the smallest candidate set any filter
+    produces, then checks the remaining filters against the columns for
+    those rows only. Rows inserted or changed since the last merge sit in a
+    small pending set that every query also checks. Stale index entries are
+    dropped by the same column check, so updates never have to rewrite an
+    index in place.
+    """
+
+    def __init__(self, source=None, capacity: int = 1024):
+        self.source = source  # PlayerStore (or anything with items()/get()) the rows come from
+        self.version = 0
+        self._lock = threading.Lock()
+        self._built = False
+        self._reset(capacity)
+
+    def _reset(self, capacity: int):
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.names: List[str] = []
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.numeric = {field: np.zeros(capacity, dtype=np.float64) for field in NUMERIC_FIELDS}
+        self.codes = {field: np.zeros(capacity, dtype=np.int32) for field in CATEGORICAL_FIELDS}
+        self.vocab: Dict[str, Dict[str, int]] = {field: {} for field in CATEGORICAL_FIELDS}
+        self.labels: Dict[str, List[str]] = {field: [] for field in CATEGORICAL_FIELDS}
+        self.sorted_rows: Dict[str, np.ndarray] = {}
+        self.sorted_values: Dict[str, np.ndarray] = {}
+        self.postings: Dict[str, Dict[int, np.ndarray]] = {}
+        self.pending: set = set()
+
+    def __len__(self) -> int:
+        self._ensure_built()
+        return int(self.alive[:len(self.ids)].sum())
+
+    def __contains__(self, player_id) -> bool:
+        self._ensure_built()
+        row = self.rows.get(str(player_id))
+        return row is not None and bool(self.alive[row])
+
+    def _ensure_built(self):
+        if not self._built:
+            with self._lock:
+                if not self._built:
+                    self._built = True
+                    if self.source is not None:
+                        self._load(self.source.items())
+
+    def build(self, records: Iterable[Tuple[str, Dict]]):
+        """Index every (player_id, record) pair, replacing the current contents"""
+        with self._lock:
+            self._reset(1024)
+            self._built = True
+            self._load(records)
+
+    def _load(self, records: Iterable[Tuple[str, Dict]]):
+        for pid, record in records:
+            self._set_row(flatten_player(pid, record))
+        self._merge()
+        logger.info(f"Built player index over {len(self.ids)} players")
+
+    def upsert(self, player_id: str, record: Dict):
+        """Insert or replace one player; it is queryable immediately"""
+        self._ensure_built()
+        with self._lock:
+            row = self._set_row(flatten_player(player_id, record))
+            self.pending.add(row)
+            if len(self.pending) > MERGE_RATIO * max(len(self.ids), 1000):
+                self._merge()
+
+    def remove(self, player_id: str) -> bool:
+        self._ensure_built()
+        with self._lock:
+            row = self.rows.get(str(player_id))
+            if row is None or not self.alive[row]:
+                return False
+            self.alive[row] = False
+            self.version += 1
+            return True
+
+    def record(self, player_id: str) -> Optional[Dict]:
+        """Full stored record, read from the source on demand"""
+        return self.source.get(player_id) if self.source is not None else None
+
+    def _set_row(self, flat: Dict) -> int:
+        row = self.rows.get(flat['id'])
+        if row is None:
+            row = len(self.ids)
+            if row == len(self.alive):
+                self._grow()
+            self.ids.append(flat['id'])
+            self.names.append(flat['name'])
+            self.rows[flat['id']] = row
+        self.names[row] = flat['name']
+        self.alive[row] = True
+        for field in NUMERIC_FIELDS:
+            self.numeric[field][row] = flat[field]
+        for field in CATEGORICAL_FIELDS:
+            vocab = self.vocab[field]
+            if flat[field] not in vocab:
+                vocab[flat[field]] = len(vocab)
+                self.labels[field].append(flat[field])
+            self.codes[field][row] = vocab[flat[field]]
+        self.version += 1
+        return row
+
+    def _grow(self):
+        capacity = 2 * len(self.alive)
+        grow = lambda old: np.concatenate([old, np.zeros(capacity - len(old), dtype=old.dtype)])
+        self.alive = grow(self.alive)
+        self.numeric = {field: grow(values) for field, values in self.numeric.items()}
+        self.codes = {field: grow(codes) for field, codes in self.codes.items()}
+
+    def _merge(self):
+        """Rebuild the sorted and per-value indexes over every row"""
+        n = len(self.ids)
+        for field in NUMERIC_FIELDS:
+            values = self.numeric[field][:n]
+            # NaN (unknown market value) sorts last and never matches a range
+            order = np.argsort(values, kind='stable')
+            self.sorted_rows[field] = order
+            self.sorted_values[field] = values[order]
+        for field in CATEGORICAL_FIELDS:
+            codes = self.codes[field][:n]
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(self.vocab[field]) + 1))
+            self.postings[field] = {code: order[bounds[code]:bounds[code + 1]]
+                                    for code in range(len(self.vocab[field]))}
+        self.pending = set()
+
+    def _candidates(self, ranges: Dict[str, Tuple], equals: Dict[str, List[str]]) -> Optional[np.ndarray]:
+        """Smallest indexed row set any single filter allows (None: no filters)"""
+        best = None
+        for field, (low, high) in ranges.items():
+            values = self.sorted_values[field]
+            start = 0 if low is None else np.searchsorted(values, low, side='left')
+            stop = np.searchsorted(values, np.inf if high is None else high, side='right')
+            if best is None or stop - start < len(best):
+                best = self.sorted_rows[field][start:stop]
+        for field, wanted in equals.items():
+            codes = [self.vocab[field][v] for v in wanted if v in self.vocab[field]]
+            rows = np.concatenate([self.postings[field].get(c, np.zeros(0, dtype=np.int64)) for c in codes]) \
+                if codes else np.zeros(0, dtype=np.int64)
+            if best is None or len(rows) < len(best):
+                best = rows
+        return best
+
+    def _matches(self, rows: np.ndarray, ranges: Dict[str, Tuple], equals: Dict[str, List[str]]) -> np.ndarray:
+        keep = self.alive[rows].copy()
+        for field, (low, high) in ranges.items():
+            values = self.numeric[field][rows]
+            if low is not None:
+                keep &= values >= low
+            if high is not None:
+                keep &= values <= high
+        for field, wanted in equals.items():
+            codes = [self.vocab[field][v] for v in wanted if v in self.vocab[field]]
+            keep &= np.isin(self.codes[field][rows], codes)
+        return rows[keep]
+
+    def match_rows(self, ranges: Optional[Dict[str, Tuple]] = None,
+                   equals: Optional[Dict[str, List[str]]] = None,
+                   exclude: Optional[Iterable[str]] = None) -> np.ndarray:
+        """Sorted row numbers of live players matching every filter"""
+        self._ensure_built()
+        ranges = {f: r for f, r in (ranges or {}).items() if r is not None and r != (None, None)}
+        equals = {f: ([v] if isinstance(v, str) else list(v)) for f, v in (equals or {}).items() if v}
+        unknown = set(ranges) - set(NUMERIC_FIELDS) | set(equals) - set(CATEGORICAL_FIELDS)
+        if unknown:
+            raise ValueError(f"Unknown filter fields: {sorted(unknown)}")
+
+        with self._lock:
+            candidates = self._candidates(ranges, equals)
+            if candidates is None:
+                candidates = np.arange(len(self.ids))
+            elif self.pending:
+                candidates = np.concatenate([candidates, np.fromiter(self.pending, dtype=np.int64)])
+            rows = np.unique(self._matches(candidates, ranges, equals))
+        if exclude:
+            drop = [self.rows[pid] for pid in set(exclude) if pid in self.rows]
+            rows = rows[~np.isin(rows, drop)]
+        return rows
+
+    def match_ids(self, ranges=None, equals=None, exclude=None) -> List[str]:
+        """Ids of matching players in corpus (insertion) order"""
+        return [self.ids[row] for row in self.match_rows(ranges, equals, exclude)]
+
+    def query(self, ranges: Optional[Dict[str, Tuple]] = None, equals: Optional[Dict[str, List[str]]] = None,
+              sort_by: str = 'market_value', descending: bool = True, limit: int = 50,
+              cursor: Optional[str] = None, exclude: Optional[Iterable[str]] = None) -> Dict:
+        """Filtered, sorted page of players with a keyset cursor for the next page"""
+        if sort_by not in SORT_FIELDS:
+            raise ValueError(f"Cannot sort by {sort_by}")
+        limit = max(1, min(int(limit), MAX_LIMIT))
+        rows = self.match_rows(ranges, equals, exclude)
+
+        if sort_by == 'name':
+            # Names are ranked among the matches only; the rank is the sort key
+            order = sorted(range(len(rows)), key=lambda i: self.names[rows[i]])
+            keys = np.empty(len(rows))
+            keys[order] = np.arange(len(rows))
+            if cursor:
+                raise ValueError("Cursors are only supported for numeric sort fields")
+        else:
+            keys = self.numeric[sort_by][rows]
+            # Unknown values always come last
+            keys = np.where(np.isnan(keys), -np.inf if descending else np.inf, keys)
+        if descending:
+            keys = -keys
+
+        total = len(rows)
+        if cursor:
+            last_key, last_row = decode_cursor(cursor)
+            after = (keys > last_key) | ((keys == last_key) & (rows > last_row))
+            rows, keys = rows[after], keys[after]
+
+        if len(rows) > limit:
+            # Keep every row tied with the last selected key so row order breaks ties
+            threshold = np.partition(keys, limit - 1)[limit - 1]
+            top = keys <= threshold
+            rows, keys = rows[top], keys[top]
+        order = np.lexsort((rows, keys))[:limit]
+        rows, keys = rows[order], keys[order]
+
+        page = [self._row(row) for row in rows]
+        next_cursor = None
+        if len(rows) == limit and sort_by != 'name':
+            next_cursor = encode_cursor(float(keys[-1]), int(rows[-1]))
+        return {'total': total, 'count': len(page), 'players': page, 'next_cursor': next_cursor}
+
+    def _row(self, row: int) -> Dict:
+        result = {'id': self.ids[row], 'name': self.names[row]}
+        for field in NUMERIC_FIELDS:
+            value = self.numeric[field][row]
+            result[field] = None if np.isnan(value) else (float(value) if field == 'market_value' else int(value))
+        for field in CATEGORICAL_FIELDS:
+            result[field] = self.labels[field][self.codes[field][row]]
+        return result
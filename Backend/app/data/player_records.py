@@ -0,0 +1,118 @@
+import re
+import json
+import hashlib
+from typing import Dict, Optional, Tuple
+
+# Keys differ between the Apify actor, the direct scraper and search results
+POSITION_KEYS = ('Position', 'Position:', 'position')
+CLUB_KEYS = ('Current club', 'Current club:', 'current_team', 'Club')
+NATIONALITY_KEYS = ('Citizenship', 'Citizenship:', 'nationality', 'Nationality')
+
+# Bookkeeping fields that change without the player's data changing
+VOLATILE_KEYS = ('last_updated',)
+
+# Career phase age brackets used across the analysis modules
+PHASE_AGE_EDGES = (21, 25, 30)
+PHASES = ('breakthrough', 'development', 'peak', 'twilight')
+
+_VALUE_PATTERN = re.compile(r'([\d.,]+)\s*(bn|m|k|th\.?)?', re.IGNORECASE)
+_VALUE_MULTIPLIERS = {'bn': 1e9, 'm': 1e6, 'k': 1e3, 'th': 1e3, 'th.': 1e3}
+
+
+def extract_age(age_string) -> int:
+    """Extract age from formats like '1995-01-01 (28)' or '28'; 0 if unknown"""
+    try:
+        if not age_string:
+            return 0
+        text = str(age_string)
+        if '(' in text:
+            return int(text.split('(')[1].replace(')', ''))
+        if text.isdigit():
+            return int(text)
+        return 0
+    except (ValueError, IndexError):
+        return 0
+
+
+def parse_market_value(value) -> float:
+    """Parse a Transfermarkt value such as '€15.00m' or '€500k' into euros"""
+    if value is None:
+        return float('nan')
+    if isinstance(value, (int, float)):
+        return float(value)
+    match = _VALUE_PATTERN.search(str(value))
+    if not match:
+        return float('nan')
+    amount = float(match.group(1).replace(',', ''))
+    unit = (match.group(2) or '').lower()
+    return amount * _VALUE_MULTIPLIERS.get(unit, 1.0)
+
+
+def parse_count(value) -> int:
+    """Parse stat counts like '34', "2.890'" or '-' into an int"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    digits = re.sub(r'[^\d]', '', str(value or ''))
+    return int(digits) if digits else 0
+
+
+def career_phase(age: int) -> str:
+    """Age-based career phase, matching TeamBalanceOptimizer._determine_career_phase"""
+    if age < PHASE_AGE_EDGES[0]:
+        return 'breakthrough'
+    elif age < PHASE_AGE_EDGES[1]:
+        return 'development'
+    elif age < PHASE_AGE_EDGES[2]:
+        return 'peak'
+    return 'twilight'
+
+
+def record_version(record: Optional[Dict]) -> str:
+    """Content hash of a player record, ignoring bookkeeping timestamps"""
+    if record is None:
+        return ''
+    content = {k: v for k, v in record.items() if k not in VOLATILE_KEYS}
+    canonical = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def first_season_stats(record: Dict) -> Tuple[float, float, float, float]:
+    """Appearances, minutes, goals and assists of the first careerStats entry.
+
+    Raises for records without stats or with unparseable values, which the
+    recommendation score treats as the lowest score.
+    """
+    stats = record.get('careerStats', [{}])[0]
+    return (float(stats.get('Appearances', 0)), float(stats.get('Minutes played', 0)),
+            float(stats.get('Goals', 0)), float(stats.get('Assists', 0)))
+
+
+def _first(record: Dict, keys) -> Optional[str]:
+    for key in keys:
+        value = record.get(key)
+        if value:
+            return str(value).strip()
+    return None
+
+
+def flatten_player(player_id: str, record: Dict) -> Dict:
+    """Flatten a nested scraped record into one row of typed columns"""
+    stats = record.get('careerStats') or []
+    age = extract_age(record.get('Date of birth/Age', record.get('age', '')))
+
+    return {
+        'id': str(player_id),
+        'name': record.get('Full name') or record.get('name') or 'Unknown',
+        'age': age,
+        'career_phase': career_phase(age),
+        'position': _first(record, POSITION_KEYS) or 'Unknown',
+        'club': _first(record, CLUB_KEYS) or 'Unknown',
+        'nationality': _first(record, NATIONALITY_KEYS) or 'Unknown',
+        'market_value': parse_market_value(record.get('Market value', record.get('market_value'))),
+        'career_games': sum(parse_count(s.get('Appearances')) for s in stats),
+        'career_goals': sum(parse_count(s.get('Goals')) for s in stats),
+        'career_assists': sum(parse_count(s.get('Assists')) for s in stats),
+        'career_minutes': sum(parse_count(s.get('Minutes', s.get('Minutes played'))) for s in stats),
+        'career_yellows': sum(parse_count(s.get('Yellow cards')) for s in stats),
+        'career_reds': sum(parse_count(s.get('Red cards')) for s in stats),
+    }
@@ -1,12 +1,14 @@
 import requests
 from bs4 import BeautifulSoup
 import logging
-from typing import Dict, Optional, List
+from typing import Callable, Dict, Optional, List
 
 class PlayerService:
     _instance = None
     _initialized = False
     _players_cache = {}  # Class-level cache
+    corpus_version = 0   # Bumped whenever a cached record is added or changed
+    _listeners: List[Callable[[str, Dict], None]] = []  # Notified of added or changed records
 
     def __new__(cls):
         if cls._instance is None:
@@ -148,7 +150,7 @@ class PlayerService:
             }
 
             # Cache the player data
-            self._players_cache[player_id] = player_data
+            self.cache_player(player_id, player_data)
             self.logger.info(f"Added player {player_id} to cache. Cache now contains {len(self._players_cache)} players")
             return player_data
 
@@ -156,6 +158,22 @@ class PlayerService:
             self.logger.error(f"Error in get_player_details: {str(e)}")
             raise
 
+    def cache_player(self, player_id: str, player_data: Dict):
+        """Add or replace a cached player record, bumping the corpus version on change"""
+        if PlayerService._players_cache.get(player_id) != player_data:
+            PlayerService._players_cache[player_id] = player_data
+            PlayerService.corpus_version += 1
+            for listener in PlayerService._listeners:
+                try:
+                    listener(player_id, player_data)
+                except Exception as e:
+                    self.logger.error(f"Error notifying listener for player {player_id}: {str(e)}")
+
+    @classmethod
+    def add_listener(cls, listener: Callable[[str, Dict], None]):
+        """Register a callback for added or changed cached player records"""
+        cls._listeners.append(listener)
+
     def _extract_stats(self, stats_table) -> Dict:
         """Extract player statistics from the stats table"""
         try:
@@ -0,0 +1,261 @@
+import json
+import os
+import logging
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PlayerStore:
+    """Lazily opened store over the scraped player corpus (``players.json``).
+
+    Nothing is read when the store is created. Full scans stream the file one
+    record at a time, and point lookups seek straight to a record through a
+    byte-offset index that is built on first use. Only records that are
+    actually looked up are kept in memory.
+    """
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, data_file: Path):
+        self.data_file = Path(data_file)
+        self._index: Optional[Dict[str, Tuple[int, int]]] = None
+        self._touched: Dict[str, Dict] = {}   # records loaded by point lookups
+        self._pending: Dict[str, Dict] = {}   # written but not yet flushed
+        self._removed: set = set()            # removed but not yet flushed
+
+    # ------------------------------------------------------------------ reads
+
+    def __contains__(self, player_id: str) -> bool:
+        if player_id in self._pending:
+            return True
+        if player_id in self._removed:
+            return False
+        return player_id in self._get_index()
+
+    def __len__(self) -> int:
+        index = self._get_index()
+        stored = sum(1 for pid in index if pid not in self._removed)
+        return stored + sum(1 for pid in self._pending if pid not in index)
+
+    def ids(self) -> List[str]:
+        """All player ids in file order, followed by unflushed additions"""
+        index = self._get_index()
+        ids = [pid for pid in index if pid not in self._removed]
+        ids.extend(pid for pid in self._pending if pid not in index)
+        return ids
+
+    def get(self, player_id: str) -> Optional[Dict]:
+        """Get a single record, reading only its bytes from disk"""
+        if player_id in self._pending:
+            return self._pending[player_id]
+        if player_id in self._removed:
+            return None
+        if player_id in self._touched:
+            return self._touched[player_id]
+
+        offsets = self._get_index().get(player_id)
+        if offsets is None:
+            return None
+
+        start, end = offsets
+        try:
+            with open(self.data_file, 'rb') as f:
+                f.seek(start)
+                record = json.loads(f.read(end - start).decode('utf-8'))
+        except Exception as e:
+            logger.error(f"Error reading player {player_id} from store: {str(e)}")
+            return None
+
+        self._touched[player_id] = record
+        return record
+
+    def get_many(self, player_ids: List[str]) -> Dict[str, Dict]:
+        """Get records for several players, skipping unknown ids"""
+        records = {}
+        for pid in player_ids:
+            record = self.get(pid)
+            if record is not None:
+                records[pid] = record
+        return records
+
+    def items(self) -> Iterator[Tuple[str, Dict]]:
+        """Stream every (player_id, record) pair without keeping them resident"""
+        index = {} if self._index is None else None
+        for pid, start, end, record in self._scan():
+            if index is not None:
+                index[pid] = (start, end)
+            if pid in self._removed:
+                continue
+            yield pid, self._pending.get(pid, record)
+
+        # A completed scan is as good as a dedicated index pass
+        if index is not None:
+            self._index = index
+
+        for pid, record in list(self._pending.items()):
+            if pid not in self._get_index():
+                yield pid, record
+
+    def iter_json(self) -> Iterator[str]:
+        """Stream the whole corpus as a JSON object, one record per chunk"""
+        yield '{'
+        first = True
+        for pid, record in self.items():
+            yield ('' if first else ',') + json.dumps(pid) + ':' + json.dumps(record, ensure_ascii=False)
+            first = False
+        yield '}'
+
+    # ----------------------------------------------------------------- writes
+
+    def put(self, player_id: str, record: Dict):
+        """Stage a new or updated record; call ``flush`` to persist it"""
+        self._removed.discard(player_id)
+        self._touched.pop(player_id, None)
+        self._pending[player_id] = record
+
+    def remove(self, player_id: str) -> bool:
+        """Stage removal of a record; returns False if it does not exist"""
+        if player_id not in self:
+            return False
+        self._pending.pop(player_id, None)
+        self._touched.pop(player_id, None)
+        if player_id in self._get_index():
+            self._removed.add(player_id)
+        return True
+
+    def flush(self):
+        """Write staged changes, copying untouched records byte-for-byte"""
+        if not self._pending and not self._removed and self.data_file.exists():
+            return
+
+        index = self._get_index()
+        tmp_file = self.data_file.with_suffix(self.data_file.suffix + '.tmp')
+        new_index: Dict[str, Tuple[int, int]] = {}
+
+        source = open(self.data_file, 'rb') if self.data_file.exists() else None
+        try:
+            with open(tmp_file, 'wb') as out:
+                out.write(b'{')
+                first = True
+
+                def write_entry(pid: str, raw: bytes):
+                    nonlocal first
+                    prefix = ('' if first else ',') + '\n  ' + json.dumps(pid, ensure_ascii=False) + ': '
+                    out.write(prefix.encode('utf-8'))
+                    start = out.tell()
+                    out.write(raw)
+                    new_index[pid] = (start, out.tell())
+                    first = False
+
+                for pid, (start, end) in index.items():
+                    if pid in self._removed:
+                        continue
+                    if pid in self._pending:
+                        write_entry(pid, self._encode(self._pending[pid]))
+                    else:
+                        source.seek(start)
+                        write_entry(pid, source.read(end - start))
+
+                for pid, record in self._pending.items():
+                    if pid not in index:
+                        write_entry(pid, self._encode(record))
+
+                out.write(b'\n}' if new_index else b'}')
+        finally:
+            if source is not None:
+                source.close()
+
+        os.replace(tmp_file, self.data_file)
+        self._touched.update(self._pending)
+        self._pending.clear()
+        self._removed.clear()
+        self._index = new_index
+
+    # -------------------------------------------------------------- internals
+
+    @staticmethod
+    def _encode(record: Dict) -> bytes:
+        """Encode a record the way ``json.dump(indent=2)`` nests it"""
+        text = json.dumps(record, indent=2, ensure_ascii=False)
+        return text.replace('\n', '\n  ').encode('utf-8')
+
+    def _get_index(self) -> Dict[str, Tuple[int, int]]:
+        if self._index is None:
+            self._index = {pid: (start, end) for pid, start, end, _ in self._scan()}
+            logger.info(f"Indexed {len(self._index)} stored players")
+        return self._index
+
+    def _scan(self) -> Iterator[Tuple[str, int, int, Dict]]:
+        """Incrementally parse the top-level object.
+
+        Yields ``(player_id, start, end, record)`` where ``start``/``end`` are
+        byte offsets of the record value. Only one read chunk plus the record
+        being decoded is held in memory at a time.
+        """
+        if not self.data_file.exists():
+            return
+
+        decoder = json.JSONDecoder()
+        try:
+            # newline='' keeps character counts in step with the bytes on disk
+            with open(self.data_file, 'r', encoding='utf-8', newline='') as f:
+                buf = ''
+                byte_pos = 0
+                eof = False
+
+                def fill() -> bool:
+                    nonlocal buf, eof
+                    chunk = f.read(self.CHUNK_SIZE)
+                    if not chunk:
+                        eof = True
+                        return False
+                    buf += chunk
+                    return True
+
+                def skip(i: int, chars: str) -> int:
+                    while True:
+                        while i < len(buf) and buf[i] in chars:
+                            i += 1
+                        if i < len(buf) or not fill():
+                            return i
+
+                def decode(i: int):
+                    # Only trust a decode that stops short of the buffer end,
+                    # otherwise a number or literal may have been cut in half
+                    while True:
+                        try:
+                            value, end = decoder.raw_decode(buf, i)
+                            if end < len(buf) or eof:
+                                return value, end
+                        except json.JSONDecodeError:
+                            if eof:
+                                raise
+                        fill()
+
+                i = skip(0, ' \t\r\n')
+                if i >= len(buf):
+                    return
+                if buf[i] != '{':
+                    raise ValueError("Player store must contain a JSON object")
+                i += 1
+
+                while True:
+                    i = skip(i, ' \t\r\n,')
+                    if i >= len(buf) or buf[i] == '}':
+                        return
+
+                    player_id, i = decode(i)
+                    i = skip(i, ' \t\r\n:')
+                    record, end = decode(i)
+
+                    start = byte_pos + len(buf[:i].encode('utf-8'))
+                    stop = start + len(buf[i:end].encode('utf-8'))
+                    yield player_id, start, stop, record
+
+                    byte_pos = stop
+                    buf = buf[end:]
+                    i = 0
+        except Exception as e:
+            logger.error(f"Error scanning stored data: {str(e)}")
@@ -0,0 +1,194 @@
+import json
+import logging
+import argparse
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc as ipc
+import pyarrow.parquet as pq
+
+from app.data.player_records import flatten_player
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = '_manifest.json'
+FORMATS = {'arrow': '.arrow', 'parquet': '.parquet'}
+
+# Object columns with at most this share of distinct values become categoricals
+CATEGORY_RATIO = 0.5
+
+
+def optimize_dtypes(df: pd.DataFrame, categorical: Optional[List[str]] = None) -> pd.DataFrame:
+    """Downcast integer columns and turn repetitive strings into categoricals"""
+    df = df.copy()
+    categorical = set(categorical or [])
+    for col in df.columns:
+        series = df[col]
+        if pd.api.types.is_bool_dtype(series):
+            continue
+        if pd.api.types.is_integer_dtype(series):
+            df[col] = pd.to_numeric(series, downcast='integer')
+        elif col in categorical or (
+            pd.api.types.is_string_dtype(series) and len(series)
+            and series.nunique() <= CATEGORY_RATIO * len(series)
+        ):
+            df[col] = series.astype('category')
+    return df
+
+
+def build_corpus_frame(records: Iterable[Tuple[str, Dict]]) -> pd.DataFrame:
+    """Flatten (player_id, record) pairs into a typed DataFrame"""
+    rows = [flatten_player(pid, record) for pid, record in records]
+    if not rows:
+        return pd.DataFrame(columns=list(flatten_player('', {}).keys()))
+
+    df = pd.DataFrame(rows)
+    df['market_value'] = df['market_value'].astype(np.float32)
+    return optimize_dtypes(df, categorical=['career_phase', 'position', 'club', 'nationality'])
+
+
+def write_snapshot(df: pd.DataFrame, out_dir: Path, fmt: str = 'arrow',
+                   partition_by: Optional[str] = None, source: str = '',
+                   metadata: Optional[Dict] = None) -> Path:
+    """Write a DataFrame as a partitioned snapshot directory.
+
+    Each partition is one file holding every column, so a partition can be
+    memory-mapped and used on its own. A manifest records the schema,
+    row counts, creation time and any extra ``metadata``.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported snapshot format: {fmt}")
+
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+
+    if partition_by:
+        keys = df[partition_by].astype(str)
+        partitions = [(f"{partition_by}={key}", np.flatnonzero((keys == key).to_numpy()))
+                      for key in sorted(keys.unique())]
+    else:
+        partitions = [('all', np.arange(len(df)))]
+
+    files = []
+    for name, rows in partitions:
+        part = table.take(pa.array(rows))
+        path = out_dir / f"{name}{FORMATS[fmt]}"
+        if fmt == 'arrow':
+            # Uncompressed IPC so readers can map buffers without copying
+            with pa.OSFile(str(path), 'wb') as sink:
+                with ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(part)
+        else:
+            pq.write_table(part, path)
+        files.append({'file': path.name, 'rows': len(rows)})
+
+    manifest = {
+        'format': fmt,
+        'source': source,
+        'partition_by': partition_by,
+        'rows': len(df),
+        'columns': {col: str(dtype) for col, dtype in df.dtypes.items()},
+        'files': files,
+        'created_at': datetime.now().isoformat(),
+        'metadata': metadata or {}
+    }
+    with open(out_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    logger.info(f"Wrote {len(df)} rows in {len(files)} partitions to {out_dir}")
+    return out_dir
+
+
+def export_corpus_snapshot(store, out_dir: Path, fmt: str = 'arrow',
+                           partition_by: str = 'career_phase') -> Path:
+    """Export the stored player corpus (a PlayerStore) to a snapshot"""
+    df = build_corpus_frame(store.items())
+    return write_snapshot(df, out_dir, fmt=fmt, partition_by=partition_by,
+                          source=str(getattr(store, 'data_file', '')))
+
+
+def export_csv_snapshot(csv_path: Path, out_dir: Path, fmt: str = 'arrow',
+                        partition_by: Optional[str] = None) -> Path:
+    """Convert a training CSV (e.g. player_database.csv) into a typed snapshot"""
+    df = optimize_dtypes(pd.read_csv(csv_path))
+    return write_snapshot(df, out_dir, fmt=fmt, partition_by=partition_by, source=str(csv_path))
+
+
+def read_manifest(snapshot_dir: Path) -> Dict:
+    with open(Path(snapshot_dir) / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_snapshot(snapshot_dir: Path, columns: Optional[List[str]] = None,
+                  partitions: Optional[List[str]] = None) -> pa.Table:
+    """Load a snapshot as an Arrow table backed by memory-mapped files.
+
+    ``partitions`` selects partition values (e.g. ``['peak']``) so only
+    those files are mapped.
+    """
+    snapshot_dir = Path(snapshot_dir)
+    manifest = read_manifest(snapshot_dir)
+    tables = []
+    for entry in manifest['files']:
+        if partitions is not None and entry['file'].split('=', 1)[-1].rsplit('.', 1)[0] not in partitions:
+            continue
+        path = snapshot_dir / entry['file']
+        if manifest['format'] == 'arrow':
+            table = ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
+            if columns is not None:
+                table = table.select(columns)
+        else:
+            table = pq.read_table(path, columns=columns, memory_map=True)
+        tables.append(table)
+
+    if not tables:
+        return pa.Table.from_pandas(pd.DataFrame(columns=columns or list(manifest['columns'])))
+    return pa.concat_tables(tables) if len(tables) > 1 else tables[0]
+
+
+def load_snapshot_frame(snapshot_dir: Path, columns: Optional[List[str]] = None,
+                        partitions: Optional[List[str]] = None) -> pd.DataFrame:
+    """Load a snapshot into pandas, keeping categorical and downcast dtypes"""
+    table = load_snapshot(snapshot_dir, columns=columns, partitions=partitions)
+    df = table.to_pandas()
+    # Partitions may carry different dictionaries; unify them to categoricals
+    for col, dtype in read_manifest(snapshot_dir)['columns'].items():
+        if dtype == 'category' and col in df.columns and df[col].dtype != 'category':
+            df[col] = df[col].astype('category')
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export typed Arrow/Parquet snapshots")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    corpus = sub.add_parser('corpus', help="Snapshot the stored player corpus")
+    corpus.add_argument('--data-file', default='app/data/players.json')
+    corpus.add_argument('--out', required=True)
+    corpus.add_argument('--format', choices=list(FORMATS), default='arrow')
+    corpus.add_argument('--partition-by', default='career_phase')
+
+    csv = sub.add_parser('csv', help="Snapshot a training CSV")
+    csv.add_argument('--csv', required=True)
+    csv.add_argument('--out', required=True)
+    csv.add_argument('--format', choices=list(FORMATS), default='arrow')
+    csv.add_argument('--partition-by', default=None)
+
+    args = parser.parse_args()
+    if args.command == 'corpus':
+        from app.data.player_store import PlayerStore
+        export_corpus_snapshot(PlayerStore(Path(args.data_file)), Path(args.out),
+                               fmt=args.format, partition_by=args.partition_by)
+    else:
+        export_csv_snapshot(Path(args.csv), Path(args.out), fmt=args.format,
+                            partition_by=args.partition_by)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
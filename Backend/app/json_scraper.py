@@ -1,8 +1,8 @@
-import json
 from pathlib import Path
 import logging
-from typing import Dict, List, Optional
+from typing import Callable, Dict, Iterator, List, Optional
 import asyncio
+from app.data.player_store import PlayerStore
 
 logger = logging.getLogger(__name__)
 
@@ -12,25 +12,28 @@ class JsonScraper:
         self.player_scraper = player_scraper
         self.data_file = Path("app/data/players.json")
         self.data_file.parent.mkdir(parents=True, exist_ok=True)
-        self.stored_data = self._load_existing_data()
+        # Opened lazily: nothing is read until a player is first requested
+        self.store = PlayerStore(self.data_file)
+        # Called with (player_id, record) whenever a record is stored
+        self.listeners: List[Callable[[str, Dict], None]] = []
 
-    def _load_existing_data(self) -> Dict:
-        """Load existing data from JSON file"""
-        try:
-            if self.data_file.exists():
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
-            return {}
-        except Exception as e:
-            logger.error(f"Error loading stored data: {str(e)}")
-            return {}
+    def add_listener(self, listener: Callable[[str, Dict], None]):
+        """Register a callback for newly stored or updated player records"""
+        self.listeners.append(listener)
+
+    def _store_player(self, player_id: str, data: Dict):
+        self.store.put(player_id, data)
+        for listener in self.listeners:
+            try:
+                listener(player_id, data)
+            except Exception as e:
+                logger.error(f"Error notifying listener for player {player_id}: {str(e)}")
 
     def _save_data(self):
         """Save data to JSON file"""
         try:
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.stored_data, f, indent=2, ensure_ascii=False)
-            logger.info(f"Successfully saved data for {len(self.stored_data)} players")
+            self.store.flush()
+            logger.info(f"Successfully saved data for {len(self.store)} players")
         except Exception as e:
             logger.error(f"Error saving data: {str(e)}")
 
@@ -43,7 +46,7 @@ class JsonScraper:
 
             for player_id in player_ids:
                 # Skip if player data exists and is recent (you could add timestamp checks here)
-                if player_id in self.stored_data:
+                if player_id in self.store:
                     updated_players += 1
                     continue
 
@@ -54,7 +57,7 @@ class JsonScraper:
                     player_data = await self.player_scraper.get_player_details_direct(player_id)
                 
                 if player_data:
-                    self.stored_data[player_id] = player_data
+                    self._store_player(player_id, player_data)
                     new_players += 1
                 else:
                     failed_players.append(player_id)
@@ -69,7 +72,7 @@ class JsonScraper:
                 "new_players": new_players,
                 "updated_players": updated_players,
                 "failed_players": failed_players,
-                "total_stored": len(self.stored_data)
+                "total_stored": len(self.store)
             }
             
         except Exception as e:
@@ -82,24 +85,24 @@ class JsonScraper:
 
     def get_stored_data(self) -> Dict:
         """Get all stored player data"""
-        return self.stored_data
+        return dict(self.store.items())
+
+    def iter_stored_data_json(self) -> Iterator[str]:
+        """Stream all stored player data as JSON text"""
+        return self.store.iter_json()
 
     def get_player_data(self, player_id: str) -> Optional[Dict]:
         """Get stored data for a specific player"""
-        return self.stored_data.get(player_id)
+        return self.store.get(player_id)
 
     def get_players_by_ids(self, player_ids: List[str]) -> Dict:
         """Get stored data for multiple players"""
-        return {
-            pid: self.stored_data.get(pid)
-            for pid in player_ids
-            if pid in self.stored_data
-        }
+        return self.store.get_many(player_ids)
 
     def update_player_data(self, player_id: str, data: Dict) -> bool:
         """Update stored data for a specific player"""
         try:
-            self.stored_data[player_id] = data
+            self._store_player(player_id, data)
             self._save_data()
             return True
         except Exception as e:
@@ -109,8 +112,7 @@ class JsonScraper:
     def remove_player_data(self, player_id: str) -> bool:
         """Remove stored data for a specific player"""
         try:
-            if player_id in self.stored_data:
-                del self.stored_data[player_id]
+            if self.store.remove(player_id):
                 self._save_data()
                 return True
             return False
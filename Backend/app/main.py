@@ -1,14 +1,24 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 import requests
 from bs4 import BeautifulSoup
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from app.data.player_service import PlayerService
-from app.model.team_balance import TeamBalanceOptimizer
+from app.model.team_balance import MAX_SEASONS, TeamBalanceOptimizer
 from .parallel_scrapper import ParallelPlayerScraper
 from app.scraper import PlayerScraper
-from .team_balance_service import TeamBalanceService
+from .team_balance_service import TeamBalanceService, SquadSessionManager
 from app.model.recommendation_engine import RecommendationEngine
-from typing import Dict, List
+from app.model.squad_optimizer import MAX_MOVES, SquadCompositionOptimizer, index_candidates
+from app.model.analysis_cache import AnalysisCache
+from app.model.similarity_index import SimilarityIndex
+from app.model.feature_store import FeatureStore
+from app.data.player_index import PlayerIndex
+from app.model.model_registry import registry as model_registry
+from app.model.roster_analyzer import RosterAnalyzer
+from app.model.micro_batcher import MicroBatcher
+from app.model.league_scoring import read_league_phases
+from typing import Dict, List, Optional
 import pandas as pd
 import json
 from .scraper import PlayerScraper
@@ -33,12 +43,33 @@ app.add_middleware(
 
 player_service = PlayerService()
 team_balance_optimizer = TeamBalanceOptimizer()
+analysis_cache = AnalysisCache()
 scraper = PlayerScraper()
-team_balance_service = TeamBalanceService()
+team_balance_service = TeamBalanceService(team_balance_optimizer, analysis_cache)
+squad_sessions = SquadSessionManager(team_balance_optimizer)
+squad_composition_optimizer = SquadCompositionOptimizer(team_balance_optimizer)
 parallel_scraper = ParallelPlayerScraper()
 player_scraper = PlayerScraper()
 json_scraper = JsonScraper(player_scraper)
-recommendation_engine = RecommendationEngine()
+feature_store = FeatureStore.load()
+player_index = PlayerIndex(json_scraper.store)
+recommendation_engine = RecommendationEngine(analysis_cache, player_index=player_index,
+                                             co_occurrence=team_balance_service.co_occurrence,
+                                             feature_store=feature_store)
+similarity_index = SimilarityIndex()
+roster_analyzer = RosterAnalyzer(model_registry, feature_store)
+# Concurrent career phase requests share one model call
+career_phase_batcher = MicroBatcher(roster_analyzer.predict_proba_scaled, max_batch_size=512, max_wait_ms=2.0)
+
+def _index_stored_player(player_id: str, record: Dict):
+    # Only kept in step once the index has been built from the stored corpus
+    if similarity_index.stats is not None:
+        similarity_index.upsert(player_id, record)
+
+json_scraper.add_listener(_index_stored_player)
+json_scraper.add_listener(feature_store.upsert)
+json_scraper.add_listener(player_index.upsert)
+PlayerService.add_listener(feature_store.upsert)
 
 @app.get("/api/search-player")
 async def search_player(name: str):
@@ -88,11 +119,58 @@ async def general_exception_handler(request, exc):
 
 @app.post("/api/scrape-and-store")
 async def scrape_and_store(player_ids: List[str]):
-    return await json_scraper.scrape_and_store(player_ids)
+    result = await json_scraper.scrape_and_store(player_ids)
+    if result.get('new_players'):
+        feature_store.save()
+    return result
 
 @app.get("/api/stored-players")
 def get_stored_players():
-    return json_scraper.get_stored_data()
+    # Streamed so the corpus never has to be materialized in memory
+    return StreamingResponse(json_scraper.iter_stored_data_json(), media_type="application/json")
+
+@app.get("/api/players/query")
+def query_players(min_age: Optional[int] = None, max_age: Optional[int] = None,
+                  phase: Optional[List[str]] = Query(None), position: Optional[List[str]] = Query(None),
+                  club: Optional[List[str]] = Query(None), nationality: Optional[List[str]] = Query(None),
+                  min_value: Optional[float] = None, max_value: Optional[float] = None,
+                  min_minutes: Optional[int] = None, sort_by: str = 'market_value',
+                  descending: bool = True, limit: int = 50, cursor: Optional[str] = None):
+    """Filter the stored players through the secondary indexes"""
+    try:
+        return player_index.query(
+            ranges={'age': (min_age, max_age), 'market_value': (min_value, max_value),
+                    'career_minutes': (min_minutes, None)},
+            equals={'career_phase': phase, 'position': position, 'club': club, 'nationality': nationality},
+            sort_by=sort_by, descending=descending, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error querying players: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/players/{player_id}/similar")
+def get_similar_players(player_id: str, k: int = 10, phase: Optional[str] = None,
+                        position: Optional[str] = None, max_value: Optional[float] = None):
+    """Stored players whose statistical profile is closest to the given player"""
+    try:
+        if similarity_index.stats is None:
+            similarity_index.build(json_scraper.store.items())
+        if player_id not in similarity_index:
+            raise HTTPException(status_code=404, detail=f"Player {player_id} is not stored")
+        return {
+            "player_id": player_id,
+            "similar_players": similarity_index.query(player_id, k=k, phase=phase,
+                                                      position=position, max_value=max_value)
+        }
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error finding similar players: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/team-balance/save")
 async def save_team_balance(team_name: str, player_ids: List[str]):
@@ -130,6 +208,14 @@ async def get_saved_team(team_name: str):
         logger.error(f"Error retrieving team {team_name}: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/team-balance/team/{team_name}/analysis")
+async def get_saved_team_analysis(team_name: str):
+    """Get the (cached) balance analysis of a saved team"""
+    analysis = team_balance_service.analyze_saved_team(team_name)
+    if analysis is None:
+        raise HTTPException(status_code=404, detail="Team not found or has no known players")
+    return analysis
+
 @app.delete("/api/team-balance/team/{team_name}")
 async def delete_saved_team(team_name: str):
     """Delete a saved team composition"""
@@ -154,11 +240,8 @@ async def analyze_team_balance(squad: List[dict]):
         for player in squad:
             team_balance_service.add_player(player)
         
-        # Convert squad list to pandas DataFrame
-        df = pd.DataFrame(squad)
-        
-        # Get analysis
-        analysis = team_balance_optimizer.analyze_squad_balance(df)
+        # Get analysis straight from the player dicts
+        analysis = team_balance_optimizer.analyze_squad_balance(squad)
         
         # Convert numpy values to Python native types
         analysis = json.loads(json.dumps(analysis, default=lambda x: float(x) if isinstance(x, np.floating) else x))
@@ -167,6 +250,116 @@ async def analyze_team_balance(squad: List[dict]):
     except Exception as e:
         logger.error(f"Error in team balance analysis: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/analyze-team-balance/batch")
+async def analyze_team_balance_batch(squads: Dict[str, List[dict]]):
+    """Analyze many squads (e.g. a whole league) in one call, ranked by balance"""
+    try:
+        if not squads:
+            raise ValueError("No squads to analyze")
+        logger.info(f"Analyzing team balance for {len(squads)} squads")
+        names, ages, offsets = team_balance_optimizer.pack_squads(squads)
+        return {"ranking": team_balance_optimizer.analyze_league_balance(ages, offsets, names)}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in batch team balance analysis: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/team-balance/simulate")
+async def simulate_squad_aging(data: Dict):
+    """Project squad balance (and value) over the next seasons for one or many squads"""
+    try:
+        squads = data.get('squads', {})
+        seasons = int(data.get('seasons', 5))
+        if not 1 <= seasons <= MAX_SEASONS:
+            raise HTTPException(status_code=400, detail=f"seasons must be between 1 and {MAX_SEASONS}")
+        logger.info(f"Simulating {seasons} seasons for {len(squads)} squads")
+        names, ages, offsets = team_balance_optimizer.pack_squads(squads)
+        values, peaks = team_balance_optimizer.pack_squad_values(squads)
+        return {"trajectories": team_balance_optimizer.simulate_aging(
+            ages, offsets, seasons, values=values, peak_values=peaks, squad_names=names
+        )}
+    except HTTPException:
+        raise
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in squad aging simulation: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/team-balance/optimize")
+async def optimize_squad_composition(data: Dict):
+    """Find the add/remove moves from the stored corpus that best balance a squad"""
+    try:
+        squad = data.get('squad', [])
+        max_moves = int(data.get('max_moves', 6))
+        budget = float(data.get('budget') or float('inf'))
+        if not 1 <= max_moves <= MAX_MOVES:
+            raise HTTPException(status_code=400, detail=f"max_moves must be between 1 and {MAX_MOVES}")
+        logger.info(f"Optimizing composition for {len(squad)} players")
+        per_class = squad_composition_optimizer.moves_needed(len(squad), max_moves)
+        candidates = index_candidates(player_index, [str(p.get('id')) for p in squad], per_class, budget)
+        return squad_composition_optimizer.optimize(
+            squad,
+            candidates,
+            budget=budget,
+            max_moves=max_moves,
+            top_n=int(data.get('top_n', 5))
+        )
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error optimizing squad composition: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/team-balance/sessions")
+async def create_squad_session(squad: Optional[List[dict]] = None):
+    """Start a live editing session, optionally seeded with a squad"""
+    try:
+        session_id = squad_sessions.create(squad)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"session_id": session_id, "analysis": squad_sessions.get(session_id).analysis()}
+
+@app.get("/api/team-balance/sessions/{session_id}")
+async def get_squad_session(session_id: str):
+    """Full analysis for a live session"""
+    state = squad_sessions.get(session_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    return state.analysis()
+
+@app.post("/api/team-balance/sessions/{session_id}/players")
+async def add_session_player(session_id: str, player: dict):
+    """Add a player to a live session and return what changed"""
+    state = squad_sessions.get(session_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    try:
+        return state.add_player(player)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.delete("/api/team-balance/sessions/{session_id}/players/{player_id}")
+async def remove_session_player(session_id: str, player_id: str):
+    """Remove a player from a live session and return what changed"""
+    state = squad_sessions.get(session_id)
+    if state is None:
+        raise HTTPException(status_code=404, detail="Session not found")
+    try:
+        return state.remove_player(player_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Player not in session")
+
+@app.delete("/api/team-balance/sessions/{session_id}")
+async def close_squad_session(session_id: str):
+    """End a live session"""
+    if not squad_sessions.close(session_id):
+        raise HTTPException(status_code=404, detail="Session not found")
+    return {"message": "Session closed"}
     
 def get_player_details(self, player_id: str):
     """Get detailed player statistics from Transfermarkt"""
@@ -295,19 +488,89 @@ async def get_players_parallel(player_ids: List[str]):
         logger.error(f"Error in parallel player scraping: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
     
+@app.get("/api/recommendations/cache-stats")
+def get_recommendation_cache_stats():
+    """Hit rates of the squad response cache and the shared candidate signature cache"""
+    return {
+        "squad_cache": analysis_cache.stats(),
+        "signature_cache": recommendation_engine.candidate_cache.stats()
+    }
+
+@app.get("/api/models")
+def get_models():
+    """Version metadata of the loaded model artifacts"""
+    return {"model_dir": str(model_registry.model_dir), "models": model_registry.info(),
+            "career_phase_batcher": career_phase_batcher.stats(),
+            "feedback_writer": roster_analyzer.feedback_system.writer.stats()}
+
+@app.post("/api/models/reload")
+def reload_models(name: Optional[str] = None):
+    """Hot-reload one artifact, or every loaded artifact whose file changed on disk"""
+    try:
+        if name:
+            return {"reloaded": {name: model_registry.reload(name)}}
+        return {"reloaded": model_registry.refresh()}
+    except (KeyError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error reloading models: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/career-phases")
+async def predict_career_phases(players: List[dict]):
+    """Career phase, confidence and recommendation for rows shaped like player_database.csv"""
+    try:
+        results = await roster_analyzer.analyze_team_async(pd.DataFrame(players), career_phase_batcher)
+        return results.to_dict(orient='records')
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Missing player field: {str(e)}")
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=f"Career phase pipeline not published: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error predicting career phases: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/players/career-phases")
+def predict_stored_career_phases(player_ids: List[str], squad_size: Optional[int] = None):
+    """Career phases of stored players, computed from the feature store"""
+    try:
+        # Unchanged records are skipped by version, so stale rows are refreshed cheaply
+        feature_store.upsert_many(json_scraper.store.get_many(player_ids).items())
+        results = roster_analyzer.analyze_players(player_ids, squad_size)
+        return results.to_dict(orient='records')
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=503, detail=f"Career phase pipeline not published: {str(e)}")
+    except Exception as e:
+        logger.error(f"Error predicting stored career phases: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/api/league-phases")
+def get_league_phases(phase: Optional[str] = None, offset: int = 0, limit: int = 100):
+    """A page of the latest league-wide career phase scoring run (app.model.league_scoring)"""
+    try:
+        return read_league_phases(phase=phase, offset=offset, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error reading league phases: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @app.post("/api/combined-analysis")
 async def combined_analysis(data: Dict):
     try:
-        player_service = PlayerService()
-        recommendation_engine = RecommendationEngine()
-        
-        # Update cache with received player data
-        for player in data.get('players', []):
-            player_id = player['id']
-            player_service._players_cache[player_id] = player
-            
+        # Client-supplied players only apply to this request; the shared corpus is untouched
+        overlay = {player['id']: player for player in data.get('players', [])}
+
         # Get recommendations using player IDs
-        recommendations = recommendation_engine.get_recommendations(data.get('player_ids', []))
+        if data.get('mode') == 'co_occurrence':
+            return recommendation_engine.get_co_occurrence_recommendations(data.get('player_ids', []), overlay)
+        recommendations = recommendation_engine.get_recommendations(data.get('player_ids', []), overlay)
         
         return recommendations
         
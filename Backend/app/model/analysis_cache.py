@@ -0,0 +1,125 @@
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set
+
+from app.data.player_records import record_version
+
+logger = logging.getLogger(__name__)
+
+
+class AnalysisCache:
+    """LRU cache of analysis results keyed by squad content.
+
+    A key is a hash of the analysis kind plus every member's id and record
+    version, so a changed record can never be served a stale result.
+    ``invalidate_player`` also drops entries eagerly when a record changes
+    so they do not linger until LRU eviction.
+    """
+
+    def __init__(self, max_entries: int = 2048):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._keys_by_player: Dict[str, Set[str]] = {}
+        self._players_by_key: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def squad_key(kind: str, records: Dict[str, Optional[Dict]], extra: str = '') -> str:
+        """Canonical key: sorted (player id, record version) pairs for ``kind``"""
+        digest = hashlib.sha256(f"{kind}|{extra}".encode('utf-8'))
+        for player_id in sorted(records):
+            digest.update(f"|{player_id}:{record_version(records[player_id])}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: str, value: Any, player_ids=()):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self._players_by_key[key] = tuple(player_ids)
+            for player_id in player_ids:
+                self._keys_by_player.setdefault(player_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate_player(self, player_id: str) -> int:
+        """Drop every cached result that includes ``player_id``"""
+        with self._lock:
+            keys = list(self._keys_by_player.get(str(player_id), ()))
+            for key in keys:
+                self._drop(key)
+        if keys:
+            logger.info(f"Invalidated {len(keys)} cached analyses for player {player_id}")
+        return len(keys)
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0
+        }
+
+    def _drop(self, key: str):
+        self._entries.pop(key, None)
+        for player_id in self._players_by_key.pop(key, ()):
+            keys = self._keys_by_player.get(player_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_player[player_id]
+
+
+class SignatureCache(AnalysisCache):
+    """LRU cache whose entries all belong to a single corpus version.
+
+    Keys are signatures of what a result actually depends on, rather than the
+    full squad content, so different squads can share an entry. Moving to a
+    new corpus version with ``sync_version`` evicts every entry at once.
+    """
+
+    def __init__(self, max_entries: int = 4096):
+        super().__init__(max_entries)
+        self.version = None
+        self.version_evictions = 0
+
+    @staticmethod
+    def signature(kind: str, needs, excluded_ids, version) -> str:
+        """Key for ``kind`` from the ordered needs, the excluded id set and the corpus version"""
+        digest = hashlib.sha256(f"{kind}|{version}|{','.join(needs)}".encode('utf-8'))
+        for player_id in sorted({str(pid) for pid in excluded_ids}):
+            digest.update(f"|{player_id}".encode('utf-8'))
+        return digest.hexdigest()
+
+    def sync_version(self, version) -> int:
+        """Evict everything if ``version`` differs from the cached version"""
+        with self._lock:
+            if version == self.version:
+                return 0
+            evicted = len(self._entries)
+            self._entries.clear()
+            self._keys_by_player.clear()
+            self._players_by_key.clear()
+            self.version = version
+            self.version_evictions += evicted
+        if evicted:
+            logger.info(f"Corpus version changed to {version}; evicted {evicted} cached signatures")
+        return evicted
+
+    def stats(self) -> Dict:
+        stats = super().stats()
+        stats.update({'version': str(self.version), 'version_evictions': self.version_evictions})
+        return stats
@@ -0,0 +1,133 @@
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+logger = logging.getLogger(__name__)
+
+
+class CoOccurrenceIndex:
+    """Item-item co-occurrence of players across saved teams.
+
+    Keeps ``C = A.T @ A`` for the binary team x player matrix ``A``, so
+    ``C[i, j]`` counts the teams holding both players and ``C[i, i]`` counts
+    the teams holding each player. Saving or deleting a team adds or
+    subtracts that team's indicator outer product. Those updates go into a
+    small delta matrix that is folded into ``C`` once it passes
+    ``FOLD_RATIO`` of its size, so a save never copies the full matrix.
+    Squad scores are cosine similarities summed over the squad:
+    ``score_j = sum_i C[i, j] / sqrt(C[i, i] * C[j, j])``.
+    """
+
+    FOLD_RATIO = 0.05
+
+    def __init__(self, players: Optional[Dict[str, Dict]] = None):
+        self.players = players if players is not None else {}  # Player records, for metadata
+        self.cols: Dict[str, int] = {}
+        self.ids: List[str] = []
+        self.teams: Dict[str, np.ndarray] = {}
+        self.matrix = sp.csr_matrix((0, 0), dtype=np.float64)
+        self.delta = sp.csr_matrix((0, 0), dtype=np.float64)
+        self.counts = np.zeros(0, dtype=np.float64)
+        self.version = 0
+        self._lock = threading.Lock()
+
+    def build(self, saved_teams: Dict[str, Dict]):
+        """Index every saved team (as stored in saved_teams.json) with one sparse product"""
+        with self._lock:
+            for name, team in saved_teams.items():
+                self.teams[name] = self._columns([str(pid) for pid in team.get('player_ids', [])])
+            n = len(self.ids)
+            rows = np.repeat(np.arange(len(self.teams)), [len(cols) for cols in self.teams.values()])
+            cols = np.concatenate(list(self.teams.values())) if self.teams else np.zeros(0, dtype=np.int64)
+            teams = sp.csr_matrix((np.ones(len(cols)), (rows, cols)), shape=(len(self.teams), n))
+            self.matrix = (teams.T @ teams).tocsr()
+            self.delta = sp.csr_matrix((n, n), dtype=np.float64)
+            self.counts = self.matrix.diagonal()
+            self.version += 1
+        logger.info(f"Built co-occurrence index over {len(self.teams)} teams and {len(self.ids)} players")
+
+    def _columns(self, player_ids: Iterable[str]) -> np.ndarray:
+        for pid in player_ids:
+            if pid not in self.cols:
+                self.cols[pid] = len(self.ids)
+                self.ids.append(pid)
+        return np.unique(np.array([self.cols[pid] for pid in player_ids], dtype=np.int64))
+
+    @staticmethod
+    def _outer(cols: np.ndarray, n: int, sign: float = 1.0) -> sp.csr_matrix:
+        rows = np.repeat(cols, len(cols))
+        data = np.full(len(rows), sign)
+        return sp.csr_matrix((data, (rows, np.tile(cols, len(cols)))), shape=(n, n))
+
+    @staticmethod
+    def _grow(matrix: sp.csr_matrix, n: int) -> sp.csr_matrix:
+        """A new n x n matrix sharing ``matrix``'s entries, padded with empty rows.
+
+        Readers may still hold the old matrix outside the lock, so it is never
+        resized in place.
+        """
+        indptr = np.concatenate([matrix.indptr, np.full(n - matrix.shape[0], matrix.indptr[-1])])
+        return sp.csr_matrix((matrix.data, matrix.indices, indptr), shape=(n, n))
+
+    def _apply(self, cols: np.ndarray, sign: float):
+        n = len(self.ids)
+        if self.matrix.shape[0] < n:
+            self.matrix = self._grow(self.matrix, n)
+            self.delta = self._grow(self.delta, n)
+            self.counts = np.concatenate([self.counts, np.zeros(n - len(self.counts))])
+        self.delta = self.delta + self._outer(cols, n, sign)
+        self.counts[cols] += sign
+        if self.delta.nnz > self.FOLD_RATIO * max(self.matrix.nnz, 10000):
+            self.matrix = (self.matrix + self.delta).tocsr()
+            self.matrix.eliminate_zeros()
+            self.delta = sp.csr_matrix((n, n), dtype=np.float64)
+
+    def set_team(self, name: str, player_ids: List[str]):
+        """Add or replace a team's players"""
+        with self._lock:
+            cols = self._columns([str(pid) for pid in player_ids])
+            previous = self.teams.get(name)
+            if previous is not None:
+                self._apply(previous, -1.0)
+            self._apply(cols, 1.0)
+            self.teams[name] = cols
+            self.version += 1
+
+    def remove_team(self, name: str) -> bool:
+        with self._lock:
+            cols = self.teams.pop(name, None)
+            if cols is None:
+                return False
+            self._apply(cols, -1.0)
+            self.version += 1
+            return True
+
+    def cooccurrence(self) -> sp.csr_matrix:
+        """The full ``A.T @ A`` matrix, with pending updates included"""
+        return (self.matrix + self.delta).tocsr()
+
+    def score(self, squad_ids: List[str], limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Players that most often sit alongside the squad, best first, squad excluded"""
+        with self._lock:
+            matrix, delta, counts = self.matrix, self.delta, self.counts.copy()
+            squad = np.array([self.cols[pid] for pid in {str(p) for p in squad_ids} if pid in self.cols],
+                             dtype=np.int64)
+        if not len(squad) or not counts.any():
+            return []
+
+        inverse_norm = np.zeros(len(counts))
+        np.divide(1.0, np.sqrt(counts, where=counts > 0, out=np.zeros(len(counts))),
+                  out=inverse_norm, where=counts > 0)
+        # Weighted sum of the squad's rows: sparse row slices and one product
+        rows = matrix[squad] + delta[squad]
+        scores = np.asarray(rows.T @ inverse_norm[squad]).ravel() * inverse_norm
+        scores[squad] = 0.0
+
+        candidates = np.flatnonzero(scores > 1e-12)
+        order = candidates[np.lexsort((candidates, -scores[candidates]))]
+        if limit is not None:
+            order = order[:limit]
+        return [(self.ids[col], float(scores[col])) for col in order]
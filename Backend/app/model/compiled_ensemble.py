@@ -0,0 +1,192 @@
+import time
+import logging
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+import joblib
+import numpy as np
+from scipy.special import expit
+
+logger = logging.getLogger(__name__)
+
+FOREST_TYPES = ('RandomForestClassifier', 'ExtraTreesClassifier')
+BOOSTING_TYPES = ('GradientBoostingClassifier',)
+TREE_LEAF = -1
+
+
+class CompiledEnsemble:
+    """Tree ensemble flattened into contiguous NumPy node arrays.
+
+    Every tree's nodes live in one set of arrays: ``feature``,
+    ``threshold``, ``children`` (left/right pairs) and ``values``. Leaves
+    point to themselves, so evaluation moves every (row, tree) pair down one
+    level per step with array gathers until every pair sits on a leaf.
+    Inputs are rounded to float32 before comparing, and tree outputs are
+    summed in estimator order, both as sklearn does. So probabilities match
+    ``predict_proba`` bit for bit.
+
+    Inference needs only NumPy and SciPy's ``expit``, not sklearn. The
+    arrays pickle as plain ndarrays, so an artifact loaded through the
+    model registry is memory-mapped.
+    """
+
+    def __init__(self, kind: str, classes: np.ndarray, roots: np.ndarray, feature: np.ndarray,
+                 threshold: np.ndarray, children: np.ndarray, values: np.ndarray,
+                 init: np.ndarray, n_features: int, max_depth: int):
+        self.kind = kind                 # 'forest', 'binomial' or 'multinomial'
+        self.classes_ = classes
+        self.roots = roots               # (n_trees, n_outputs) root node per tree and output column
+        # Node arrays are laid out by slot: node n owns slots 2n (left) and 2n + 1 (right).
+        # feature/threshold are repeated in both slots; children holds each child's left slot
+        self.feature = feature
+        self.threshold = threshold
+        self.children = children
+        self.values = values             # (n_nodes, width) leaf outputs, already scaled
+        self.init = init                 # raw prediction before the first tree (boosting)
+        self.n_features_in_ = n_features
+        self.max_depth = max_depth
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature) // 2
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """Leaf node reached by every row in every tree, shape (n_rows, n_roots)"""
+        # sklearn casts inputs to float32 and compares them with float64 thresholds
+        X = np.ascontiguousarray(X, dtype=np.float32).astype(np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"Expected {self.n_features_in_} features, got shape {X.shape}")
+        flat = X.ravel()
+        n_roots = self.roots.size
+        # Pairs track a node's left slot, so the next one is children[slot + went_right]
+        slot = np.tile(2 * self.roots.ravel(), len(X))  # (row, tree) pairs, row-major
+        offsets = np.repeat(np.arange(len(X)) * X.shape[1], n_roots)
+        active = np.arange(len(slot))
+        current = slot
+        for depth in range(self.max_depth):
+            go_right = flat[offsets + self.feature[current]] > self.threshold[current]
+            advanced = self.children[current + go_right]
+            if depth % 4 == 3 and depth < self.max_depth - 1:
+                # Every few levels, drop the pairs that have settled on a leaf
+                slot[active] = advanced
+                moving = advanced != current
+                active, current, offsets = active[moving], advanced[moving], offsets[moving]
+                if not len(active):
+                    break
+            else:
+                current = advanced
+        slot[active] = current
+        return (slot // 2).reshape(len(X), n_roots)
+
+    def decision_function(self, X: np.ndarray) -> np.ndarray:
+        """Summed raw tree outputs (boosting) or summed leaf probabilities (forest)"""
+        leaves = self.apply(X)
+        n_rows, n_trees = len(leaves), self.roots.shape[0]
+        # Stack as (n_trees, n_rows, width) and add in tree order: a cumulative sum is
+        # strictly sequential, where np.sum may pair terms differently from sklearn
+        if self.kind == 'forest':
+            return np.cumsum(self.values[leaves.T], axis=0)[-1]
+        stages = self.values[leaves.reshape(n_rows, n_trees, -1).transpose(1, 0, 2), 0]
+        stages[0] += self.init
+        return np.cumsum(stages, axis=0)[-1]
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        raw = self.decision_function(X)
+        if self.kind == 'forest':
+            return raw / self.roots.shape[0]
+        if self.kind == 'binomial':
+            positive = expit(raw[:, 0])
+            return np.column_stack([1.0 - positive, positive])
+        exp = np.exp(raw - raw.max(axis=1, keepdims=True))
+        return exp / exp.sum(axis=1, keepdims=True)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+
+def _flatten(trees: List, outputs) -> Dict[str, np.ndarray]:
+    """Concatenate sklearn ``Tree`` objects, rebasing child indices"""
+    feature, threshold, children, values, roots = [], [], [], [], []
+    offset, depth = 0, 0
+    for tree in trees:
+        n = tree.node_count
+        nodes = np.arange(n)
+        leaf = tree.children_left == TREE_LEAF
+        feature.append(np.repeat(np.where(leaf, 0, tree.feature), 2))
+        threshold.append(np.repeat(np.where(leaf, np.inf, tree.threshold), 2))
+        children.append(2 * (np.column_stack([np.where(leaf, nodes, tree.children_left),
+                                              np.where(leaf, nodes, tree.children_right)]).ravel() + offset))
+        values.append(outputs(tree))
+        roots.append(offset)
+        depth = max(depth, tree.max_depth)
+        offset += n
+    return {
+        'roots': np.array(roots, dtype=np.intp),  # node numbers, not slots
+        'feature': np.concatenate(feature).astype(np.intp),
+        'threshold': np.concatenate(threshold).astype(np.float64),
+        'children': np.concatenate(children).astype(np.intp),
+        'values': np.concatenate(values).astype(np.float64),
+        'max_depth': depth + 1
+    }
+
+
+def _leaf_fractions(value: np.ndarray) -> np.ndarray:
+    """Class fractions per node, normalized like DecisionTreeClassifier.predict_proba.
+
+    scikit-learn before 1.4 stores weighted class counts in ``tree.value``
+    and normalizes them at prediction time; later versions store fractions.
+    """
+    normalizer = value.sum(axis=1, keepdims=True)
+    normalizer[normalizer == 0.0] = 1.0
+    return value / normalizer
+
+
+def compile_ensemble(model) -> CompiledEnsemble:
+    """Flatten a fitted sklearn forest or gradient boosting classifier"""
+    name = type(model).__name__
+    if name in FOREST_TYPES:
+        if model.n_outputs_ != 1:
+            raise TypeError("Only single-output forests can be compiled")
+        n_classes = len(model.classes_)
+        arrays = _flatten([est.tree_ for est in model.estimators_],
+                          lambda tree: _leaf_fractions(tree.value[:, 0, :n_classes]))
+        roots = arrays.pop('roots')[:, None]
+        return CompiledEnsemble('forest', np.asarray(model.classes_), roots, init=np.zeros(n_classes),
+                                n_features=model.n_features_in_, **arrays)
+
+    if name in BOOSTING_TYPES:
+        if model.init_ != 'zero' and type(model.init_).__name__ != 'DummyClassifier':
+            raise TypeError("Only constant init estimators can be compiled")
+        stages, k = model.estimators_.shape
+        rate = model.learning_rate
+        # Stage-major order: tree (stage, j) is root number stage * k + j
+        arrays = _flatten([model.estimators_[s, j].tree_ for s in range(stages) for j in range(k)],
+                          lambda tree: rate * tree.value[:, 0, :1])
+        roots = arrays.pop('roots').reshape(stages, k)
+        init = model._raw_predict_init(np.zeros((1, model.n_features_in_), dtype=np.float32))[0]
+        return CompiledEnsemble('binomial' if k == 1 else 'multinomial', np.asarray(model.classes_),
+                                roots, init=np.asarray(init, dtype=np.float64),
+                                n_features=model.n_features_in_, **arrays)
+
+    # XGBoost / LightGBM boosters would need their own dump parsers
+    raise TypeError(f"Cannot compile {name}; supported: {', '.join(FOREST_TYPES + BOOSTING_TYPES)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a trained tree ensemble into NumPy node arrays")
+    parser.add_argument('--model-file', required=True)
+    parser.add_argument('--out', required=True)
+    args = parser.parse_args()
+
+    model = joblib.load(args.model_file)
+    start = time.perf_counter()
+    compiled = compile_ensemble(model)
+    joblib.dump(compiled, Path(args.out))
+    logger.info(f"Compiled {type(model).__name__} into {compiled.n_nodes} nodes "
+                f"in {time.perf_counter() - start:.2f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,245 @@
+import os
+import json
+import logging
+import argparse
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from app.data.player_records import first_season_stats, record_version
+from app.model.features import PROFILE_COLUMNS, candidate_scores, compute_features
+from app.model.similarity_index import index_row, profile_inputs
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_DIR = Path('app/data/features')
+MANIFEST_FILE = 'manifest.json'
+
+# Record fields in player_database.csv naming; RosterAnalyzer derives the squad-relative features from them
+INPUT_COLUMNS = ['Age', 'Career_Games', 'Career_Minutes', 'Career_Goals', 'Career_Assists',
+                 'Career_Yellows', 'Career_Reds', 'Current_Value', 'Peak_Value']
+STORE_COLUMNS = INPUT_COLUMNS + PROFILE_COLUMNS + ['Candidate_Score']
+COLUMN_INDEX = {name: i for i, name in enumerate(STORE_COLUMNS)}
+
+
+def compute_rows(records: Sequence[Tuple[str, Dict]]) -> Tuple[List[str], np.ndarray]:
+    """Names and STORE_COLUMNS vectors for (player_id, record) pairs, in one vectorized pass"""
+    rows = [index_row(pid, record) for pid, record in records]
+    block = np.empty((len(rows), len(STORE_COLUMNS)), dtype=np.float64)
+    if not rows:
+        return [], block
+    inputs = profile_inputs(rows)
+    block[:, 0] = [row['age'] for row in rows]
+    for name in INPUT_COLUMNS[1:]:
+        block[:, COLUMN_INDEX[name]] = inputs[name]
+    profile = slice(COLUMN_INDEX[PROFILE_COLUMNS[0]], COLUMN_INDEX[PROFILE_COLUMNS[-1]] + 1)
+    block[:, profile] = compute_features(inputs, relative=False)
+
+    seasons = np.zeros((len(rows), 4))
+    parsed = np.ones(len(rows), dtype=bool)
+    for i, (_, record) in enumerate(records):
+        try:
+            seasons[i] = first_season_stats(record)
+        except Exception:
+            parsed[i] = False  # RecommendationEngine scores these at the floor
+    block[:, COLUMN_INDEX['Candidate_Score']] = np.where(parsed, candidate_scores(*seasons.T), 0.6)
+    return [row['name'] for row in rows], block
+
+
+class FeatureStore:
+    """Engineered feature vector of every known player, keyed by player id.
+
+    Each row holds the record fields the models read, the profile features
+    (PROFILE_COLUMNS) and the recommendation candidate score, all derived
+    from the player's own record. Every row keeps the ``record_version`` it
+    was computed from, so an upsert only recomputes records whose content
+    changed. ``data_version`` is bumped on every change.
+
+    Rows live in one row-major float64 matrix, so ``read`` is a single
+    gather by row index. ``save`` writes plain ``.npy`` files that ``load``
+    memory-maps copy-on-write: startup reads nothing up front, and forked
+    workers share the mapped pages.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.data_version = 0
+        self._lock = threading.Lock()
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.versions: List[str] = []
+        self.names: List[str] = []
+        self.matrix = np.zeros((capacity, len(STORE_COLUMNS)), dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, player_id) -> bool:
+        return str(player_id) in self.rows
+
+    def is_fresh(self, player_id: str, record: Dict) -> bool:
+        """Whether the stored row was computed from this exact record"""
+        row = self.rows.get(str(player_id))
+        return row is not None and self.versions[row] == record_version(record)
+
+    def upsert(self, player_id: str, record: Dict) -> bool:
+        """Compute and store one record; returns False when it was already current"""
+        return self.upsert_many([(player_id, record)]) == 1
+
+    def upsert_many(self, records: Iterable[Tuple[str, Dict]]) -> int:
+        """Recompute the records whose version changed; returns how many were"""
+        changed, versions = [], []
+        for pid, record in records:
+            pid = str(pid)
+            version = record_version(record)
+            row = self.rows.get(pid)
+            if row is None or self.versions[row] != version:
+                changed.append((pid, record))
+                versions.append(version)
+        if not changed:
+            return 0
+
+        names, block = compute_rows(changed)
+        with self._lock:
+            for (pid, _), name, version, vector in zip(changed, names, versions, block):
+                row = self.rows.get(pid)
+                if row is None:
+                    row = len(self.ids)
+                    if row == len(self.matrix):
+                        self._grow()
+                    self.ids.append(pid)
+                    self.names.append(name)
+                    self.versions.append(version)
+                    self.rows[pid] = row
+                self.matrix[row] = vector
+                self.names[row] = name
+                self.versions[row] = version
+            self.data_version += 1
+        return len(changed)
+
+    def _grow(self):
+        grown = np.zeros((max(2 * len(self.matrix), 1024), len(STORE_COLUMNS)), dtype=np.float64)
+        grown[:len(self.matrix)] = self.matrix
+        self.matrix = grown
+
+    def row_indices(self, player_ids: Iterable[str]) -> np.ndarray:
+        """Row of each player in order (-1 when unknown)"""
+        return np.array([self.rows.get(str(pid), -1) for pid in player_ids], dtype=np.int64)
+
+    def read(self, rows: np.ndarray, columns: Optional[List[str]] = None) -> np.ndarray:
+        """Stored vectors for ``rows`` (from row_indices), optionally only some columns"""
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) and (rows.min() < 0 or rows.max() >= len(self.ids)):
+            raise KeyError("Rows not in feature store")
+        if columns is None:
+            return self.matrix[rows]
+        return self.matrix[rows][:, [COLUMN_INDEX[name] for name in columns]]
+
+    def frame(self, player_ids: List[str], squad_size: Optional[int] = None) -> pd.DataFrame:
+        """Rows shaped like player_database.csv (the RosterAnalyzer input) for ``player_ids``.
+
+        ``Squad_Size`` defaults to the number of players asked for.
+        """
+        rows = self.row_indices(player_ids)
+        missing = [pid for pid, row in zip(player_ids, rows) if row < 0]
+        if missing:
+            raise KeyError(f"Players not in feature store: {missing}")
+        values = self.read(rows, INPUT_COLUMNS)
+        df = pd.DataFrame(values, columns=INPUT_COLUMNS)
+        # Ages and counts come back as integers, as in the CSV
+        counts = INPUT_COLUMNS[:-2]
+        df[counts] = df[counts].astype(np.int64)
+        df.insert(0, 'Name', [self.names[row] for row in rows])
+        df.insert(0, 'id', [self.ids[row] for row in rows])
+        df['Squad_Size'] = squad_size or len(rows)
+        return df
+
+    def profile(self, player_ids: List[str]) -> np.ndarray:
+        """PROFILE_COLUMNS for ``player_ids``, ready for compute_features(profile=...)"""
+        return self.read(self.row_indices(player_ids), PROFILE_COLUMNS)
+
+    def save(self, path: Path = DEFAULT_STORE_DIR):
+        """Write the store as .npy files plus a manifest, each replaced atomically"""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        arrays, data_version = self.arrays()
+        n = len(arrays['ids'])
+        manifest = {'columns': STORE_COLUMNS, 'rows': n, 'data_version': data_version,
+                    'saved_at': datetime.now().isoformat()}
+        for name, array in arrays.items():
+            tmp_path = path / f"{name}.tmp.npy"
+            np.save(tmp_path, array)
+            os.replace(tmp_path, path / f"{name}.npy")
+        # The manifest goes last, so a reader never sees it ahead of the arrays it describes
+        tmp_manifest = path / (MANIFEST_FILE + '.tmp')
+        tmp_manifest.write_text(json.dumps(manifest, indent=2))
+        os.replace(tmp_manifest, path / MANIFEST_FILE)
+        logger.info(f"Saved feature store with {n} players to {path}")
+
+    @classmethod
+    def load(cls, path: Path = DEFAULT_STORE_DIR, mmap_mode: Optional[str] = 'c') -> 'FeatureStore':
+        """Load a saved store; a missing or outdated one gives an empty store"""
+        store = cls()
+        path = Path(path)
+        if not (path / MANIFEST_FILE).exists():
+            return store
+        manifest = json.loads((path / MANIFEST_FILE).read_text())
+        if manifest['columns'] != STORE_COLUMNS:
+            logger.warning(f"Feature store at {path} has an outdated layout; every record will be recomputed")
+            return store
+
+        n = manifest['rows']
+        # Copy-on-write pages: updates stay private to this process until the next save
+        return cls.from_arrays(np.load(path / 'matrix.npy', mmap_mode=mmap_mode)[:n],
+                               np.load(path / 'ids.npy')[:n], np.load(path / 'versions.npy')[:n],
+                               np.load(path / 'names.npy')[:n], manifest['data_version'])
+
+    @classmethod
+    def from_arrays(cls, matrix: np.ndarray, ids: np.ndarray, versions: np.ndarray, names: np.ndarray,
+                    data_version: int) -> 'FeatureStore':
+        """A store over an existing matrix (memory-mapped or shared), without copying it"""
+        store = cls(capacity=0)
+        store.matrix = matrix
+        store.ids = ids.tolist()
+        store.versions = versions.tolist()
+        store.names = names.tolist()
+        store.rows = {pid: row for row, pid in enumerate(store.ids)}
+        store.data_version = data_version
+        return store
+
+    def arrays(self) -> Tuple[Dict[str, np.ndarray], int]:
+        """A consistent copy of the rows (as saved) and the data_version it reflects"""
+        with self._lock:
+            n = len(self.ids)
+            return ({'matrix': np.ascontiguousarray(self.matrix[:n]),
+                     'ids': np.array(self.ids, dtype=str), 'versions': np.array(self.versions, dtype=str),
+                     'names': np.array(self.names, dtype=str)}, self.data_version)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or refresh the per-player feature store")
+    parser.add_argument('--data-file', default='app/data/players.json')
+    parser.add_argument('--out', default=str(DEFAULT_STORE_DIR))
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    args = parser.parse_args()
+
+    from itertools import islice
+    from app.data.player_store import PlayerStore
+    store = FeatureStore.load(Path(args.out))
+    records = PlayerStore(Path(args.data_file)).items()
+    updated = 0
+    while True:
+        chunk = list(islice(records, args.chunk_size))
+        if not chunk:
+            break
+        updated += store.upsert_many(chunk)
+    store.save(Path(args.out))
+    logger.info(f"Recomputed {updated} of {len(store)} players")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,176 @@
+"""Career phase model features computed column-wise into one preallocated matrix.
+
+Single home for the formulas behind FeatureEngineering (roster_analyzer
+and the training notebook, Machine Learning Code/machine_learning.ipynb),
+CareerPhasePipeline (inference_pipeline), the similarity index
+profiles and the feature store. Every feature is written straight into its column of a float32
+matrix. Clipping and imputation are axis-wise NumPy reductions over the
+whole matrix. A DataFrame is built only when the caller asks for one.
+"""
+import warnings
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Column order the career phase model was trained on
+FEATURE_COLUMNS = [
+    'Minutes_per_Game', 'Goals_per_Game', 'Assists_per_Game',
+    'Goal_to_Assist_Ratio', 'Minutes_per_Goal', 'Card_Rate',
+    'Goal_Involvement', 'Minutes_Share', 'Value_Growth',
+    'Value_Stability', 'Value_to_Squad_Ratio', 'Playing_Time_Share'
+]
+# Features that describe the player alone (no squad context)
+PROFILE_COLUMNS = FEATURE_COLUMNS[:10]
+INPUT_COLUMNS = [
+    'Career_Minutes', 'Career_Games', 'Career_Goals', 'Career_Assists', 'Career_Yellows',
+    'Career_Reds', 'Current_Value', 'Peak_Value', 'Squad_Size'
+]
+CLIP_PERCENTILES = (1, 99)
+
+
+def _divide(a: np.ndarray, b: np.ndarray, out: np.ndarray) -> np.ndarray:
+    """a / b written into ``out``; 0 where b == 0 (FeatureEngineering.safe_divide)"""
+    out[...] = 0
+    np.divide(a, b, out=out, where=b != 0)
+    return out
+
+
+def compute_features(data, peak_value_mean: Optional[float] = None, relative: bool = True,
+                     dtype=np.float32, profile: Optional[np.ndarray] = None) -> np.ndarray:
+    """Raw features for every row of ``data`` (a DataFrame or dict of columns).
+
+    Columns follow FEATURE_COLUMNS, or PROFILE_COLUMNS when ``relative`` is
+    False (then ``Squad_Size`` is not needed). ``peak_value_mean`` scales
+    Value_to_Squad_Ratio; None uses this batch's mean, as FeatureEngineering
+    does. ``profile`` supplies already computed PROFILE_COLUMNS (e.g. from
+    the feature store) so only the squad-relative columns are derived here.
+    The matrix is column-major, so each feature is one contiguous write and
+    the per-column reductions read contiguous memory.
+    """
+    column = lambda name: np.asarray(data[name], dtype=np.float64)
+    games, minutes = column('Career_Games'), column('Career_Minutes')
+    current, peak = column('Current_Value'), column('Peak_Value')
+    width = len(FEATURE_COLUMNS) if relative else len(PROFILE_COLUMNS)
+    X = np.empty((len(games), width), dtype=dtype, order='F')
+    if profile is None:
+        _profile_features(data, games, minutes, current, peak, X)
+    else:
+        X[:, :len(PROFILE_COLUMNS)] = profile
+    if relative:
+        squad_size = column('Squad_Size')
+        if peak_value_mean is None:
+            peak_value_mean = peak.mean()
+        _divide(current, squad_size * peak_value_mean, X[:, 10])
+        _divide(minutes, squad_size * games * 90, X[:, 11])
+
+    finfo = np.finfo(dtype)
+    return np.nan_to_num(X, copy=False, nan=0.0, posinf=finfo.max, neginf=finfo.min)
+
+
+def _profile_features(data, games: np.ndarray, minutes: np.ndarray, current: np.ndarray,
+                      peak: np.ndarray, X: np.ndarray):
+    """PROFILE_COLUMNS of compute_features, written into the first columns of ``X``"""
+    column = lambda name: np.asarray(data[name], dtype=np.float64)
+    tmp = [np.empty(len(games)) for _ in range(3)]
+
+    # Per-game rates stay in float64 because the ratios below are built from them
+    minutes_pg = _divide(minutes, games, tmp[0])
+    goals_pg = _divide(column('Career_Goals'), games, tmp[1])
+    assists_pg = _divide(column('Career_Assists'), games, tmp[2])
+    np.nan_to_num(minutes_pg, copy=False)
+    np.nan_to_num(goals_pg, copy=False)
+    np.nan_to_num(assists_pg, copy=False)
+    X[:, 0], X[:, 1], X[:, 2] = minutes_pg, goals_pg, assists_pg
+    _divide(goals_pg, assists_pg, X[:, 3])
+    _divide(minutes_pg, goals_pg, X[:, 4])
+    _divide(column('Career_Yellows') + column('Career_Reds') * 3, games, X[:, 5])
+    np.add(goals_pg, assists_pg, out=X[:, 6], casting='same_kind')
+    _divide(minutes, 90 * games, X[:, 7])
+    _divide(current - peak, peak + 1, X[:, 8])
+    _divide(current, peak + 1, X[:, 9])
+
+
+def _percentiles(X: np.ndarray, percentiles) -> np.ndarray:
+    """np.percentile(X, percentiles, axis=0) ('linear' method) from one partition of every column"""
+    n = len(X)
+    positions = np.asarray(percentiles, dtype=np.float64) / 100 * (n - 1)
+    below = np.floor(positions).astype(np.intp)
+    above = np.minimum(below + 1, n - 1)
+    part = np.partition(X, np.unique(np.concatenate([below, above])), axis=0)
+    a, b = part[below].astype(np.float64), part[above].astype(np.float64)
+    t = (positions - below)[:, None]
+    # NumPy's _lerp: interpolate from whichever end is nearer
+    return np.where(t >= 0.5, b - (b - a) * (1 - t), a + (b - a) * t)
+
+
+def clip_bounds(X: np.ndarray, percentiles: Tuple[float, float] = CLIP_PERCENTILES) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-column lower and upper clip bounds, one reduction for the whole matrix.
+
+    Non-finite cells are left out; they are filled in by clean_features.
+    """
+    finite = np.isfinite(X)
+    if not len(X):
+        low, high = np.full(X.shape[1], -np.inf), np.full(X.shape[1], np.inf)
+    elif finite.all():
+        low, high = _percentiles(X, percentiles)
+    else:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns
+            low, high = np.nanpercentile(np.where(finite, X, np.nan), percentiles, axis=0)
+        # A column with no finite values is not clipped
+        low, high = np.where(np.isnan(low), -np.inf, low), np.where(np.isnan(high), np.inf, high)
+    return low.astype(X.dtype), high.astype(X.dtype)
+
+
+def impute_medians(X: np.ndarray) -> np.ndarray:
+    """Per-column medians ignoring non-finite values (0 for a column with none)"""
+    bad = ~np.isfinite(X)
+    if not bad.any():
+        return np.median(X, axis=0).astype(X.dtype)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)  # all-NaN columns
+        return np.nan_to_num(np.nanmedian(np.where(bad, np.nan, X), axis=0)).astype(X.dtype)
+
+
+def clean_features(X: np.ndarray, low: np.ndarray, high: np.ndarray,
+                   medians: Optional[np.ndarray] = None) -> np.ndarray:
+    """Clip every column to [low, high], then fill non-finite cells, in place.
+
+    ``medians`` defaults to the medians of the clipped matrix itself
+    (FeatureEngineering.process_features); pass fitted ones at inference.
+    """
+    np.clip(X, low, high, out=X)
+    bad = ~np.isfinite(X)
+    if bad.any():
+        if medians is None:
+            medians = impute_medians(X)
+        X[bad] = np.broadcast_to(np.asarray(medians, dtype=X.dtype), X.shape)[bad]
+    return X
+
+
+def candidate_scores(appearances, minutes, goals, assists) -> np.ndarray:
+    """RecommendationEngine's candidate score from one season's stats.
+
+    Each stat is scored against a full season (38 games, 3420 minutes,
+    20 goals, 15 assists), capped at 1, weighted 0.3/0.3/0.2/0.2 and kept
+    within [0.6, 0.95].
+    """
+    total = (np.minimum(1.0, np.asarray(appearances, dtype=np.float64) / 38) * 0.3 +
+             np.minimum(1.0, np.asarray(minutes, dtype=np.float64) / 3420) * 0.3 +
+             np.minimum(1.0, np.asarray(goals, dtype=np.float64) / 20) * 0.2 +
+             np.minimum(1.0, np.asarray(assists, dtype=np.float64) / 15) * 0.2)
+    return np.maximum(0.6, np.minimum(0.95, total))
+
+
+def transform(data, as_frame: bool = False, dtype=np.float32):
+    """FeatureEngineering.transform: features clipped and imputed with this batch's own statistics"""
+    X = compute_features(data, dtype=dtype)
+    X = clean_features(X, *clip_bounds(X))
+    if as_frame:
+        return to_frame(X, index=getattr(data, 'index', None))
+    return X
+
+
+def to_frame(X: np.ndarray, index=None) -> pd.DataFrame:
+    return pd.DataFrame(X, columns=FEATURE_COLUMNS[:X.shape[1]], index=index)
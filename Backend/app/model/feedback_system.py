@@ -6,13 +6,20 @@ from pathlib import Path
 import json
 from typing import Dict, List, Union
 import logging
+from app.model.feedback_writer import FeedbackWriter
+
+# Append-only log of queued phase predictions, next to the feedback file
+PREDICTION_LOG = "phase_predictions.jsonl"
 
 class FeedbackSystem:
-    def __init__(self, feedback_file: str = "feedback_data.json"):
+    def __init__(self, feedback_file: str = "feedback_data.json", writer: FeedbackWriter = None):
         self.feedback_dir = Path("app/data/feedback")
         self.feedback_file = self.feedback_dir / feedback_file
+        self.prediction_log = self.feedback_dir / PREDICTION_LOG
         self.feedback_data = self._load_feedback_data()
         self._setup_logging()
+        # Background writer for queue_phase_predictions
+        self.writer = writer or FeedbackWriter(self.prediction_log)
         
     def _setup_logging(self):
         """Setup logging for feedback system"""
@@ -120,9 +127,66 @@ class FeedbackSystem:
             self.logger.error(f"Error recording phase prediction feedback: {str(e)}")
             return False
 
+    def queue_phase_predictions(
+        self,
+        player_ids: List[str],
+        predicted_phases: List[str],
+        performance_metrics: List[Dict]
+    ) -> int:
+        """Queue career phase predictions for the background writer; returns how many were accepted.
+
+        Nothing is written on the caller's thread. Entries land in the
+        prediction log and are merged into ``phase_predictions`` when
+        feedback is summarized or analyzed.
+        """
+        timestamp = datetime.now().isoformat()
+        entries = [
+            {
+                "player_id": player_id,
+                "timestamp": timestamp,
+                "predicted_phase": phase,
+                "actual_phase": None,  # To be updated later
+                "performance_metrics": metrics,
+                "prediction_accuracy": 0
+            }
+            for player_id, phase, metrics in zip(player_ids, predicted_phases, performance_metrics)
+        ]
+        return self.writer.submit(entries)
+
+    def _merge_prediction_log(self):
+        """Fold prediction log lines written since the last merge into feedback_data"""
+        metadata = self.feedback_data["metadata"]
+        offset = metadata.get("prediction_log_offset", 0)
+        try:
+            if not self.prediction_log.exists():
+                return
+            if self.prediction_log.stat().st_size < offset:
+                offset = 0  # log was rotated
+            with open(self.prediction_log, 'rb') as f:
+                f.seek(offset)
+                data = f.read()
+        except OSError as e:
+            self.logger.error(f"Error reading prediction log: {str(e)}")
+            return
+
+        # A trailing partial line is still being written; pick it up next time
+        complete = data[:data.rfind(b'\n') + 1]
+        predictions = self.feedback_data["phase_predictions"]
+        for line in complete.splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                self.logger.error("Skipping malformed prediction log line")
+                continue
+            predictions.setdefault(str(entry.pop("player_id")), []).append(entry)
+        if complete:
+            metadata["prediction_log_offset"] = offset + len(complete)
+            self._update_metadata()
+
     def analyze_feedback_trends(self) -> Dict:
         """Analyze feedback data to identify trends and areas for improvement"""
         try:
+            self._merge_prediction_log()
             analysis = {
                 "recommendation_success_rate": self._calculate_recommendation_success_rate(),
                 "phase_prediction_accuracy": self._calculate_phase_prediction_accuracy(),
@@ -189,6 +253,7 @@ class FeedbackSystem:
 
     def get_feedback_summary(self) -> Dict:
         """Get summary of feedback data"""
+        self._merge_prediction_log()
         return {
             "total_entries": self.feedback_data["metadata"]["total_feedback_entries"],
             "last_updated": self.feedback_data["metadata"]["last_updated"],
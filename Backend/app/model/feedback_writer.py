@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class FeedbackWriter:
+    """Bounded queue of feedback entries drained by one background thread.
+
+    ``submit`` only enqueues, so callers never touch the file. The writer
+    thread takes whatever is waiting, up to ``batch_size`` entries, and
+    appends it to a JSON-lines file in a single ``O_APPEND`` write. So the
+    cost of logging does not grow with the history already on disk, and
+    several writers can share one file.
+
+    When the queue is full, ``submit`` waits up to ``put_timeout`` seconds
+    for room (backpressure). Entries that still do not fit are dropped and
+    counted rather than slowing the request further.
+    """
+
+    def __init__(self, path: Path, max_queue: int = 10000, batch_size: int = 1000,
+                 put_timeout: float = 0.01):
+        # Resolved now: the writer thread must not follow later working directory changes
+        self.path = Path(path).absolute()
+        self.batch_size = batch_size
+        self.put_timeout = put_timeout
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._stats = {'submitted': 0, 'written': 0, 'dropped': 0, 'batches': 0, 'errors': 0,
+                       'max_depth': 0, 'write_seconds': 0.0}
+
+    def _ensure_started(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._drain, name='feedback-writer', daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+
+    def submit(self, entries: List[Dict]) -> int:
+        """Queue entries for writing; returns how many were accepted"""
+        if not entries:
+            return 0
+        self._ensure_started()
+        accepted = 0
+        for entry in entries:
+            try:
+                if accepted == 0 or self._queue.full():
+                    # Wait for room once per call; the rest of a rejected call is dropped at once
+                    self._queue.put(entry, timeout=self.put_timeout)
+                else:
+                    self._queue.put_nowait(entry)
+            except queue.Full:
+                break
+            accepted += 1
+        dropped = len(entries) - accepted
+        self._stats['submitted'] += len(entries)
+        self._stats['max_depth'] = max(self._stats['max_depth'], self._queue.qsize())
+        if dropped:
+            self._stats['dropped'] += dropped
+            logger.warning(f"Feedback queue full; dropped {dropped} entries")
+        return accepted
+
+    def _drain(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            entries = [entry for entry in batch if entry is not None]
+            try:
+                if entries:
+                    self._write(entries)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+            if len(entries) < len(batch):
+                return  # close() sentinel
+
+    def _write(self, entries: List[Dict]):
+        start = time.perf_counter()
+        try:
+            data = ''.join(json.dumps(entry, default=str) + '\n' for entry in entries).encode('utf-8')
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+            finally:
+                os.close(fd)
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f"Error writing feedback entries: {str(e)}")
+            return
+        self._stats['written'] += len(entries)
+        self._stats['batches'] += 1
+        self._stats['write_seconds'] += time.perf_counter() - start
+
+    def flush(self):
+        """Block until everything queued so far has been written"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.join()
+
+    def stats(self) -> Dict:
+        return {**self._stats, 'queued': self._queue.qsize(), 'capacity': self._queue.maxsize}
+
+    def close(self):
+        """Write what is queued and stop the writer thread"""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self._thread = None
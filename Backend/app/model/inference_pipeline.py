@@ -0,0 +1,185 @@
+import time
+import logging
+import argparse
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.preprocessing import StandardScaler
+
+from app.data.player_records import PHASES, PHASE_AGE_EDGES
+from app.data.snapshot import load_snapshot_frame
+from app.model import features
+from app.model.features import FEATURE_COLUMNS
+from app.model.model_registry import CAREER_PHASE_PIPELINE, ModelRegistry, registry
+
+logger = logging.getLogger(__name__)
+
+
+class CareerPhasePipeline:
+    """FeatureEngineering, clipping, imputation, scaling and the model as one artifact.
+
+    Everything that used to be derived from the request batch is fitted once
+    on the training data: the 1st/99th percentile clip bounds, the
+    imputation medians, the StandardScaler and the mean peak value behind
+    ``Value_to_Squad_Ratio``. ``transform`` only applies those numbers, so
+    a player's prediction does not depend on who else is in the batch, and
+    a batch of one works.
+
+    The app serves only this artifact (career_phase_pipeline.joblib). A
+    bare estimator such as the notebook's career_phase_model.joblib is not
+    served until ``main`` republishes it with ``--model-file``.
+    """
+
+    def __init__(self, model=None):
+        self.model = model
+        self.peak_value_mean = None
+        self.clip_low = None
+        self.clip_high = None
+        self.medians = None
+        self.scaler = None
+
+    @property
+    def is_fitted(self) -> bool:
+        return self.scaler is not None
+
+    def engineer(self, data: pd.DataFrame, profile: Optional[np.ndarray] = None) -> np.ndarray:
+        """Raw features, columns in FEATURE_COLUMNS order.
+
+        ``profile`` holds precomputed PROFILE_COLUMNS for the rows (see
+        app.model.feature_store); then only the squad-relative features are derived.
+        """
+        return features.compute_features(data, peak_value_mean=self.peak_value_mean, profile=profile)
+
+    def _clean(self, raw: np.ndarray) -> np.ndarray:
+        return features.clean_features(raw, self.clip_low, self.clip_high, self.medians)
+
+    def fit(self, data: pd.DataFrame, labels: Optional[np.ndarray] = None) -> 'CareerPhasePipeline':
+        """Fit the preprocessing on training rows; also fit the model when labels are given"""
+        self.peak_value_mean = float(np.nanmean(np.asarray(data['Peak_Value'], dtype=np.float64)))
+        raw = self.engineer(data)
+        self.clip_low, self.clip_high = features.clip_bounds(raw)
+        self.medians = features.impute_medians(np.clip(raw, self.clip_low, self.clip_high))
+        X = self._clean(raw)
+        self.scaler = StandardScaler().fit(X)
+
+        if labels is not None:
+            if self.model is None:
+                self.model = RandomForestClassifier(n_estimators=200, random_state=42)
+            self.model.fit(self.scaler.transform(X), labels)
+        return self
+
+    def features(self, data: pd.DataFrame, profile: Optional[np.ndarray] = None) -> np.ndarray:
+        """Clipped and imputed features (before scaling)"""
+        return self._clean(self.engineer(data, profile))
+
+    def scale(self, features: np.ndarray) -> np.ndarray:
+        return (features - self.scaler.mean_) / self.scaler.scale_
+
+    def transform(self, data: pd.DataFrame) -> np.ndarray:
+        """Model input for ``data``; rows are independent of each other"""
+        return self.scale(self.features(data))
+
+    def predict_proba(self, data: pd.DataFrame) -> np.ndarray:
+        return self.model.predict_proba(self.transform(data))
+
+    def predict(self, data: pd.DataFrame) -> np.ndarray:
+        return self.model.classes_[self.predict_proba(data).argmax(axis=1)]
+
+
+def age_labels(ages) -> np.ndarray:
+    """Career phase class (index into PHASES) from the age brackets"""
+    return np.searchsorted(PHASE_AGE_EDGES, np.asarray(ages), side='right')
+
+
+def career_phase_labels(data: pd.DataFrame) -> np.ndarray:
+    """Career phase class per row, by the rule the deployed model was trained on.
+
+    Vectorized ``CareerPhaseClassifier.determine_phase`` from
+    ``Machine Learning Code/machine_learning.ipynb``: age, career games and
+    the value trend (Current_Value / (Peak_Value + 1), min-max scaled to
+    [-1, 1] over the training rows). The notebook first rescaled the
+    normalized columns of its cleaned CSV; player_database.csv holds raw
+    ages and games, so they are used as they are. Rows missing a value
+    are left out of the scaling and get the neutral trend 0.
+    """
+    age = np.asarray(data['Age'], dtype=np.float64)
+    games = np.asarray(data['Career_Games'], dtype=np.float64)
+    trend = np.asarray(data['Current_Value'], dtype=np.float64) / (np.asarray(data['Peak_Value'], dtype=np.float64) + 1)
+    known = np.isfinite(trend)
+    low, high = (trend[known].min(), trend[known].max()) if known.any() else (0.0, 0.0)
+    trend = 2 * (trend - low) / (high - low) - 1 if high > low else np.zeros_like(trend)
+    trend[~known] = 0.0
+    score = games / 200 * (1 + trend)
+
+    breakthrough, development, peak = age < 21, (age >= 21) & (age < 24), (age >= 24) & (age < 29)
+    return np.select(
+        [games < 50,
+         breakthrough,
+         development & (score < 0.2), development & (score < 0.5), development,
+         peak & (score < 0.3), peak & (trend < -0.2), peak,
+         (score > 0.6) & (trend > 0.2)],
+        [0,
+         np.where(score < 0.3, 0, 1),
+         0, 1, 2,
+         1, 3, 2,
+         2],
+        default=3
+    )
+
+
+def phase_classifier() -> GradientBoostingClassifier:
+    """The estimator the notebook deployed: the best of its RF/GB/XGBoost/LightGBM comparison"""
+    return GradientBoostingClassifier(n_estimators=500, max_depth=8, learning_rate=0.05, subsample=0.8,
+                                      random_state=42)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit and publish the career phase inference pipeline")
+    parser.add_argument('--data', required=True, help="Training CSV shaped like player_database.csv, or a snapshot directory of one")
+    parser.add_argument('--label-column', default=None,
+                        help="Phase class column (0-3 or phase name); defaults to the notebook's "
+                             "career_phase_labels rule")
+    parser.add_argument('--model-file', default=None,
+                        help="Wrap an already trained estimator (e.g. the notebook's career_phase_model.joblib) "
+                             "instead of training a new one")
+    parser.add_argument('--model-dir', default=None, help="Defaults to MODEL_DIR / app/model")
+    parser.add_argument('--compile', action='store_true',
+                        help="Serve the ensemble from flattened NumPy node arrays (app.model.compiled_ensemble)")
+    args = parser.parse_args()
+
+    data_path = Path(args.data)
+    data = load_snapshot_frame(data_path) if data_path.is_dir() else pd.read_csv(data_path)
+    models = ModelRegistry(Path(args.model_dir)) if args.model_dir else registry
+
+    pipeline = CareerPhasePipeline()
+    if args.model_file:
+        import joblib
+        pipeline.model = joblib.load(args.model_file)
+        pipeline.fit(data)
+    else:
+        labels = data[args.label_column] if args.label_column else career_phase_labels(data)
+        labels = np.array([PHASES.index(v) if isinstance(v, str) else int(v) for v in labels])
+        pipeline.model = phase_classifier()
+        pipeline.fit(data, labels)
+    model_type = type(pipeline.model).__name__
+    if args.compile:
+        from app.model.compiled_ensemble import compile_ensemble
+        pipeline.model = compile_ensemble(pipeline.model)
+
+    path = models.publish(CAREER_PHASE_PIPELINE, pipeline, {
+        'version': time.strftime('%Y%m%d%H%M%S'),
+        'trained_rows': len(data),
+        'source': str(data_path),
+        'model': model_type,
+        'compiled': args.compile,
+        'features': FEATURE_COLUMNS
+    })
+    logger.info(f"Published career phase pipeline fitted on {len(data)} rows to {path}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import shutil
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+from app.data.snapshot import load_snapshot, load_snapshot_frame, optimize_dtypes, read_manifest, write_snapshot
+from app.model.feature_store import FeatureStore
+from app.model.model_registry import CAREER_PHASE_PIPELINE, ModelRegistry
+from app.model.roster_analyzer import phase_results
+from app.model.shared_corpus import CorpusHandle, SharedCorpus, attach
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_OUTPUT_DIR = Path('app/data/league_phases')
+LATEST_FILE = 'LATEST'
+# Squad_Size given to stored players, who are scored outside any squad
+DEFAULT_SQUAD_SIZE = 25
+
+_worker_pipeline = None
+
+
+def _init_worker(model_dir: str):
+    """Load the pipeline once per worker process; every chunk it scores reuses it"""
+    global _worker_pipeline
+    _worker_pipeline = ModelRegistry(Path(model_dir)).get(CAREER_PHASE_PIPELINE)
+
+
+def score_chunk(chunk: pd.DataFrame, pipeline=None, profile=None) -> pd.DataFrame:
+    """analyze_team's results for one chunk of rows, without feedback logging"""
+    pipeline = pipeline or _worker_pipeline
+    features = pipeline.features(chunk, profile)
+    probabilities = pipeline.model.predict_proba(pipeline.scale(features))
+    results = phase_results(chunk, features, probabilities, pipeline.model.classes_)
+    if 'id' in chunk.columns:
+        results.insert(0, 'id', chunk['id'].astype(str))
+    return results
+
+
+def score_league(data: pd.DataFrame, model_dir: Optional[Path] = None, workers: Optional[int] = None,
+                 chunk_size: int = 5000) -> pd.DataFrame:
+    """Career phase and recommendation for every row of ``data`` (shaped like player_database.csv).
+
+    Chunks are scored across a pool of worker processes, each loading the
+    published pipeline once. ``workers=1`` scores in this process.
+    """
+    if not len(data):
+        raise ValueError("No players to score")
+    models = ModelRegistry(model_dir)
+    workers = workers or os.cpu_count() or 1
+    chunks = [data.iloc[start:start + chunk_size] for start in range(0, len(data), chunk_size)]
+
+    if workers == 1:
+        pipeline = models.get(CAREER_PHASE_PIPELINE)
+        parts = [score_chunk(chunk, pipeline) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(str(models.model_dir),)) as executor:
+            parts = list(executor.map(score_chunk, chunks))
+    return pd.concat(parts, ignore_index=True)
+
+
+def _score_store_rows(store: FeatureStore, start: int, stop: int, squad_size: int,
+                      pipeline=None) -> pd.DataFrame:
+    ids = store.ids[start:stop]
+    return score_chunk(store.frame(ids, squad_size), pipeline, store.profile(ids))
+
+
+def _score_shared_rows(task: Tuple[CorpusHandle, int, int, int]) -> pd.DataFrame:
+    handle, start, stop, squad_size = task
+    return _score_store_rows(attach(handle), start, stop, squad_size)
+
+
+def score_store(store: FeatureStore, model_dir: Optional[Path] = None, workers: Optional[int] = None,
+                chunk_size: int = 5000, squad_size: int = DEFAULT_SQUAD_SIZE,
+                corpus: Optional[SharedCorpus] = None) -> pd.DataFrame:
+    """score_league for every player in a feature store, reusing its stored profile features.
+
+    Worker processes are sent a CorpusHandle and row ranges only: the rows
+    are published once to shared memory (into ``corpus`` when given, so a
+    long-lived publisher can reuse an unchanged generation) and each worker
+    attaches to them by name.
+    """
+    if not len(store):
+        raise ValueError("No players to score")
+    models = ModelRegistry(model_dir)
+    workers = workers or os.cpu_count() or 1
+    ranges = [(start, min(start + chunk_size, len(store))) for start in range(0, len(store), chunk_size)]
+
+    if workers == 1:
+        pipeline = models.get(CAREER_PHASE_PIPELINE)
+        return pd.concat([_score_store_rows(store, start, stop, squad_size, pipeline) for start, stop in ranges],
+                         ignore_index=True)
+
+    shared = corpus or SharedCorpus()
+    try:
+        handle = shared.publish(store)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(str(models.model_dir),)) as executor:
+            parts = list(executor.map(_score_shared_rows,
+                                      [(handle, start, stop, squad_size) for start, stop in ranges]))
+    finally:
+        if corpus is None:
+            shared.close()
+    return pd.concat(parts, ignore_index=True)
+
+
+def publish_results(results: pd.DataFrame, out_dir: Path = DEFAULT_OUTPUT_DIR,
+                    metadata: Optional[Dict] = None, keep: int = 2) -> Path:
+    """Write a scoring run as a new Arrow snapshot and point LATEST at it.
+
+    Readers always open a complete run: the run directory is written first
+    and LATEST is replaced atomically afterwards. Runs older than the last
+    ``keep`` are removed; readers that already mapped them keep their pages.
+    """
+    out_dir = Path(out_dir)
+    version = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+    run_dir = out_dir / version
+    table = optimize_dtypes(results, categorical=['Career_Phase', 'Recommendation'])
+    write_snapshot(table, run_dir, fmt='arrow', partition_by='Career_Phase',
+                   source='league_scoring', metadata=metadata)
+
+    tmp_latest = out_dir / (LATEST_FILE + '.tmp')
+    tmp_latest.write_text(json.dumps({'version': version}))
+    os.replace(tmp_latest, out_dir / LATEST_FILE)
+
+    runs = sorted(path for path in out_dir.iterdir() if path.is_dir())
+    for old in runs[:-keep]:
+        shutil.rmtree(old, ignore_errors=True)
+    logger.info(f"Published league scoring run {version} with {len(results)} players to {run_dir}")
+    return run_dir
+
+
+def latest_run(out_dir: Path = DEFAULT_OUTPUT_DIR) -> Path:
+    """Directory of the most recently published run"""
+    out_dir = Path(out_dir)
+    latest = out_dir / LATEST_FILE
+    if not latest.exists():
+        raise FileNotFoundError(f"No league scoring run published in {out_dir}")
+    return out_dir / json.loads(latest.read_text())['version']
+
+
+def read_league_phases(out_dir: Path = DEFAULT_OUTPUT_DIR, phase: Optional[str] = None,
+                       offset: int = 0, limit: int = 100) -> Dict:
+    """One page of the latest run, read from its memory-mapped Arrow files.
+
+    ``phase`` maps only that phase's partition.
+    """
+    if offset < 0 or limit <= 0:
+        raise ValueError(f"Invalid page: offset must be >= 0 and limit > 0, got {offset} and {limit}")
+    run_dir = latest_run(out_dir)
+    manifest = read_manifest(run_dir)
+    table = load_snapshot(run_dir, partitions=[phase] if phase else None)
+    page = table.slice(offset, limit).to_pandas()
+    return {
+        'version': run_dir.name,
+        'created_at': manifest['created_at'],
+        'metadata': manifest.get('metadata', {}),
+        'total': table.num_rows,
+        'players': page.to_dict(orient='records')
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score career phases for the whole league")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--data', help="CSV shaped like player_database.csv, or a snapshot directory of one")
+    source.add_argument('--store', help="Saved feature store directory (see app.model.feature_store)")
+    parser.add_argument('--model-dir', default=None, help="Defaults to MODEL_DIR / app/model")
+    parser.add_argument('--out', default=str(DEFAULT_OUTPUT_DIR))
+    parser.add_argument('--workers', type=int, default=None, help="Defaults to all cores")
+    parser.add_argument('--chunk-size', type=int, default=5000)
+    parser.add_argument('--squad-size', type=int, default=DEFAULT_SQUAD_SIZE, help="Used with --store")
+    args = parser.parse_args()
+    model_dir = Path(args.model_dir) if args.model_dir else None
+
+    start = time.perf_counter()
+    if args.store:
+        data_path = Path(args.store)
+        results = score_store(FeatureStore.load(data_path), model_dir, workers=args.workers,
+                              chunk_size=args.chunk_size, squad_size=args.squad_size)
+    else:
+        data_path = Path(args.data)
+        data = load_snapshot_frame(data_path) if data_path.is_dir() else pd.read_csv(data_path)
+        results = score_league(data, model_dir, workers=args.workers, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - start
+    metadata = {'source': str(data_path), 'model': ModelRegistry(model_dir).metadata(CAREER_PHASE_PIPELINE),
+                'rows': len(results), 'seconds': round(elapsed, 2)}
+    publish_results(results, Path(args.out), metadata)
+    logger.info(f"Scored {len(results)} players in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
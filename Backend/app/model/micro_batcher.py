@@ -0,0 +1,130 @@
+import time
+import asyncio
+import logging
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Gathers rows from concurrent requests into one vectorized model call.
+
+    ``submit`` queues a request's rows and waits. A single collector task
+    takes the first waiting request and then keeps taking more until
+    ``max_wait_ms`` has passed or ``max_batch_size`` rows are gathered. It
+    runs ``predict`` once on the stacked rows in ``executor`` and hands each
+    caller its slice of the output. Requests that arrive while a batch is
+    running form the next batch, so batches grow with load and an idle
+    server adds at most ``max_wait_ms`` of latency.
+
+    Extra ``submit`` arguments are passed on to ``predict`` after the rows,
+    and only requests with equal arguments share a call. A caller can pin
+    the model it scaled its rows for, so a reload never mixes generations
+    in one batch.
+
+    ``predict`` runs in a single worker thread by default. Pass a process
+    pool executor (with a picklable ``predict`` and arguments) to keep the
+    model off the event loop's interpreter entirely.
+    """
+
+    def __init__(self, predict: Callable[[np.ndarray], np.ndarray], max_batch_size: int = 512,
+                 max_wait_ms: float = 2.0, executor: Optional[Executor] = None):
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.executor = executor or ThreadPoolExecutor(max_workers=1, thread_name_prefix='micro-batcher')
+        self._queue: Optional[asyncio.Queue] = None
+        self._collector: Optional[asyncio.Task] = None
+        self._stats = {'requests': 0, 'rows': 0, 'batches': 0, 'errors': 0, 'predict_seconds': 0.0}
+
+    def _ensure_started(self):
+        # The queue and collector belong to the event loop that first submits
+        if self._collector is None or self._collector.done():
+            self._queue = asyncio.Queue()
+            self._collector = asyncio.get_running_loop().create_task(self._collect())
+
+    async def submit(self, rows: np.ndarray, *args) -> np.ndarray:
+        """Model output for ``rows`` (2-D), computed in a shared batch"""
+        rows = np.atleast_2d(rows)
+        if not len(rows):
+            return self.predict(rows, *args)
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((rows, future, args))
+        return await future
+
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            size = len(batch[0][0])
+            deadline = loop.time() + self.max_wait
+            while size < self.max_batch_size:
+                if self._queue.empty():
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                else:
+                    item = self._queue.get_nowait()
+                batch.append(item)
+                size += len(item[0])
+            await self._run(batch)
+
+    async def _run(self, batch: List[Tuple[np.ndarray, asyncio.Future, tuple]]):
+        # One model call per distinct argument tuple, in arrival order
+        groups: List[Tuple[tuple, List[Tuple[np.ndarray, asyncio.Future]]]] = []
+        for rows, future, args in batch:
+            if future.done():  # drop cancelled callers
+                continue
+            group = next((items for key, items in groups if key == args), None)
+            if group is None:
+                groups.append((args, [(rows, future)]))
+            else:
+                group.append((rows, future))
+        for args, items in groups:
+            await self._predict(items, args)
+
+    async def _predict(self, batch: List[Tuple[np.ndarray, asyncio.Future]], args: tuple):
+        stacked = np.concatenate([rows for rows, _ in batch])
+        start = time.perf_counter()
+        try:
+            output = await asyncio.get_running_loop().run_in_executor(self.executor, self.predict, stacked, *args)
+        except Exception as e:
+            self._stats['errors'] += 1
+            logger.error(f"Error in batched prediction: {str(e)}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        self._stats['predict_seconds'] += time.perf_counter() - start
+        self._stats['requests'] += len(batch)
+        self._stats['rows'] += len(stacked)
+        self._stats['batches'] += 1
+
+        offset = 0
+        for rows, future in batch:
+            if not future.done():
+                future.set_result(output[offset:offset + len(rows)])
+            offset += len(rows)
+
+    def stats(self) -> Dict:
+        batches = max(self._stats['batches'], 1)
+        return {**self._stats,
+                'mean_batch_rows': self._stats['rows'] / batches,
+                'mean_batch_requests': self._stats['requests'] / batches}
+
+    async def close(self):
+        if self._collector is not None:
+            self._collector.cancel()
+            try:
+                await self._collector
+            except asyncio.CancelledError:
+                pass
+            self._collector = None
@@ -0,0 +1,157 @@
+import os
+import json
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import joblib
+
+logger = logging.getLogger(__name__)
+
+# Directory holding the trained artifacts; override with the environment variable
+MODEL_DIR_ENV = 'MODEL_DIR'
+DEFAULT_MODEL_DIR = Path(__file__).resolve().parent
+
+# The notebook's bare estimator. The app no longer serves it directly: wrap it into the pipeline with
+# python -m app.model.inference_pipeline --data player_database.csv --model-file career_phase_model.joblib
+CAREER_PHASE_MODEL = 'career_phase_model.joblib'
+CAREER_PHASE_PIPELINE = 'career_phase_pipeline.joblib'
+# Artifacts the app itself serves; reload also accepts registered and already loaded names
+KNOWN_ARTIFACTS = (CAREER_PHASE_MODEL, CAREER_PHASE_PIPELINE)
+
+
+class ModelRegistry:
+    """Process-wide home for trained model artifacts.
+
+    Each artifact is loaded once, on first use, and shared by every caller.
+    Loads use joblib's ``mmap_mode`` so plain ndarray payloads stay
+    file-backed and forked or spawned workers share those pages instead of
+    holding private copies. (sklearn's Cython trees copy their node arrays
+    while unpickling, so for them the saving is the single shared load.)
+
+    ``reload`` loads the new artifact before swapping it in under the lock,
+    so readers see either the old model or the new one and a failed reload
+    keeps the old model serving. Callers should fetch the model with ``get``
+    per call rather than holding on to it, so a reload takes effect.
+    """
+
+    def __init__(self, model_dir: Optional[Path] = None, mmap_mode: Optional[str] = 'r'):
+        self.model_dir = Path(model_dir or os.environ.get(MODEL_DIR_ENV) or DEFAULT_MODEL_DIR)
+        self.mmap_mode = mmap_mode
+        self._paths: Dict[str, Path] = {}
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, path: Path):
+        """Point ``name`` at an artifact outside the model directory"""
+        with self._lock:
+            self._paths[name] = Path(path)
+
+    def path(self, name: str) -> Path:
+        """Where ``name`` lives: its registered path, or a file directly in the model directory"""
+        if name in self._paths:
+            return self._paths[name]
+        if not name or name in ('.', '..') or Path(name).name != name:
+            raise ValueError(f"Invalid model name: {name!r}")
+        return self.model_dir / name
+
+    def is_known(self, name: str) -> bool:
+        """Whether ``name`` is an app artifact, registered, or already loaded"""
+        return name in KNOWN_ARTIFACTS or name in self._paths or name in self._entries
+
+    def get(self, name: str = CAREER_PHASE_MODEL) -> Any:
+        """The loaded artifact, loading it on first use"""
+        entry = self._entries.get(name)
+        if entry is None:
+            with self._lock:
+                entry = self._entries.get(name)
+                if entry is None:
+                    entry = self._load(name, generation=1)
+                    self._entries[name] = entry
+        return entry['model']
+
+    def is_loaded(self, name: str = CAREER_PHASE_MODEL) -> bool:
+        return name in self._entries
+
+    def _fingerprint(self, path: Path) -> str:
+        stat = path.stat()
+        return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+    def metadata(self, name: str = CAREER_PHASE_MODEL) -> Dict:
+        """The artifact's sidecar metadata (written by publish), without loading the artifact"""
+        metadata_path = self.path(name).with_suffix('.json')
+        return json.loads(metadata_path.read_text()) if metadata_path.exists() else {}
+
+    def _load(self, name: str, generation: int) -> Dict:
+        path = self.path(name)
+        start = time.perf_counter()
+        model = joblib.load(path, mmap_mode=self.mmap_mode)
+        metadata = self.metadata(name)
+        fingerprint = self._fingerprint(path)
+        entry = {
+            'model': model,
+            'name': name,
+            'path': str(path),
+            'version': str(metadata.get('version', fingerprint)),
+            'fingerprint': fingerprint,
+            'generation': generation,
+            'loaded_at': time.time(),
+            'load_seconds': time.perf_counter() - start,
+            'metadata': metadata
+        }
+        logger.info(f"Loaded model {name} version {entry['version']} from {path} "
+                    f"in {entry['load_seconds']:.2f}s")
+        return entry
+
+    def reload(self, name: str = CAREER_PHASE_MODEL) -> Dict:
+        """Load the artifact again and swap it in atomically"""
+        if not self.is_known(name):
+            raise KeyError(f"Unknown model: {name}")
+        current = self._entries.get(name)
+        entry = self._load(name, generation=current['generation'] + 1 if current else 1)
+        with self._lock:
+            self._entries[name] = entry
+        return self._describe(entry)
+
+    def refresh(self) -> Dict[str, Dict]:
+        """Reload every loaded artifact whose file changed on disk"""
+        reloaded = {}
+        for name, entry in list(self._entries.items()):
+            try:
+                changed = self._fingerprint(self.path(name)) != entry['fingerprint']
+            except OSError:
+                continue
+            if changed:
+                reloaded[name] = self.reload(name)
+        return reloaded
+
+    def publish(self, name: str, model: Any, metadata: Optional[Dict] = None) -> Path:
+        """Write an artifact atomically next to the others and reload it if it was loaded"""
+        path = self.path(name)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.name + '.tmp')
+        joblib.dump(model, tmp_path)
+        if metadata is not None:
+            tmp_meta = path.with_name(path.stem + '.json.tmp')
+            tmp_meta.write_text(json.dumps(metadata, indent=2, default=str))
+            os.replace(tmp_meta, path.with_suffix('.json'))
+        os.replace(tmp_path, path)
+        if self.is_loaded(name):
+            self.reload(name)
+        return path
+
+    def _describe(self, entry: Dict) -> Dict:
+        return {key: value for key, value in entry.items() if key != 'model'}
+
+    def info(self) -> Dict[str, Dict]:
+        """Version metadata for every loaded artifact"""
+        return {name: self._describe(entry) for name, entry in self._entries.items()}
+
+
+registry = ModelRegistry()
+
+
+def get_model(name: str = CAREER_PHASE_MODEL) -> Any:
+    return registry.get(name)
@@ -0,0 +1,46 @@
+import numpy as np
+from typing import Optional
+
+# Constants shared with PerformancePredictor's value projection
+DEFAULT_PEAK_AGE = 27
+POST_PEAK_DECLINE = 0.85
+
+
+def growth_rates(ages: np.ndarray, current_values: np.ndarray, peak_values: np.ndarray,
+                 peak_ages: np.ndarray) -> np.ndarray:
+    """Annual value growth factor that compounds the current value to the peak value by the peak age.
+
+    1.0 for players at or past their peak age.
+    """
+    years_to_peak = np.maximum(0, peak_ages - ages)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(
+            years_to_peak > 0,
+            (peak_values / current_values) ** (1 / np.maximum(1, years_to_peak)),
+            1.0
+        )
+
+
+def project_values(ages: np.ndarray, current_values: np.ndarray, years: int,
+                   peak_values: Optional[np.ndarray] = None,
+                   peak_ages: Optional[np.ndarray] = None) -> np.ndarray:
+    """Vectorized PerformancePredictor value projection.
+
+    Returns an ``(n_players, years)`` matrix where column ``y`` is the value
+    at age ``age + y``. Before the peak age, values compound from the current
+    value towards the peak value. From the peak age on, they decline 15% a
+    year from the peak value. Without peak values, the current value is used
+    as the peak.
+    """
+    ages = np.asarray(ages, dtype=np.float64)
+    current = np.asarray(current_values, dtype=np.float64)
+    peak = current if peak_values is None else np.asarray(peak_values, dtype=np.float64)
+    peak_age = np.full_like(ages, DEFAULT_PEAK_AGE) if peak_ages is None else np.asarray(peak_ages, dtype=np.float64)
+
+    growth = growth_rates(ages, current, peak, peak_age)
+
+    offsets = np.arange(years, dtype=np.float64)
+    projected_age = ages[:, None] + offsets
+    growing = current[:, None] * growth[:, None] ** offsets
+    declining = peak[:, None] * POST_PEAK_DECLINE ** (projected_age - peak_age[:, None])
+    return np.where(projected_age < peak_age[:, None], growing, declining)
@@ -5,14 +5,37 @@ import logging
 from pathlib import Path
 from sklearn.preprocessing import StandardScaler
 import json
+from types import MappingProxyType
+from app.model.analysis_cache import AnalysisCache, SignatureCache
+from app.data.player_records import extract_age, first_season_stats
+from app.model.features import candidate_scores
 
 logger = logging.getLogger(__name__)
 
+class CorpusSnapshot:
+    """Read-only view of the player corpus at one version"""
+
+    def __init__(self, players: Dict, version: int):
+        self.players = MappingProxyType(dict(players))
+        self.version = version
+
 class RecommendationEngine:
-    def __init__(self):
+    def __init__(self, cache: Optional[AnalysisCache] = None, player_index=None,
+                 candidate_cache: Optional[SignatureCache] = None, co_occurrence=None, feature_store=None):
         """Initialize the recommendation engine"""
         self._setup_logging()
         self.scaler = StandardScaler()
+        self.cache = cache or AnalysisCache()
+        # Candidate lists shared by squads with the same needs and exclusions
+        self.candidate_cache = candidate_cache or SignatureCache()
+        # Optional CoOccurrenceIndex of saved teams for the co-occurrence mode
+        self.co_occurrence = co_occurrence
+        # Optional FeatureStore of per-player features, including the candidate scores
+        self.feature_store = feature_store
+        # Optional PlayerIndex over the stored corpus used for candidate generation
+        self.player_index = player_index
+        self._snapshot = CorpusSnapshot({}, -1)
+        self._columns = None  # (corpus key, candidate columns, corpus)
         
         # Define career phases and ideal distributions
         self.career_phases = {
@@ -43,27 +66,53 @@ class RecommendationEngine:
 
     def load_player_data(self) -> Dict:
         """Load player data from player service cache"""
+        return self.snapshot().players
+
+    def snapshot(self) -> CorpusSnapshot:
+        """Current corpus snapshot, republished only when the player service cache changes"""
         try:
             from app.data.player_service import PlayerService
-            player_service = PlayerService()
-            data = player_service.get_all_players()
-            logger.info(f"Loaded {len(data)} players from cache")
-            return data
+            snapshot = self._snapshot
+            if snapshot.version != PlayerService.corpus_version:
+                version = PlayerService.corpus_version
+                snapshot = CorpusSnapshot(PlayerService._players_cache, version)
+                # A single reference swap; requests keep whichever snapshot they started with
+                self._snapshot = snapshot
+                logger.info(f"Published corpus snapshot {version} with {len(snapshot.players)} players")
+            return snapshot
         except Exception as e:
             logger.error(f"Error loading player data: {str(e)}")
-            return {}
+            return self._snapshot
+
+    def _index_version(self):
+        return self.player_index.version if self.player_index is not None else None
 
-    def get_recommendations(self, squad_ids: List[str]) -> Dict:
-        """Get recommendations based on squad analysis"""
+    def get_recommendations(self, squad_ids: List[str], overlay: Optional[Dict[str, Dict]] = None) -> Dict:
+        """Get recommendations based on squad analysis.
+
+        ``overlay`` holds request-supplied player records. They take precedence
+        over the corpus for this request only and are never written back to it.
+        """
         try:
             # Load data and validate squad
-            all_players = self.load_player_data()
-            squad_players = [all_players.get(id) for id in squad_ids if id in all_players]
+            snapshot = self.snapshot()
+            all_players = snapshot.players
+            overlay = overlay or {}
+            squad_records = {pid: overlay.get(pid) or all_players.get(pid) for pid in squad_ids
+                             if pid in overlay or pid in all_players}
+            squad_players = list(squad_records.values())
             
             if not squad_players:
                 logger.warning("No valid squad players found")
                 return self._empty_response()
 
+            # Candidates come from the whole corpus, so its version is part of the key
+            cache_key = AnalysisCache.squad_key('recommendations', squad_records,
+                                                extra=f"{snapshot.version}|{self._index_version()}|{len(squad_players)}")
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
             # Calculate current distributions
             current_age_dist = self._calculate_age_distribution(squad_players)
             current_phase_dist = self._calculate_phase_distribution(squad_players)
@@ -72,12 +121,9 @@ class RecommendationEngine:
             needs = self._identify_needs(current_phase_dist)
             
             # Get recommendations
-            recommendations = {}
-            for phase in needs:
-                candidates = self._get_phase_candidates(all_players, squad_ids, phase)
-                recommendations[phase] = candidates[:3]  # Top 3 recommendations per phase
+            recommendations = self._get_recommended_candidates(snapshot, squad_ids, needs)
 
-            return {
+            response = {
                 "squad_analysis": {
                     "age_analysis": {
                         "current": current_age_dist,
@@ -91,11 +137,99 @@ class RecommendationEngine:
                 "identified_needs": needs,
                 "recommendations": recommendations
             }
+            self.cache.put(cache_key, response, squad_records.keys())
+            return response
 
         except Exception as e:
             logger.error(f"Error in get_recommendations: {str(e)}")
             return self._empty_response()
 
+    def get_co_occurrence_recommendations(self, squad_ids: List[str], overlay: Optional[Dict[str, Dict]] = None,
+                                          top_k: int = 3) -> Dict:
+        """Players users commonly save alongside this squad, for each needed phase"""
+        try:
+            if self.co_occurrence is None:
+                return self._empty_response()
+            snapshot = self.snapshot()
+            saved_players = self.co_occurrence.players
+            overlay = overlay or {}
+            lookup = lambda pid: overlay.get(pid) or snapshot.players.get(pid) or saved_players.get(pid)
+            squad = [record for record in map(lookup, squad_ids) if record]
+            if not squad:
+                logger.warning("No valid squad players found")
+                return self._empty_response()
+
+            squad_phases = [self._get_player_phase(self._record_age(record)) for record in squad]
+            current_phase_dist = {phase: squad_phases.count(phase) / len(squad) for phase in self.career_phases}
+            needs = self._identify_needs(current_phase_dist)
+
+            recommendations = {phase: [] for phase in needs}
+            remaining = len(needs) * top_k
+            for pid, score in self.co_occurrence.score(squad_ids):
+                if not remaining:
+                    break
+                record = saved_players.get(pid) or snapshot.players.get(pid)
+                phase = self._get_player_phase(self._record_age(record)) if record else None
+                if phase in recommendations and len(recommendations[phase]) < top_k:
+                    recommendations[phase].append({
+                        'id': pid,
+                        'Full_name': record.get('name') or record.get('Full name', 'Unknown'),
+                        'Position': record.get('position') or record.get('Position', 'Unknown'),
+                        'Market value': record.get('market_value') or record.get('Market value', 'N/A'),
+                        'image_url': record.get('image_url', ''),
+                        'co_occurrence_score': score
+                    })
+                    remaining -= 1
+
+            return {
+                "mode": "co_occurrence",
+                "phase_analysis": {
+                    "current": current_phase_dist,
+                    "ideal": {k: v['ideal_pct'] for k, v in self.career_phases.items()}
+                },
+                "identified_needs": needs,
+                "recommendations": recommendations
+            }
+
+        except Exception as e:
+            logger.error(f"Error in get_co_occurrence_recommendations: {str(e)}")
+            return self._empty_response()
+
+    @staticmethod
+    def _record_age(record: Dict) -> int:
+        """Age from team balance records ('age') or scraped records ('Date of birth/Age')"""
+        age = record.get('age')
+        if isinstance(age, int):
+            return age
+        return extract_age(record.get('Date of birth/Age', age))
+
+    def _table_version(self):
+        """Version of the feature store the candidate scores are read from"""
+        return self.feature_store.data_version if self.feature_store is not None else None
+
+    def _candidate_version(self, snapshot: CorpusSnapshot) -> tuple:
+        """Everything candidate lists are derived from, besides needs and exclusions"""
+        return (snapshot.version, self._index_version(), self._table_version())
+
+    def _get_recommended_candidates(self, snapshot: CorpusSnapshot, squad_ids: List[str],
+                                    needs: List[str]) -> Dict[str, List[Dict]]:
+        """Top 3 candidates per needed phase, shared across squads with the same signature"""
+        version = self._candidate_version(snapshot)
+        self.candidate_cache.sync_version(version)
+        key = SignatureCache.signature('candidates', needs, squad_ids, version)
+        cached = self.candidate_cache.get(key)
+        if cached is not None:
+            return cached
+
+        candidates = self._get_candidates(snapshot.players, squad_ids, needs)
+        recommendations = {phase: candidates[phase][:3] for phase in needs}  # Top 3 per phase
+
+        # Scoring unseen players can move the feature store on; file under the version it ends on
+        version = self._candidate_version(snapshot)
+        self.candidate_cache.sync_version(version)
+        self.candidate_cache.put(SignatureCache.signature('candidates', needs, squad_ids, version), recommendations)
+        return recommendations
+
     def _calculate_age_distribution(self, squad_players: List[Dict]) -> Dict[str, float]:
         """Calculate age distribution percentages"""
         try:
@@ -160,8 +294,128 @@ class RecommendationEngine:
                 needs.append(phase)
         return needs
 
+    def score_player(self, player: Dict):
+        """Career phase and candidate score of one record; both depend only on the record"""
+        phase = self._get_player_phase(extract_age(player.get('Date of birth/Age', '0')))
+        return phase, (self._calculate_similarity(player) if phase else 0.0)
+
+    def _candidate_columns(self, all_players: Dict) -> Dict:
+        """Per-player phase and similarity columns, rebuilt only when the corpus changes"""
+        key = (len(all_players), self._table_version())
+        cached = self._columns
+        # Snapshots are immutable, so the same corpus object means the same columns
+        if cached is not None and cached[2] is all_players and cached[0] == key:
+            return cached[1]
+
+        ids = list(all_players.keys())
+        if self.feature_store is not None:
+            phases, similarity = self._stored_scores(ids, all_players.get)
+            key = (len(all_players), self._table_version())
+        else:
+            phase_index = {phase: i for i, phase in enumerate(self.career_phases)}
+            phases = np.full(len(ids), -1, dtype=np.int8)
+            similarity = np.zeros(len(ids), dtype=np.float64)
+            for row, pid in enumerate(ids):
+                phase, score = self.score_player(all_players[pid])
+                if phase:
+                    phases[row] = phase_index[phase]
+                    similarity[row] = score
+
+        columns = {'ids': ids, 'rows': {pid: row for row, pid in enumerate(ids)},
+                   'phases': phases, 'similarity': similarity}
+        self._columns = (key, columns, all_players)
+        logger.info(f"Built candidate columns for {len(ids)} players")
+        return columns
+
+    def _get_candidates(self, all_players: Dict, squad_ids: List[str], phases: List[str],
+                        top_k: int = 5) -> Dict[str, List[Dict]]:
+        """Top ``top_k`` candidates for every requested phase in one pass over the corpus.
+
+        Ties keep corpus order, the same as the stable sort used before.
+        """
+        try:
+            if self.player_index is not None:
+                return self._get_indexed_candidates(squad_ids, phases, top_k)
+            columns = self._candidate_columns(all_players)
+            available = np.ones(len(columns['ids']), dtype=bool)
+            excluded = [columns['rows'][pid] for pid in set(squad_ids) if pid in columns['rows']]
+            available[excluded] = False
+
+            phase_index = {phase: i for i, phase in enumerate(self.career_phases)}
+            results = {}
+            for phase in phases:
+                rows = np.flatnonzero(available & (columns['phases'] == phase_index[phase]))
+                top = self._top_rows(rows, columns['similarity'][rows], top_k)
+                results[phase] = [self._candidate_entry(columns['ids'][row], all_players[columns['ids'][row]],
+                                                        columns['similarity'][row]) for row in top]
+            return results
+
+        except Exception as e:
+            logger.error(f"Error in _get_candidates: {str(e)}")
+            return {phase: [] for phase in phases}
+
+    @staticmethod
+    def _top_rows(rows: np.ndarray, scores: np.ndarray, top_k: int) -> np.ndarray:
+        """Rows of the ``top_k`` highest scores, ties broken by row order"""
+        if len(rows) > top_k:
+            threshold = np.partition(scores, len(scores) - top_k)[len(scores) - top_k]
+            above = scores > threshold
+            ties = np.flatnonzero(scores == threshold)[:top_k - above.sum()]
+            keep = np.flatnonzero(above)
+            keep = np.concatenate([keep, ties])
+            rows, scores = rows[keep], scores[keep]
+        order = np.lexsort((rows, -scores))
+        return rows[order]
+
+    def _get_indexed_candidates(self, squad_ids: List[str], phases: List[str], top_k: int) -> Dict[str, List[Dict]]:
+        """Top candidates per phase from the player index's age ranges"""
+        results = {}
+        for phase in phases:
+            ids = self.player_index.match_ids(ranges={'age': self.career_phases[phase]['age_range']},
+                                              exclude=squad_ids)
+            scores = self._indexed_scores(ids)
+            top = self._top_rows(np.arange(len(ids)), scores, top_k)
+            results[phase] = [self._candidate_entry(ids[i], self.player_index.record(ids[i]), scores[i])
+                              for i in top]
+        return results
+
+    def _stored_scores(self, ids: List[str], record):
+        """Phase codes and candidate scores read in bulk from the feature store.
+
+        Only players the store has never seen are computed here; listeners
+        keep known ones current.
+        """
+        store = self.feature_store
+        store.upsert_many((pid, record(pid)) for pid in ids if pid not in store)
+        ages, scores = store.read(store.row_indices(ids), ['Age', 'Candidate_Score']).T
+        phases = np.full(len(ids), -1, dtype=np.int8)
+        for code, data in enumerate(self.career_phases.values()):
+            min_age, max_age = data['age_range']
+            phases[(ages >= min_age) & (ages <= max_age)] = code
+        return phases, np.where(phases >= 0, scores, 0.0)
+
+    def _indexed_scores(self, ids: List[str]) -> np.ndarray:
+        if self.feature_store is not None:
+            return self._stored_scores(ids, self.player_index.record)[1]
+        return np.array([self.score_player(self.player_index.record(pid))[1] for pid in ids])
+
+    def _candidate_entry(self, pid: str, player: Dict, similarity_score: float) -> Dict:
+        return {
+            'id': pid,
+            'Full_name': player.get('Full name', 'Unknown'),
+            'Position': player.get('Position', 'Unknown'),
+            'Date of birth/Age': player.get('Date of birth/Age', 'Unknown'),
+            'Market value': player.get('Market value', 'N/A'),
+            'image_url': player.get('image_url', ''),
+            'similarity_score': float(similarity_score)
+        }
+
     def _get_phase_candidates(self, all_players: Dict, squad_ids: List[str], target_phase: str) -> List[Dict]:
         """Get candidate players for a specific phase"""
+        return self._get_candidates(all_players, squad_ids, [target_phase])[target_phase]
+
+    def _scan_phase_candidates(self, all_players: Dict, squad_ids: List[str], target_phase: str) -> List[Dict]:
+        """Original per-phase full scan, kept as the reference for _get_candidates"""
         try:
             candidates = []
             min_age, max_age = self.career_phases[target_phase]['age_range']
@@ -214,31 +468,8 @@ class RecommendationEngine:
     def _calculate_similarity(self, player: Dict) -> float:
         """Calculate similarity score based on player stats"""
         try:
-            # Extract career stats
-            stats = player.get('careerStats', [{}])[0]
-        
-            # Get base stats with defaults
-            appearances = float(stats.get('Appearances', 0))
-            minutes = float(stats.get('Minutes played', 0))
-            goals = float(stats.get('Goals', 0))
-            assists = float(stats.get('Assists', 0))
-            
-            # Calculate normalized scores
-            appearance_score = min(1.0, appearances / 38)  # Full season
-            minutes_score = min(1.0, minutes / 3420)  # 90 mins * 38 games
-            goals_score = min(1.0, goals / 20)  # Assuming 20 goals is excellent
-            assists_score = min(1.0, assists / 15)  # Assuming 15 assists is excellent
-            
-            # Weighted average
-            total_score = (
-                appearance_score * 0.3 +
-                minutes_score * 0.3 +
-                goals_score * 0.2 +
-                assists_score * 0.2
-            )
-        
-            # Ensure score is between 0.6 and 0.95
-            return max(0.6, min(0.95, total_score))
+            # Same formula the feature store applies to the whole corpus at once
+            return float(candidate_scores(*first_season_stats(player)))
         
         except Exception as e:
             logger.error(f"Error calculating similarity: {str(e)}")
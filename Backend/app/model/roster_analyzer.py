@@ -1,235 +1,219 @@
 import pandas as pd
 import numpy as np
-import joblib
 import matplotlib.pyplot as plt
 import seaborn as sns
 from pathlib import Path
-from sklearn.preprocessing import StandardScaler
+from app.data.player_records import PHASES
+from app.model import features
+from app.model.features import FEATURE_COLUMNS
 from app.model.feedback_system import FeedbackSystem
+from app.model.model_registry import CAREER_PHASE_PIPELINE, ModelRegistry, registry
 from typing import Dict
 
+# (base, training, playing time, development) advice, one entry per recommendation rule
+RECOMMENDATION_RULES = [
+    ("High Priority Development Required",  # breakthrough, under 10 games
+     "Focus on technical skills and physical development",
+     "Regular youth team starts with occasional first team exposure",
+     "Regular performance assessments needed to track potential"),
+    ("Fast-Track Development Candidate",  # breakthrough, over 0.5 goals a game
+     "Accelerated tactical and technical training",
+     "Regular first team substitute appearances",
+     "Consider fast-tracking to regular first team training"),
+    ("Standard Development Track",  # breakthrough
+     "Balanced technical and physical training",
+     "Rotation between youth and reserve teams",
+     "Monthly progress reviews with development coaches"),
+    ("Progressive Development",  # development, value growth over 20%
+     "Advanced tactical and technical refinement",
+     "Increased first team minutes with rotation",
+     "Consider for key team roles in coming seasons"),
+    ("Development Monitoring",  # development
+     "Focus on specific skill improvements",
+     "Consistent minutes in appropriate level matches",
+     "Regular feedback sessions with coaching staff"),
+    ("Key Squad Member",  # peak, confidence over 0.8
+     "Maintain peak performance and leadership skills",
+     "Core first team player with managed workload",
+     "Leadership role in team tactics and mentoring"),
+    ("Performance Optimization",  # peak
+     "Focus on consistency and specific role requirements",
+     "Regular playing time with strategic rotation",
+     "Regular performance reviews to maintain standards"),
+    ("Veteran Management",  # twilight, over 60 minutes a game
+     "Focus on recovery and conditioning",
+     "Reduced minutes with strategic deployment",
+     "Transition planning and mentoring responsibilities"),
+    ("Experience Utilization",  # twilight
+     "Maintain fitness levels while mentoring",
+     "Selective use with focus on key matches",
+     "Active role in youth development and team leadership"),
+]
+RECOMMENDATIONS = np.array([
+    f"{base}\n- Training: {training}\n- Playing Time: {playing_time}\n- Development: {development}"
+    for base, training, playing_time, development in RECOMMENDATION_RULES
+], dtype=object)
+PHASE_NAMES = np.array(PHASES, dtype=object)
+
+
+def recommendation_codes(phases, games_played, goals_per_game, value_growth, confidence,
+                         minutes_per_game) -> np.ndarray:
+    """Index into RECOMMENDATIONS for every player: the recommendation rules as masks"""
+    phases = np.asarray(phases, dtype=object)
+    games_played, goals_per_game, value_growth, confidence, minutes_per_game = (
+        np.asarray(values, dtype=np.float64)
+        for values in (games_played, goals_per_game, value_growth, confidence, minutes_per_game))
+    breakthrough, development, peak = (phases == 'breakthrough'), (phases == 'development'), (phases == 'peak')
+    # First matching rule wins, as in the original if/elif chain; anything else is treated as twilight
+    return np.select([
+        breakthrough & (games_played < 10),
+        breakthrough & (goals_per_game > 0.5),
+        breakthrough,
+        development & (value_growth > 0.2),
+        development,
+        peak & (confidence > 0.8),
+        peak,
+        minutes_per_game > 60
+    ], np.arange(8), default=8)
+
+
+def recommend(results: pd.DataFrame) -> np.ndarray:
+    """Recommendation text for every row of a results table"""
+    return RECOMMENDATIONS[recommendation_codes(
+        results['Career_Phase'], results['Games_Played'], results['Goals_per_Game'],
+        results['Value_Growth'], results['Confidence'], results['Minutes_per_Game'])]
+
+
+def phase_results(team_data: pd.DataFrame, features: np.ndarray, probabilities: np.ndarray,
+                  classes: np.ndarray) -> pd.DataFrame:
+    """analyze_team's results table: phase, confidence, key metrics and recommendation per player"""
+    X = pd.DataFrame(features, columns=FEATURE_COLUMNS, index=team_data.index)
+    # Map predictions (class 0-3) to career phases
+    predictions = np.asarray(classes)[probabilities.argmax(axis=1)]
+
+    # Create results DataFrame with additional metrics
+    results = pd.DataFrame({
+        'Name': team_data['Name'],
+        'Age': team_data['Age'],
+        'Career_Phase': PHASE_NAMES[predictions.astype(np.intp)],
+        'Confidence': probabilities.max(axis=1),
+        'Games_Played': team_data['Career_Games'],
+        'Goals_per_Game': X['Goals_per_Game'],
+        'Minutes_per_Game': X['Minutes_per_Game'],
+        'Value_Growth': X['Value_Growth']
+    })
+
+    # Add phase recommendations
+    results['Recommendation'] = recommend(results)
+    return results
+
+
 class FeatureEngineering:
+    """Batch feature engineering; the formulas live in app.model.features"""
+
     @staticmethod
     def safe_divide(a, b):
         result = np.divide(a, b, out=np.zeros_like(a, dtype=float), where=b!=0)
         return np.nan_to_num(result, 0)
     
-    def create_performance_features(self, data, X):
-        X['Minutes_per_Game'] = self.safe_divide(data['Career_Minutes'].values, 
-                                               data['Career_Games'].values)
-        X['Goals_per_Game'] = self.safe_divide(data['Career_Goals'].values, 
-                                             data['Career_Games'].values)
-        X['Assists_per_Game'] = self.safe_divide(data['Career_Assists'].values, 
-                                               data['Career_Games'].values)
-        
-        X['Goal_to_Assist_Ratio'] = self.safe_divide(X['Goals_per_Game'], 
-                                                    X['Assists_per_Game'])
-        X['Minutes_per_Goal'] = self.safe_divide(X['Minutes_per_Game'], 
-                                               X['Goals_per_Game'])
-        return X
-    
-    def create_form_features(self, data, X):
-        X['Card_Rate'] = self.safe_divide(
-            data['Career_Yellows'].values + data['Career_Reds'].values * 3,
-            data['Career_Games'].values
-        )
-        
-        X['Goal_Involvement'] = X['Goals_per_Game'] + X['Assists_per_Game']
-        X['Minutes_Share'] = self.safe_divide(data['Career_Minutes'].values,
-                                            90 * data['Career_Games'].values)
-        return X
-    
-    def create_development_features(self, data, X):
-        X['Value_Growth'] = self.safe_divide(
-            data['Current_Value'].values - data['Peak_Value'].values,
-            data['Peak_Value'].values + 1
-        )
-        
-        X['Value_Stability'] = self.safe_divide(
-            data['Current_Value'].values,
-            data['Peak_Value'].values + 1
-        )
-        return X
-    
-    def create_relative_features(self, data, X):
-        X['Value_to_Squad_Ratio'] = self.safe_divide(
-            data['Current_Value'].values,
-            data['Squad_Size'].values * data['Peak_Value'].values.mean()
-        )
-        
-        X['Playing_Time_Share'] = self.safe_divide(
-            data['Career_Minutes'].values,
-            data['Squad_Size'].values * data['Career_Games'].values * 90
-        )
-        return X
-    
     def transform(self, data):
         """Transform the input data into features"""
-        X = pd.DataFrame()
-        X = self.create_performance_features(data, X)
-        X = self.create_form_features(data, X)
-        X = self.create_development_features(data, X)
-        X = self.create_relative_features(data, X)
-        return self.process_features(X)
+        return features.transform(data, as_frame=True)
     
     def process_features(self, X):
-        for col in X.columns:
-            if X[col].dtype in ['float64', 'float32']:
-                percentile_99 = np.percentile(X[col], 99)
-                percentile_1 = np.percentile(X[col], 1)
-                X[col] = X[col].clip(percentile_1, percentile_99)
-        
-        X = X.replace([np.inf, -np.inf], np.nan)
-        
-        for col in X.columns:
-            X[col] = X[col].fillna(X[col].median())
-        
-        return X
+        """Clip to this batch's 1st/99th percentiles and fill gaps with its medians"""
+        values = X.to_numpy(dtype=np.float32, copy=True, na_value=np.nan)
+        values = features.clean_features(values, *features.clip_bounds(values))
+        return pd.DataFrame(values, columns=X.columns, index=X.index)
 
 class RosterAnalyzer:
-    def __init__(self):
+    def __init__(self, models: ModelRegistry = None, feature_store=None):
         try:
-            model_dir = Path(r"D:\Projects\Machine Learning Applications for Soccer\model_creation\Backend\app\model")
-            self.model = joblib.load(model_dir / "career_phase_model.joblib")
+            # The model itself is loaded once per process by the registry, on first use
+            self.models = models or registry
+            # Optional FeatureStore of per-player features, read by analyze_players
+            self.feature_store = feature_store
             self.feature_engineering = FeatureEngineering()
-            
-            # Initialize and fit the scaler with the initial data
-            self.scaler = StandardScaler()
-            # We'll fit the scaler in the analyze_team method
-            print("Models loaded successfully!")
             self.feedback_system = FeedbackSystem()
         except Exception as e:
             print(f"Error loading models: {str(e)}")
             raise
 
-    def analyze_team(self, team_data):
-        """Analyze a team's roster and provide insights"""
+    @property
+    def model(self):
+        """Current career phase model (follows registry hot-reloads)"""
+        return self.pipeline.model
+
+    @property
+    def pipeline(self):
+        """Fitted feature pipeline and model (see app.model.inference_pipeline)"""
+        return self.models.get(CAREER_PHASE_PIPELINE)
+
+    def analyze_team(self, team_data, profile=None):
+        """Analyze a team's roster and provide insights.
+
+        ``profile`` optionally carries the rows' stored profile features, so
+        only the squad-relative ones are computed.
+        """
         try:
-            # Prepare features using the feature engineering pipeline
-            X = self.feature_engineering.transform(team_data)
-            
-            # Ensure X has the same columns as during training
-            expected_columns = [
-                'Minutes_per_Game', 'Goals_per_Game', 'Assists_per_Game',
-                'Goal_to_Assist_Ratio', 'Minutes_per_Goal', 'Card_Rate',
-                'Goal_Involvement', 'Minutes_Share', 'Value_Growth',
-                'Value_Stability', 'Value_to_Squad_Ratio', 'Playing_Time_Share'
-            ]
-            
-            # Reorder columns to match training data
-            X = X[expected_columns]
-            
-            # Fit and transform the data with the scaler
-            X_scaled = self.scaler.fit_transform(X)
-            
-            # Make predictions
-            predictions = self.model.predict(X_scaled)
-            probabilities = self.model.predict_proba(X_scaled)
-
-            # Map predictions to career phases
-            phase_mapping = {
-                0: 'breakthrough',
-                1: 'development',
-                2: 'peak',
-                3: 'twilight'
-            }
-            
-            # Create results DataFrame with additional metrics
-            results = pd.DataFrame({
-                'Name': team_data['Name'],
-                'Age': team_data['Age'],
-                'Career_Phase': [phase_mapping[p] for p in predictions],
-                'Confidence': [max(prob) for prob in probabilities],
-                'Games_Played': team_data['Career_Games'],
-                'Goals_per_Game': X['Goals_per_Game'],
-                'Minutes_per_Game': X['Minutes_per_Game'],
-                'Value_Growth': X['Value_Growth']
-            })
-            
-            # Add phase recommendations
-            results['Recommendation'] = results.apply(self._get_recommendation, axis=1)
-            
-            # Record predictions for future feedback
-            for _, player in results.iterrows():
-                self.feedback_system.record_phase_prediction_feedback(
-                    player_id=player['Name'],  # Use actual ID in production
-                    predicted_phase=player['Career_Phase'],
-                    actual_phase=None,  # To be updated later
-                    performance_metrics={
-                        'games_played': player['Games_Played'],
-                        'goals_per_game': player['Goals_per_Game'],
-                        'minutes_per_game': player['Minutes_per_Game']
-                    }
-                )
-            
-            return results
-            
+            # One pipeline for the whole request even if a reload lands mid-request.
+            # Clip bounds, medians and scaler were fitted at training time, so each
+            # player's prediction is independent of the rest of the batch.
+            pipeline = self.pipeline
+            features = pipeline.features(team_data, profile)
+            probabilities = pipeline.model.predict_proba(pipeline.scale(features))
+            return self._build_results(team_data, features, probabilities, pipeline.model.classes_)
         except Exception as e:
             print(f"Error in analyze_team: {str(e)}")
-            print(f"Feature columns: {X.columns.tolist()}")
+            print(f"Input columns: {team_data.columns.tolist()}")
             raise
 
+    def analyze_players(self, player_ids, squad_size=None):
+        """analyze_team for stored players, reading their features from the feature store"""
+        team_data = self.feature_store.frame(player_ids, squad_size)
+        return self.analyze_team(team_data, self.feature_store.profile(player_ids))
+
+    def predict_proba_scaled(self, X_scaled, pipeline=None):
+        """Phase probabilities for rows already run through ``pipeline``'s transform.
+
+        Defaults to the currently published pipeline.
+        """
+        return (pipeline or self.pipeline).model.predict_proba(X_scaled)
+
+    async def analyze_team_async(self, team_data, batcher):
+        """analyze_team with the model call shared with concurrent requests.
+
+        ``batcher`` is a MicroBatcher wrapping ``predict_proba_scaled``. The
+        rows are sent with the pipeline that scaled them, so they are only
+        batched, and predicted, with that pipeline's model.
+        """
+        pipeline = self.pipeline
+        features = pipeline.features(team_data)
+        probabilities = await batcher.submit(pipeline.scale(features), pipeline)
+        return self._build_results(team_data, features, probabilities, pipeline.model.classes_)
+
+    def _build_results(self, team_data, features, probabilities, classes):
+        results = phase_results(team_data, features, probabilities, classes)
+
+        # Record predictions for future feedback; the background writer appends them to disk
+        self.feedback_system.queue_phase_predictions(
+            player_ids=results['Name'].tolist(),  # Use actual ID in production
+            predicted_phases=results['Career_Phase'].tolist(),
+            performance_metrics=[
+                {'games_played': games, 'goals_per_game': goals, 'minutes_per_game': minutes}
+                for games, goals, minutes in zip(results['Games_Played'].tolist(),
+                                                 results['Goals_per_Game'].tolist(),
+                                                 results['Minutes_per_Game'].tolist())
+            ]
+        )
+
+        return results
+
     def _get_recommendation(self, player):
-        """Enhanced recommendations based on multiple metrics"""
-        base_rec = ""
-        training_rec = ""
-        playing_time_rec = ""
-        development_rec = ""
-    
-        if player['Career_Phase'] == 'breakthrough':
-            if player['Games_Played'] < 10:
-                base_rec = "High Priority Development Required"
-                training_rec = "Focus on technical skills and physical development"
-                playing_time_rec = "Regular youth team starts with occasional first team exposure"
-                development_rec = "Regular performance assessments needed to track potential"
-            elif player['Goals_per_Game'] > 0.5:
-                base_rec = "Fast-Track Development Candidate"
-                training_rec = "Accelerated tactical and technical training"
-                playing_time_rec = "Regular first team substitute appearances"
-                development_rec = "Consider fast-tracking to regular first team training"
-            else:
-                base_rec = "Standard Development Track"
-                training_rec = "Balanced technical and physical training"
-                playing_time_rec = "Rotation between youth and reserve teams"
-                development_rec = "Monthly progress reviews with development coaches"
-    
-        elif player['Career_Phase'] == 'development':
-            if player['Value_Growth'] > 0.2:
-                base_rec = "Progressive Development"
-                training_rec = "Advanced tactical and technical refinement"
-                playing_time_rec = "Increased first team minutes with rotation"
-                development_rec = "Consider for key team roles in coming seasons"
-            else:
-                base_rec = "Development Monitoring"
-                training_rec = "Focus on specific skill improvements"
-                playing_time_rec = "Consistent minutes in appropriate level matches"
-                development_rec = "Regular feedback sessions with coaching staff"
-    
-        elif player['Career_Phase'] == 'peak':
-            if player['Confidence'] > 0.8:
-                base_rec = "Key Squad Member"
-                training_rec = "Maintain peak performance and leadership skills"
-                playing_time_rec = "Core first team player with managed workload"
-                development_rec = "Leadership role in team tactics and mentoring"
-            else:
-                base_rec = "Performance Optimization"
-                training_rec = "Focus on consistency and specific role requirements"
-                playing_time_rec = "Regular playing time with strategic rotation"
-                development_rec = "Regular performance reviews to maintain standards"
-    
-        else:  # twilight
-            if player['Minutes_per_Game'] > 60:
-                base_rec = "Veteran Management"
-                training_rec = "Focus on recovery and conditioning"
-                playing_time_rec = "Reduced minutes with strategic deployment"
-                development_rec = "Transition planning and mentoring responsibilities"
-            else:
-                base_rec = "Experience Utilization"
-                training_rec = "Maintain fitness levels while mentoring"
-                playing_time_rec = "Selective use with focus on key matches"
-                development_rec = "Active role in youth development and team leadership"
-    
-        return f"{base_rec}\n- Training: {training_rec}\n- Playing Time: {playing_time_rec}\n- Development: {development_rec}"
+        """Enhanced recommendations based on multiple metrics (one row; see recommend for whole tables)"""
+        code = recommendation_codes([player['Career_Phase']], [player['Games_Played']], [player['Goals_per_Game']],
+                                    [player['Value_Growth']], [player['Confidence']], [player['Minutes_per_Game']])
+        return RECOMMENDATIONS[code[0]]
 
     def update_recommendation_feedback(
         self,
@@ -0,0 +1,148 @@
+import os
+import atexit
+import logging
+import secrets
+import threading
+from collections import OrderedDict
+from multiprocessing import shared_memory
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from app.model.feature_store import STORE_COLUMNS, FeatureStore
+
+logger = logging.getLogger(__name__)
+
+
+class CorpusHandle(NamedTuple):
+    """What a worker needs to attach to one published corpus generation.
+
+    Small enough to send with every task; the rows themselves stay in
+    shared memory.
+    """
+    version: int
+    rows: int
+    columns: Tuple[str, ...]
+    # array name -> (shared memory segment name, shape, dtype)
+    segments: Dict[str, Tuple[str, Tuple[int, ...], str]]
+
+
+class SharedCorpus:
+    """Publishes a FeatureStore's rows into named shared memory segments.
+
+    Each ``publish`` of a changed store creates a new generation, named
+    after its ``data_version``, and makes it ``current``; the store itself is
+    never shared, so later upserts cannot change rows under a reader. Tasks
+    already holding an older handle keep working: the previous ``keep``
+    generations stay alive, older ones are unlinked.
+
+    Workers call ``attach(handle)`` and get a read-only FeatureStore over the
+    segments, with no copy of the matrix and nothing to unpickle.
+    """
+
+    def __init__(self, prefix: Optional[str] = None, keep: int = 2):
+        # POSIX shared memory names are short. The pid keeps servers on one host apart
+        # and the token keeps corpora in one process apart, even at equal data versions
+        self.prefix = f"{prefix or f'corpus{os.getpid()}'}-{secrets.token_hex(4)}"
+        self.keep = keep
+        self._lock = threading.Lock()
+        self._generations: 'OrderedDict[int, Tuple[CorpusHandle, List[shared_memory.SharedMemory]]]' = OrderedDict()
+        atexit.register(self.close)
+
+    @property
+    def current(self) -> Optional[CorpusHandle]:
+        with self._lock:
+            return next(reversed(self._generations.values()))[0] if self._generations else None
+
+    def publish(self, store: FeatureStore) -> CorpusHandle:
+        """Handle of the generation holding ``store``'s rows, publishing one if they changed"""
+        current = self.current
+        if current is not None and current.version == store.data_version:
+            return current
+
+        arrays, version = store.arrays()
+        segments, blocks = {}, []
+        try:
+            for key, array in arrays.items():
+                shm = shared_memory.SharedMemory(name=f"{self.prefix}-{version}-{key}", create=True,
+                                                 size=max(array.nbytes, 1))
+                blocks.append(shm)
+                np.ndarray(array.shape, array.dtype, buffer=shm.buf)[...] = array
+                segments[key] = (shm.name, array.shape, array.dtype.str)
+        except Exception:
+            _release(blocks, unlink=True)
+            raise
+        handle = CorpusHandle(version, len(arrays['ids']), tuple(STORE_COLUMNS), segments)
+
+        with self._lock:
+            self._generations[version] = (handle, blocks)
+            expired = []
+            while len(self._generations) > self.keep:
+                expired.append(self._generations.popitem(last=False)[1][1])
+        for old in expired:
+            _release(old, unlink=True)
+        logger.info(f"Published corpus version {version} with {handle.rows} players to shared memory")
+        return handle
+
+    def close(self):
+        """Unlink every generation; attached workers keep their mappings until they detach"""
+        with self._lock:
+            generations = [blocks for _, blocks in self._generations.values()]
+            self._generations.clear()
+        for blocks in generations:
+            _release(blocks, unlink=True)
+
+    def __enter__(self) -> 'SharedCorpus':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _release(blocks: List[shared_memory.SharedMemory], unlink: bool = False):
+    for shm in blocks:
+        try:
+            shm.close()
+        except BufferError:
+            pass  # a view is still alive; the mapping goes when it is collected
+        if unlink:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+# The generation this worker process is attached to: (handle, segments, store)
+_attached: Optional[Tuple[CorpusHandle, List[shared_memory.SharedMemory], FeatureStore]] = None
+
+
+def attach(handle: CorpusHandle) -> FeatureStore:
+    """Read-only FeatureStore over a published generation, cached per process.
+
+    Attaching to another generation detaches from the previous one.
+    """
+    global _attached
+    if _attached is not None and _attached[0] == handle:
+        return _attached[2]
+    if tuple(STORE_COLUMNS) != handle.columns:
+        raise ValueError("Corpus was published with a different feature store layout")
+
+    blocks, arrays = [], {}
+    try:
+        for key, (name, shape, dtype) in handle.segments.items():
+            shm = shared_memory.SharedMemory(name=name)
+            blocks.append(shm)
+            array = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+            array.flags.writeable = False
+            arrays[key] = array
+    except Exception:
+        _release(blocks)
+        raise
+    store = FeatureStore.from_arrays(arrays['matrix'], arrays['ids'], arrays['versions'],
+                                     arrays['names'], handle.version)
+
+    previous = _attached[1] if _attached is not None else []
+    # Dropping the old store first frees its views, so its segments can close
+    _attached = (handle, blocks, store)
+    _release(previous)
+    return store
@@ -0,0 +1,252 @@
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from app.data.player_records import PHASES, flatten_player, parse_market_value
+from app.model.features import PROFILE_COLUMNS, compute_features
+
+logger = logging.getLogger(__name__)
+
+FEATURES = PROFILE_COLUMNS
+PEAK_VALUE_KEYS = ('Highest market value', 'peak_value')
+
+
+def profile_inputs(rows: List[Dict]) -> Dict[str, np.ndarray]:
+    """Flattened rows as the player_database.csv columns the features are computed from.
+
+    Scraped records have no historical peak value unless one of
+    ``PEAK_VALUE_KEYS`` was captured, so the current value stands in for it.
+    """
+    column = lambda key: np.array([row[key] for row in rows], dtype=np.float64)
+    current = np.nan_to_num(column('market_value'))
+    peak = np.array([row.get('peak_value', np.nan) for row in rows], dtype=np.float64)
+    return {
+        'Career_Games': column('career_games'),
+        'Career_Minutes': column('career_minutes'),
+        'Career_Goals': column('career_goals'),
+        'Career_Assists': column('career_assists'),
+        'Career_Yellows': column('career_yellows'),
+        'Career_Reds': column('career_reds'),
+        'Current_Value': current,
+        'Peak_Value': np.where(np.isfinite(peak), peak, current)
+    }
+
+
+def profile_features(rows: List[Dict]) -> np.ndarray:
+    """FeatureEngineering's performance, form and development features for flattened rows"""
+    return compute_features(profile_inputs(rows), relative=False)
+
+
+def index_row(player_id: str, record: Dict) -> Dict:
+    """Flattened row plus the peak value used by the development features"""
+    row = flatten_player(player_id, record)
+    peak = next((record[key] for key in PEAK_VALUE_KEYS if record.get(key)), None)
+    row['peak_value'] = parse_market_value(peak)
+    return row
+
+
+def _check_k(k: int):
+    if k <= 0:
+        raise ValueError(f"k must be positive, got {k}")
+
+
+class SimilarityIndex:
+    """Nearest-neighbour index over standardized player profile features.
+
+    Features are clipped to the 1st/99th percentiles and standardized with
+    statistics fitted in ``build``. Later inserts reuse those statistics, so
+    vectors already in the index never move. Queries use batched brute force
+    over contiguous chunks. Filters are applied as masks, so filtered queries
+    cost the same as unfiltered ones. A KD-tree would have to be rebuilt on
+    every insert and cannot apply the filters during its search.
+
+    Inserts may grow the arrays or overwrite rows, so writes and queries
+    share one lock and a query always sees a single version of the arrays.
+    """
+
+    CHUNK_SIZE = 65536
+
+    def __init__(self, capacity: int = 1024):
+        self.stats = None
+        self._lock = threading.Lock()
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.meta: List[Dict] = []
+        self.vectors = np.zeros((capacity, len(FEATURES)), dtype=np.float32)
+        self.norms = np.zeros(capacity, dtype=np.float32)
+        self.position_codes: Dict[str, int] = {}
+        self.phases = np.zeros(capacity, dtype=np.int8)
+        self.positions = np.zeros(capacity, dtype=np.int32)
+        self.values = np.zeros(capacity, dtype=np.float64)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    def __len__(self) -> int:
+        return int(self.alive[:len(self.ids)].sum())
+
+    def __contains__(self, player_id) -> bool:
+        row = self.rows.get(str(player_id))
+        return row is not None and bool(self.alive[row])
+
+    def build(self, records: Iterable[Tuple[str, Dict]]):
+        """Fit the feature statistics and index every (player_id, record) pair"""
+        rows = [index_row(pid, record) for pid, record in records]
+        raw = profile_features(rows) if rows else np.zeros((0, len(FEATURES)))
+        with self._lock:
+            self._fit(rows, raw)
+
+    def _fit(self, rows: List[Dict], raw: np.ndarray):
+        if len(raw):
+            low, high = np.percentile(raw, 1, axis=0), np.percentile(raw, 99, axis=0)
+            clipped = np.clip(raw, low, high)
+            std = clipped.std(axis=0)
+            self.stats = {'low': low, 'high': high, 'mean': clipped.mean(axis=0),
+                          'std': np.where(std > 0, std, 1.0)}
+        self._allocate(max(1024, len(rows)))
+        self._insert(rows, raw)
+        logger.info(f"Built similarity index over {len(rows)} players")
+
+    def upsert(self, player_id: str, record: Dict):
+        """Insert or replace one player using the statistics fitted in build"""
+        self.upsert_many([(player_id, record)])
+
+    def upsert_many(self, records: Iterable[Tuple[str, Dict]]):
+        records = list(records)
+        if not records:
+            return
+        rows = [index_row(pid, record) for pid, record in records]
+        raw = profile_features(rows)
+        with self._lock:
+            if self.stats is None:
+                # Nothing fitted yet: the first batch defines the statistics
+                self._fit(rows, raw)
+                return
+            self._insert(rows, raw)
+
+    def remove(self, player_id: str) -> bool:
+        with self._lock:
+            row = self.rows.get(str(player_id))
+            if row is None or not self.alive[row]:
+                return False
+            self.alive[row] = False
+            return True
+
+    def _transform(self, raw: np.ndarray) -> np.ndarray:
+        clipped = np.clip(raw, self.stats['low'], self.stats['high'])
+        return ((clipped - self.stats['mean']) / self.stats['std']).astype(np.float32)
+
+    def _insert(self, rows: List[Dict], raw: np.ndarray):
+        if not rows:
+            return
+        vectors = self._transform(raw)
+        for row, vector in zip(rows, vectors):
+            slot = self.rows.get(row['id'])
+            if slot is None:
+                slot = len(self.ids)
+                if slot == len(self.alive):
+                    self._grow()
+                self.ids.append(row['id'])
+                self.meta.append(None)
+                self.rows[row['id']] = slot
+            self.vectors[slot] = vector
+            self.norms[slot] = vector @ vector
+            self.phases[slot] = PHASES.index(row['career_phase'])
+            self.positions[slot] = self.position_codes.setdefault(row['position'], len(self.position_codes))
+            self.values[slot] = row['market_value']
+            self.alive[slot] = True
+            meta = {key: row[key] for key in ('id', 'name', 'age', 'career_phase', 'position', 'club')}
+            # Unknown values parse to NaN, which JSON responses cannot carry
+            meta['market_value'] = float(row['market_value']) if np.isfinite(row['market_value']) else None
+            self.meta[slot] = meta
+
+    def _grow(self):
+        capacity = 2 * len(self.alive)
+        for name in ('vectors', 'norms', 'phases', 'positions', 'values', 'alive'):
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _mask(self, phase=None, position=None, max_value=None, exclude=None) -> np.ndarray:
+        n = len(self.ids)
+        mask = self.alive[:n].copy()
+        if phase:
+            phases = [phase] if isinstance(phase, str) else list(phase)
+            mask &= np.isin(self.phases[:n], [PHASES.index(p) for p in phases if p in PHASES])
+        if position:
+            positions = [position] if isinstance(position, str) else list(position)
+            mask &= np.isin(self.positions[:n], [self.position_codes[p] for p in positions
+                                                 if p in self.position_codes])
+        if max_value is not None:
+            # Players with an unknown value cannot be checked against a budget
+            mask &= self.values[:n] <= max_value
+        for pid in exclude or ():
+            row = self.rows.get(str(pid))
+            if row is not None:
+                mask[row] = False
+        return mask
+
+    def query(self, player_id: str, k: int = 10, phase: Union[str, List[str], None] = None,
+              position: Union[str, List[str], None] = None, max_value: Optional[float] = None,
+              exclude: Optional[Iterable[str]] = None) -> List[Dict]:
+        """The ``k`` players most like ``player_id``, excluding the player itself"""
+        return self.query_many([player_id], k, phase, position, max_value, exclude)[0]
+
+    def query_many(self, player_ids: List[str], k: int = 10, phase=None, position=None,
+                   max_value: Optional[float] = None, exclude: Optional[Iterable[str]] = None) -> List[List[Dict]]:
+        """k-NN for several indexed players at once (one matrix product per chunk)"""
+        _check_k(k)
+        with self._lock:
+            missing = [pid for pid in player_ids if str(pid) not in self]
+            if missing:
+                raise KeyError(f"Players not in similarity index: {missing}")
+            query_rows = np.array([self.rows[str(pid)] for pid in player_ids], dtype=np.int64)
+            mask = self._mask(phase, position, max_value, exclude)
+            return self._search(self.vectors[query_rows], mask, k, query_rows)
+
+    def query_vector(self, vector: np.ndarray, k: int = 10, **filters) -> List[Dict]:
+        """k-NN for an already standardized feature vector"""
+        _check_k(k)
+        vector = np.asarray(vector, dtype=np.float32)[None, :]
+        with self._lock:
+            return self._search(vector, self._mask(**filters), k, None)[0]
+
+    def _search(self, queries: np.ndarray, mask: np.ndarray, k: int,
+                query_rows: Optional[np.ndarray]) -> List[List[Dict]]:
+        n_queries = len(queries)
+        best_dist = np.full((n_queries, 0), np.inf, dtype=np.float32)
+        best_rows = np.zeros((n_queries, 0), dtype=np.int64)
+        query_norms = (queries * queries).sum(axis=1)[:, None]
+
+        for start in range(0, len(mask), self.CHUNK_SIZE):
+            chunk_mask = mask[start:start + self.CHUNK_SIZE]
+            if not chunk_mask.any():
+                continue
+            stop = start + len(chunk_mask)
+            dist = self.norms[start:stop] - 2 * queries @ self.vectors[start:stop].T + query_norms
+            dist[:, ~chunk_mask] = np.inf
+            if query_rows is not None:
+                own = (query_rows >= start) & (query_rows < stop)
+                dist[own, query_rows[own] - start] = np.inf
+
+            take = min(k, dist.shape[1])
+            part = np.argpartition(dist, take - 1, axis=1)[:, :take]
+            best_dist = np.hstack([best_dist, np.take_along_axis(dist, part, axis=1)])
+            best_rows = np.hstack([best_rows, part + start])
+            if best_dist.shape[1] > k:
+                keep = np.argpartition(best_dist, k - 1, axis=1)[:, :k]
+                best_dist = np.take_along_axis(best_dist, keep, axis=1)
+                best_rows = np.take_along_axis(best_rows, keep, axis=1)
+
+        results = []
+        for dists, rows in zip(best_dist, best_rows):
+            order = np.argsort(dists, kind='stable')
+            results.append([
+                {**self.meta[row], 'distance': float(np.sqrt(max(dist, 0.0)))}
+                for dist, row in zip(dists[order], rows[order]) if np.isfinite(dist)
+            ])
+        return results
@@ -0,0 +1,200 @@
+import numpy as np
+from typing import Dict, Iterable, List, Optional
+import logging
+
+from app.data.player_records import parse_market_value
+from app.model.team_balance import TeamBalanceOptimizer, JOINT_AGE_EDGES, AGE_GROUP_OF_CLASS
+
+logger = logging.getLogger(__name__)
+
+N_CLASSES = len(AGE_GROUP_OF_CLASS)
+CLASS_LABELS = ('u21', '21-24', '25', '26-29', '30+')
+# Largest max_moves accepted from API callers; the plan search grows roughly as max_moves ** N_CLASSES
+MAX_MOVES = 10
+
+
+def index_candidates(index, exclude: Iterable[str], per_class: int, budget: float = float('inf')) -> List[Dict]:
+    """The ``per_class`` cheapest valued players of each joint age class in a PlayerIndex.
+
+    Only these can ever be picked by ``optimize`` with at most ``per_class``
+    moves, so the rest of the corpus is never read.
+    """
+    edges = [1] + JOINT_AGE_EDGES.tolist() + [None]
+    value_range = (None, budget if np.isfinite(budget) else None)
+    candidates = []
+    for low, high in zip(edges[:-1], edges[1:]):
+        page = index.query(ranges={'age': (low, None if high is None else high - 1), 'market_value': value_range},
+                           sort_by='market_value', descending=False, limit=per_class, exclude=exclude)
+        candidates.extend(page['players'])
+    return candidates
+
+
+class SquadCompositionOptimizer:
+    """Search the add/remove moves that best improve a squad's overall balance.
+
+    Balance depends only on how many players fall into each joint age class,
+    so the search runs over per-class count changes instead of player subsets.
+    For a given count change, the cheapest candidates in each class are always
+    the best picks against the budget. The search space is enumerated one class
+    at a time, with branches pruned on move count, budget and reachable squad
+    size. The surviving plans are then scored with the shared NumPy balance
+    kernel. The result is exact for the given move limit, and the cost of the
+    search does not depend on pool size beyond one sort per class.
+    """
+
+    def __init__(self, balance_optimizer: Optional[TeamBalanceOptimizer] = None):
+        self.balance_optimizer = balance_optimizer or TeamBalanceOptimizer()
+
+    def optimize(self, squad: List[Dict], candidates: Iterable[Dict], budget: float = float('inf'),
+                 max_moves: int = 6, top_n: int = 5) -> Dict:
+        """Return the ``top_n`` best move sets for ``squad``.
+
+        ``candidates`` are flattened player rows (see
+        ``app.data.player_records.flatten_player``) with ``id``, ``age`` and
+        ``market_value``. Players already in the squad are skipped.
+        ``budget`` caps the summed market value of the added players.
+        """
+        try:
+            limits = self.balance_optimizer.ideal_composition['squad_size']
+            squad_ids = {str(p.get('id')) for p in squad}
+            squad_ages = self.balance_optimizer._extract_ages(squad)
+            squad_counts = np.bincount(np.digitize(squad_ages, JOINT_AGE_EDGES), minlength=N_CLASSES)
+            size = len(squad)
+            max_moves = self.moves_needed(size, max_moves)
+
+            pool = self._pool_by_class(candidates, squad_ids, max_moves)
+            removable = self._removable_by_class(squad, squad_ages)
+            plans = self._enumerate_plans(squad_counts, pool, budget, max_moves, size, limits)
+
+            current = self.balance_optimizer._distribution_kernel(squad_counts)
+            result = {
+                'current_balance': self._scores(current),
+                'squad_size': size,
+                'options': []
+            }
+            if not len(plans['deltas']):
+                logger.info("No move set satisfies the budget and squad size bounds")
+                return result
+
+            counts = squad_counts + plans['deltas']
+            kernel = self.balance_optimizer._distribution_kernel(counts)
+            moves = np.abs(plans['deltas']).sum(axis=1)
+            # Best balance first, then fewer moves, then lower spend
+            order = np.lexsort((plans['cost'], moves, -np.round(kernel['overall_balance'], 12)))
+
+            for i in order[:top_n]:
+                delta = plans['deltas'][i]
+                adds = [p for k in range(N_CLASSES) for p in pool[k]['players'][:max(delta[k], 0)]]
+                removes = [p for k in range(N_CLASSES) for p in removable[k][:max(-delta[k], 0)]]
+                result['options'].append({
+                    'add': adds,
+                    'remove': removes,
+                    'moves': int(moves[i]),
+                    'cost': float(plans['cost'][i]),
+                    'squad_size': int(size + delta.sum()),
+                    'class_changes': {CLASS_LABELS[k]: int(delta[k]) for k in range(N_CLASSES) if delta[k]},
+                    'balance_scores': self._scores(kernel, i)
+                })
+            return result
+
+        except Exception as e:
+            logger.error(f"Error optimizing squad composition: {str(e)}")
+            raise
+
+    def moves_needed(self, size: int, max_moves: int) -> int:
+        """``max_moves``, raised to what a squad of ``size`` needs to get inside the squad-size bounds.
+
+        Never more than ``MAX_MOVES``; raises ValueError for squads that
+        cannot reach the bounds within it.
+        """
+        limits = self.balance_optimizer.ideal_composition['squad_size']
+        needed = max(limits['min'] - size, size - limits['max'], 0)
+        if needed > MAX_MOVES:
+            raise ValueError(f"A squad of {size} players cannot reach the {limits['min']}-{limits['max']} "
+                             f"player bounds within {MAX_MOVES} moves")
+        return min(max(max_moves, needed), MAX_MOVES)
+
+    @staticmethod
+    def _scores(kernel: Dict, i: Optional[int] = None) -> Dict:
+        pick = (lambda a: a) if i is None else (lambda a: a[i])
+        return {
+            'age_balance': float(pick(kernel['age_balance'])),
+            'phase_balance': float(pick(kernel['phase_balance'])),
+            'overall_balance': float(pick(kernel['overall_balance']))
+        }
+
+    @staticmethod
+    def _pool_by_class(candidates: Iterable[Dict], squad_ids: set, max_moves: int) -> List[Dict]:
+        """Cheapest-first candidates per joint class, with prefix sums of cost"""
+        rows, ages, values = [], [], []
+        for row in candidates:
+            value = parse_market_value(row.get('market_value'))
+            # flatten_player gives age 0 when the age is unknown; such players cannot be classed
+            if str(row['id']) in squad_ids or not np.isfinite(value) or not row.get('age', 0) > 0:
+                continue
+            rows.append(row)
+            ages.append(row['age'])
+            values.append(value)
+
+        classes = np.digitize(np.asarray(ages, dtype=np.int64), JOINT_AGE_EDGES)
+        values = np.asarray(values, dtype=np.float64)
+        pool = []
+        for k in range(N_CLASSES):
+            members = np.flatnonzero(classes == k)
+            # Only the max_moves cheapest can ever be picked from a class
+            if len(members) > max_moves:
+                members = members[np.argpartition(values[members], max_moves)[:max_moves]]
+            members = members[np.argsort(values[members], kind='stable')]
+            pool.append({
+                'players': [{'id': str(rows[j]['id']), 'name': rows[j].get('name', 'Unknown'),
+                             'age': int(ages[j]), 'market_value': float(values[j])} for j in members],
+                'prefix_cost': np.concatenate([[0.0], np.cumsum(values[members])])
+            })
+        return pool
+
+    @staticmethod
+    def _removable_by_class(squad: List[Dict], ages: np.ndarray) -> List[List[Dict]]:
+        """Squad members per joint class, least valuable first"""
+        classes = np.digitize(ages, JOINT_AGE_EDGES)
+        removable = [[] for _ in range(N_CLASSES)]
+        for player, age, k in zip(squad, ages, classes):
+            value = parse_market_value(player.get('Market value', player.get('market_value')))
+            removable[k].append({'id': str(player.get('id')), 'name': player.get('name', player.get('Full name', 'Unknown')),
+                                 'age': int(age), 'market_value': float(value) if np.isfinite(value) else None})
+        for members in removable:
+            members.sort(key=lambda p: p['market_value'] if p['market_value'] is not None else 0.0)
+        return removable
+
+    @staticmethod
+    def _enumerate_plans(squad_counts: np.ndarray, pool: List[Dict], budget: float,
+                         max_moves: int, size: int, limits: Dict) -> Dict[str, np.ndarray]:
+        """Vectorized branch-and-bound over per-class count changes"""
+        deltas = np.zeros((1, 0), dtype=np.int64)
+        moves = np.zeros(1, dtype=np.int64)
+        net = np.zeros(1, dtype=np.int64)
+        cost = np.zeros(1, dtype=np.float64)
+
+        for k in range(N_CLASSES):
+            options = np.arange(-squad_counts[k], len(pool[k]['prefix_cost']))
+            option_cost = pool[k]['prefix_cost'][np.maximum(options, 0)]
+
+            deltas = np.hstack([np.repeat(deltas, len(options), axis=0),
+                                np.tile(options, len(moves))[:, None]])
+            moves = np.repeat(moves, len(options)) + np.tile(np.abs(options), len(moves))
+            net = np.repeat(net, len(options)) + np.tile(options, len(net))
+            cost = np.repeat(cost, len(options)) + np.tile(option_cost, len(cost))
+
+            # Prune: move limit, budget, and whether the size bounds are still reachable
+            moves_left = max_moves - moves
+            new_size = size + net
+            keep = (
+                (moves_left >= 0)
+                & (cost <= budget)
+                & (new_size + moves_left >= limits['min'])
+                & (new_size - moves_left <= limits['max'])
+            )
+            deltas, moves, net, cost = deltas[keep], moves[keep], net[keep], cost[keep]
+
+        final_size = size + net
+        keep = (final_size >= limits['min']) & (final_size <= limits['max']) & (final_size > 0)
+        return {'deltas': deltas[keep], 'cost': cost[keep]}
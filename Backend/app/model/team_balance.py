@@ -1,8 +1,24 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List
+from typing import Dict, List, Optional, Union
 import logging
 from pathlib import Path
+from app.data.player_records import parse_market_value
+from app.model.projections import DEFAULT_PEAK_AGE, POST_PEAK_DECLINE, project_values
+
+AGE_GROUPS = ('u21', '21_25', '26_29', '30_plus')
+PHASES = ('breakthrough', 'development', 'peak', 'twilight')
+
+# Ages are binned once against the union of the age-group and career-phase
+# boundaries. Each of the resulting joint classes (<21, 21-24, 25, 26-29, 30+)
+# belongs to exactly one age group and one career phase.
+JOINT_AGE_EDGES = np.array([21, 25, 26, 30])
+AGE_GROUP_OF_CLASS = np.array([0, 1, 1, 2, 3])
+PHASE_OF_CLASS = np.array([0, 1, 2, 2, 3])
+AGE_GROUP_MATRIX = np.eye(len(AGE_GROUPS))[AGE_GROUP_OF_CLASS]
+PHASE_MATRIX = np.eye(len(PHASES))[PHASE_OF_CLASS]
+# Longest horizon accepted by simulate_aging; its arrays grow with squads x seasons
+MAX_SEASONS = 20
 
 class TeamBalanceOptimizer:
     def __init__(self):
@@ -29,8 +45,301 @@ class TeamBalanceOptimizer:
             }
         }
 
-    def analyze_squad_balance(self, team_data: pd.DataFrame) -> Dict:
+    def analyze_squad_balance(self, team_data: Union[pd.DataFrame, List[Dict]]) -> Dict:
         """Main function to analyze squad balance"""
+        try:
+            ages = self._extract_ages(team_data)
+            if not len(ages):
+                raise ValueError("Cannot analyze an empty squad")
+
+            return self._analysis_from_counts(self._count_age_classes(ages), ages.mean())
+
+        except Exception as e:
+            self.logger.error(f"Error in squad balance analysis: {str(e)}")
+            raise
+
+    def _analysis_from_counts(self, class_counts: np.ndarray, average_age: float) -> Dict:
+        """Build the full analysis response from joint age-class counts"""
+        total_players = int(class_counts.sum())
+        kernel = self._distribution_kernel(class_counts)
+
+        squad_metrics = {
+            'total_players': total_players,
+            'average_age': round(average_age, 1),
+            'squad_size_status': self._evaluate_squad_size(total_players)
+        }
+        age_analysis = self._distribution_result(
+            AGE_GROUPS, kernel['age_current'], kernel['age_gaps'], kernel['age_balance'],
+            self.ideal_composition['age_distribution']
+        )
+        phase_analysis = self._distribution_result(
+            PHASES, kernel['phase_current'], kernel['phase_gaps'], kernel['phase_balance'],
+            self.ideal_composition['phase_distribution']
+        )
+        balance_scores = {
+            'age_balance': age_analysis['balance_score'],
+            'phase_balance': phase_analysis['balance_score'],
+            'overall_balance': float(kernel['overall_balance'])
+        }
+
+        recommendations = self._generate_recommendations({
+            'squad_metrics': squad_metrics,
+            'age_analysis': age_analysis,
+            'phase_analysis': phase_analysis,
+            'balance_scores': balance_scores
+        })
+
+        return {
+            'squad_metrics': squad_metrics,
+            'age_analysis': age_analysis,
+            'phase_analysis': phase_analysis,
+            'balance_scores': balance_scores,
+            'recommendations': recommendations
+        }
+
+    def _extract_ages(self, team_data: Union[pd.DataFrame, List[Dict]]) -> np.ndarray:
+        """Pull integer ages out of scraped player data without building a DataFrame"""
+        if isinstance(team_data, pd.DataFrame):
+            if 'Date of birth/Age' in team_data.columns:
+                values = team_data['Date of birth/Age'].tolist()
+            elif 'age' in team_data.columns:
+                values = team_data['age'].tolist()
+            else:
+                values = [''] * len(team_data)
+        else:
+            values = [player.get('Date of birth/Age', player.get('age', '')) for player in team_data]
+        return np.fromiter((self._extract_age(v) for v in values), dtype=np.int64, count=len(values))
+
+    @staticmethod
+    def _count_age_classes(ages: np.ndarray) -> np.ndarray:
+        """Bin ages once into the joint age-group/career-phase classes"""
+        return np.bincount(np.digitize(ages, JOINT_AGE_EDGES), minlength=len(AGE_GROUP_OF_CLASS))
+
+    def _ideal_vectors(self):
+        ideal_age = np.array([self.ideal_composition['age_distribution'][k] for k in AGE_GROUPS])
+        ideal_phase = np.array([self.ideal_composition['phase_distribution'][k] for k in PHASES])
+        return ideal_age, ideal_phase
+
+    def _distribution_kernel(self, class_counts: np.ndarray) -> Dict[str, np.ndarray]:
+        """Distributions, gaps and balance scores from joint class counts.
+
+        Works on a single squad (shape ``(5,)``) or a stack of squads
+        (shape ``(n, 5)``); every output keeps the leading dimensions.
+        """
+        class_counts = np.asarray(class_counts, dtype=np.float64)
+        ideal_age, ideal_phase = self._ideal_vectors()
+        total = class_counts.sum(axis=-1, keepdims=True)
+
+        # An empty squad has an all-zero distribution rather than NaNs
+        age_current = np.divide(class_counts @ AGE_GROUP_MATRIX, total,
+                                out=np.zeros(total.shape[:-1] + (len(AGE_GROUPS),)), where=total > 0)
+        phase_current = np.divide(class_counts @ PHASE_MATRIX, total,
+                                  out=np.zeros(total.shape[:-1] + (len(PHASES),)), where=total > 0)
+        age_gaps = ideal_age - age_current
+        phase_gaps = ideal_phase - phase_current
+        age_balance = 1 - np.abs(age_gaps).sum(axis=-1) / 2
+        phase_balance = 1 - np.abs(phase_gaps).sum(axis=-1) / 2
+
+        return {
+            'age_current': age_current,
+            'phase_current': phase_current,
+            'age_gaps': age_gaps,
+            'phase_gaps': phase_gaps,
+            'age_balance': age_balance,
+            'phase_balance': phase_balance,
+            'overall_balance': (age_balance + phase_balance) / 2
+        }
+
+    @staticmethod
+    def _distribution_result(keys, current, gaps, balance_score, ideal: Dict) -> Dict:
+        return {
+            'current': dict(zip(keys, current.tolist())),
+            'ideal': ideal,
+            'balance_score': float(balance_score),
+            'gaps': dict(zip(keys, gaps.tolist()))
+        }
+
+    def analyze_league_balance(self, ages: np.ndarray, offsets: np.ndarray,
+                               squad_names: Optional[List[str]] = None) -> List[Dict]:
+        """Analyze many squads at once and return them ranked by overall balance.
+
+        ``ages`` holds every player of every squad back to back and
+        ``offsets`` (length ``n_squads + 1``) marks where each squad starts,
+        so squad ``i`` is ``ages[offsets[i]:offsets[i + 1]]``.
+        """
+        try:
+            ages = np.asarray(ages, dtype=np.int64)
+            offsets = np.asarray(offsets, dtype=np.int64)
+            sizes = np.diff(offsets)
+            n_squads = len(sizes)
+            if squad_names is None:
+                squad_names = [str(i) for i in range(n_squads)]
+            if (sizes <= 0).any():
+                empty = [squad_names[i] for i in np.flatnonzero(sizes <= 0)]
+                raise ValueError(f"Cannot analyze empty squads: {empty}")
+
+            # Segment reductions: one bincount over (squad, joint class) pairs
+            segment = np.repeat(np.arange(n_squads), sizes)
+            classes = np.digitize(ages, JOINT_AGE_EDGES)
+            n_classes = len(AGE_GROUP_OF_CLASS)
+            class_counts = np.bincount(
+                segment * n_classes + classes, minlength=n_squads * n_classes
+            ).reshape(n_squads, n_classes)
+            average_ages = np.bincount(segment, weights=ages, minlength=n_squads) / sizes
+
+            kernel = self._distribution_kernel(class_counts)
+            statuses = self._evaluate_squad_sizes(sizes)
+            recommendations = self._generate_batch_recommendations(sizes, kernel['age_gaps'])
+
+            ranking = np.argsort(-kernel['overall_balance'], kind='stable')
+            return [
+                {
+                    'rank': rank + 1,
+                    'squad': squad_names[i],
+                    'total_players': int(sizes[i]),
+                    'average_age': round(float(average_ages[i]), 1),
+                    'squad_size_status': statuses[i],
+                    'age_distribution': dict(zip(AGE_GROUPS, kernel['age_current'][i].tolist())),
+                    'phase_distribution': dict(zip(PHASES, kernel['phase_current'][i].tolist())),
+                    'age_gaps': dict(zip(AGE_GROUPS, kernel['age_gaps'][i].tolist())),
+                    'phase_gaps': dict(zip(PHASES, kernel['phase_gaps'][i].tolist())),
+                    'age_balance': float(kernel['age_balance'][i]),
+                    'phase_balance': float(kernel['phase_balance'][i]),
+                    'overall_balance': float(kernel['overall_balance'][i]),
+                    'recommendations': recommendations[i]
+                }
+                for rank, i in enumerate(ranking)
+            ]
+
+        except Exception as e:
+            self.logger.error(f"Error in league balance analysis: {str(e)}")
+            raise
+
+    def simulate_aging(self, ages: np.ndarray, offsets: np.ndarray, seasons: int = 5,
+                       values: Optional[np.ndarray] = None, peak_values: Optional[np.ndarray] = None,
+                       squad_names: Optional[List[str]] = None) -> List[Dict]:
+        """Age squads forward ``seasons`` years and report balance per season.
+
+        Uses the same ragged ``ages``/``offsets`` layout as
+        ``analyze_league_balance``. Every player is aged, reclassified and
+        counted for every season with a single bincount over
+        (squad, season, joint class). When ``values`` are given, squad market
+        value is projected with PerformancePredictor's growth/decline rules.
+        Season 0 is the current squad at its current value: unlike
+        ``PerformancePredictor.predict_batch``, players already past the
+        peak age decline from their current value rather than from the peak
+        value.
+        Trajectories for shorter horizons are prefixes of longer ones.
+        """
+        if not 1 <= seasons <= MAX_SEASONS:
+            raise ValueError(f"seasons must be between 1 and {MAX_SEASONS}")
+        try:
+            ages = np.asarray(ages, dtype=np.int64)
+            offsets = np.asarray(offsets, dtype=np.int64)
+            sizes = np.diff(offsets)
+            n_squads, n_seasons = len(sizes), seasons + 1
+            n_classes = len(AGE_GROUP_OF_CLASS)
+            if squad_names is None:
+                squad_names = [str(i) for i in range(n_squads)]
+
+            segment = np.repeat(np.arange(n_squads), sizes)
+            aged = ages[:, None] + np.arange(n_seasons)
+            classes = np.digitize(aged, JOINT_AGE_EDGES)
+            flat = (segment[:, None] * n_seasons + np.arange(n_seasons)) * n_classes + classes
+            class_counts = np.bincount(
+                flat.ravel(), minlength=n_squads * n_seasons * n_classes
+            ).reshape(n_squads, n_seasons, n_classes)
+
+            kernel = self._distribution_kernel(class_counts)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                average_ages = np.bincount(segment, weights=ages, minlength=n_squads) / sizes
+            average_ages = average_ages[:, None] + np.arange(n_seasons)
+
+            squad_values = None
+            if values is not None:
+                # A peak that declines to exactly the current value at the current age
+                peaks = np.where(ages >= DEFAULT_PEAK_AGE,
+                                 values / POST_PEAK_DECLINE ** (ages - DEFAULT_PEAK_AGE),
+                                 values if peak_values is None else peak_values)
+                projected = project_values(ages, values, n_seasons, peaks)
+                projected = np.where(np.isfinite(projected), projected, 0.0)
+                squad_values = np.zeros((n_squads, n_seasons))
+                np.add.at(squad_values, segment, projected)
+
+            results = []
+            for i in range(n_squads):
+                result = {
+                    'squad': squad_names[i],
+                    'total_players': int(sizes[i]),
+                    'seasons': list(range(n_seasons)),
+                    'average_age': np.round(average_ages[i], 1).tolist(),
+                    'age_balance': kernel['age_balance'][i].tolist(),
+                    'phase_balance': kernel['phase_balance'][i].tolist(),
+                    'overall_balance': kernel['overall_balance'][i].tolist(),
+                    'phase_distribution': dict(zip(PHASES, kernel['phase_current'][i].T.tolist()))
+                }
+                if squad_values is not None:
+                    result['squad_value'] = squad_values[i].tolist()
+                results.append(result)
+            return results
+
+        except Exception as e:
+            self.logger.error(f"Error in squad aging simulation: {str(e)}")
+            raise
+
+    def pack_squad_values(self, squads: Dict[str, List[Dict]]):
+        """Market and peak values in pack_squads order; peak defaults to market value"""
+        players = [player for name in squads for player in squads[name]]
+        values = np.array([
+            parse_market_value(p.get('Market value', p.get('market_value'))) for p in players
+        ], dtype=np.float64)
+        peaks = np.array([
+            parse_market_value(p.get('peak_value')) if p.get('peak_value') is not None else values[i]
+            for i, p in enumerate(players)
+        ], dtype=np.float64)
+        return values, peaks
+
+    def pack_squads(self, squads: Dict[str, List[Dict]]):
+        """Flatten named squads of player dicts into (names, ages, offsets)"""
+        names = list(squads.keys())
+        age_arrays = [self._extract_ages(squads[name]) for name in names]
+        offsets = np.zeros(len(names) + 1, dtype=np.int64)
+        offsets[1:] = np.cumsum([len(a) for a in age_arrays])
+        ages = np.concatenate(age_arrays) if age_arrays else np.zeros(0, dtype=np.int64)
+        return names, ages, offsets
+
+    def _evaluate_squad_sizes(self, sizes: np.ndarray) -> List[str]:
+        """Vectorized _evaluate_squad_size"""
+        limits = self.ideal_composition['squad_size']
+        return np.select(
+            [sizes < limits['min'], sizes > limits['max'], sizes == limits['optimal']],
+            ['understaffed', 'overstaffed', 'optimal'],
+            default='acceptable'
+        ).tolist()
+
+    def _generate_batch_recommendations(self, sizes: np.ndarray, age_gaps: np.ndarray) -> List[List[str]]:
+        """Vectorized _generate_recommendations; only flagged entries are formatted"""
+        limits = self.ideal_composition['squad_size']
+        recommendations = [[] for _ in range(len(sizes))]
+
+        for i in np.flatnonzero(sizes < limits['min']):
+            recommendations[i].append(f"Need {limits['min'] - sizes[i]} more players")
+        for i in np.flatnonzero(sizes > limits['max']):
+            recommendations[i].append(f"Squad too large by {sizes[i] - limits['max']} players")
+
+        # Row-major order keeps each squad's messages in age-group order
+        for i, g in zip(*np.nonzero(np.abs(age_gaps) > 0.1)):
+            gap = age_gaps[i, g]
+            group = AGE_GROUPS[g].replace('_', '-')
+            if gap > 0:
+                recommendations[i].append(f"Need more {group} players (+{gap:.0%})")
+            else:
+                recommendations[i].append(f"Reduce {group} players ({gap:.0%})")
+
+        return recommendations
+
+    def _analyze_squad_balance_frame(self, team_data: pd.DataFrame) -> Dict:
+        """Reference pandas implementation of analyze_squad_balance"""
         try:
             # Prepare the data
             analysis_data = pd.DataFrame()
@@ -221,3 +530,83 @@ class TeamBalanceOptimizer:
             return 'optimal'
         else:
             return 'acceptable'
+
+
+
+class SquadBalanceState:
+    """Squad balance kept up to date incrementally while a squad is edited.
+
+    Only the joint age-class counts and the age sum are stored, so adding or
+    removing a player and re-scoring are constant-time regardless of squad
+    size. Each edit returns just the parts of the analysis that changed.
+    Players are keyed by their ``id``; names are not unique, so a player
+    without one is rejected.
+    """
+
+    def __init__(self, optimizer: TeamBalanceOptimizer, players: Optional[List[Dict]] = None):
+        self.optimizer = optimizer
+        self.class_counts = np.zeros(len(AGE_GROUP_OF_CLASS), dtype=np.int64)
+        self.age_sum = 0
+        self.player_ages: Dict[str, int] = {}
+        for player in players or []:
+            self._add(player)
+        self._analysis = self.analysis()
+
+    def analysis(self) -> Dict:
+        """Full analysis for the current squad, in analyze_squad_balance format"""
+        total = len(self.player_ages)
+        return self.optimizer._analysis_from_counts(
+            self.class_counts, np.float64(self.age_sum) / total if total else 0.0
+        )
+
+    def add_player(self, player: Dict) -> Dict:
+        """Add (or replace) a player and return the analysis delta"""
+        player_id = self._add(player)
+        return self._delta('add', player_id)
+
+    def remove_player(self, player_id: str) -> Dict:
+        """Remove a player and return the analysis delta"""
+        player_id = str(player_id)
+        if player_id not in self.player_ages:
+            raise KeyError(player_id)
+        self._remove(player_id)
+        return self._delta('remove', player_id)
+
+    def _add(self, player: Dict) -> str:
+        if player.get('id') in (None, ''):
+            raise ValueError(f"Squad player has no id: {player.get('name', player)}")
+        player_id = str(player['id'])
+        if player_id in self.player_ages:
+            self._remove(player_id)
+        age = self.optimizer._extract_age(player.get('Date of birth/Age', player.get('age', '')))
+        self.player_ages[player_id] = age
+        self.class_counts[np.digitize(age, JOINT_AGE_EDGES)] += 1
+        self.age_sum += age
+        return player_id
+
+    def _remove(self, player_id: str):
+        age = self.player_ages.pop(player_id)
+        self.class_counts[np.digitize(age, JOINT_AGE_EDGES)] -= 1
+        self.age_sum -= age
+
+    def _delta(self, action: str, player_id: str) -> Dict:
+        previous, self._analysis = self._analysis, self.analysis()
+        return {
+            'action': action,
+            'player_id': player_id,
+            'changes': self._diff(previous, self._analysis)
+        }
+
+    @classmethod
+    def _diff(cls, before: Dict, after: Dict) -> Dict:
+        """Nested dict of values in ``after`` that differ from ``before``"""
+        changes = {}
+        for key, value in after.items():
+            old = before.get(key)
+            if isinstance(value, dict) and isinstance(old, dict):
+                nested = cls._diff(old, value)
+                if nested:
+                    changes[key] = nested
+            elif value != old:
+                changes[key] = value
+        return changes
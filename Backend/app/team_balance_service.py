@@ -1,17 +1,30 @@
 import json
+import time
+import uuid
+from collections import OrderedDict
 from pathlib import Path
 from typing import Dict, Optional, List
 import logging
 from datetime import datetime
+from app.model.team_balance import TeamBalanceOptimizer, SquadBalanceState
+from app.model.analysis_cache import AnalysisCache
+from app.model.co_occurrence import CoOccurrenceIndex
+from app.data.player_records import record_version
 
 class TeamBalanceService:
-    def __init__(self):
+    def __init__(self, optimizer: Optional[TeamBalanceOptimizer] = None,
+                 cache: Optional[AnalysisCache] = None):
+        self.optimizer = optimizer or TeamBalanceOptimizer()
+        self.cache = cache or AnalysisCache()
         self.data_dir = Path('data/team_balance')
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.teams_file = self.data_dir / 'saved_teams.json'
         self.players_file = self.data_dir / 'team_players.json'
         self._setup_logging()
         self.load_data()
+        # Which players users save together, kept in step with saved_teams
+        self.co_occurrence = CoOccurrenceIndex(self.players)
+        self.co_occurrence.build(self.saved_teams)
 
     def _setup_logging(self):
         """Setup logging for the service"""
@@ -66,6 +79,7 @@ class TeamBalanceService:
                 return None
 
             # Store only necessary data for team balance
+            previous = self.players.get(player_id)
             self.players[player_id] = {
                 'id': player_id,
                 'name': player_data.get('name', 'Unknown'),
@@ -75,6 +89,8 @@ class TeamBalanceService:
                 'market_value': player_data.get('market_value', 'Unknown'),
                 'last_updated': datetime.now().isoformat()
             }
+            if previous is not None and record_version(previous) != record_version(self.players[player_id]):
+                self.cache.invalidate_player(player_id)
             
             self.save_data()
             return self.players[player_id]
@@ -95,6 +111,9 @@ class TeamBalanceService:
                 'saved_at': datetime.now().isoformat()
             }
             self.save_data()
+            self.co_occurrence.set_team(team_name, player_ids)
+            # Precompute so listing saved teams can serve scores straight from cache
+            self.analyze_saved_team(team_name)
             return True
         except Exception as e:
             self.logger.error(f"Error saving team {team_name}: {str(e)}")
@@ -116,6 +135,31 @@ class TeamBalanceService:
             self.logger.error(f"Error retrieving team {team_name}: {str(e)}")
             return None
 
+    def analyze_saved_team(self, team_name: str) -> Optional[Dict]:
+        """Balance analysis of a saved team, served from cache while its records are unchanged"""
+        try:
+            team = self.saved_teams.get(team_name)
+            if not team:
+                return None
+
+            records = {
+                str(player_id): self.players[str(player_id)]
+                for player_id in team['player_ids']
+                if str(player_id) in self.players
+            }
+            if not records:
+                return None
+
+            key = AnalysisCache.squad_key('team_balance', records)
+            analysis = self.cache.get(key)
+            if analysis is None:
+                analysis = self.optimizer.analyze_squad_balance(list(records.values()))
+                self.cache.put(key, analysis, records.keys())
+            return analysis
+        except Exception as e:
+            self.logger.error(f"Error analyzing team {team_name}: {str(e)}")
+            return None
+
     def _extract_age(self, age_string: str) -> Optional[int]:
         """Extract age from various string formats"""
         try:
@@ -137,14 +181,16 @@ class TeamBalanceService:
             return None
 
     def list_saved_teams(self) -> Dict:
-        """Get list of all saved teams"""
-        return {
-            name: {
+        """Get list of all saved teams with their (cached) balance scores"""
+        teams = {}
+        for name, data in self.saved_teams.items():
+            analysis = self.analyze_saved_team(name)
+            teams[name] = {
                 'saved_at': data['saved_at'],
-                'player_count': len(data['player_ids'])
+                'player_count': len(data['player_ids']),
+                'balance_scores': analysis['balance_scores'] if analysis else None
             }
-            for name, data in self.saved_teams.items()
-        }
+        return teams
 
     def delete_saved_team(self, team_name: str) -> bool:
         """Delete a saved team"""
@@ -152,8 +198,54 @@ class TeamBalanceService:
             if team_name in self.saved_teams:
                 del self.saved_teams[team_name]
                 self.save_data()
+                self.co_occurrence.remove_team(team_name)
                 return True
             return False
         except Exception as e:
             self.logger.error(f"Error deleting team {team_name}: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+class SquadSessionManager:
+    """Holds live squad-editing sessions for the team balance page.
+
+    Sessions are evicted least-recently-used once ``max_sessions`` is reached
+    or after ``ttl_seconds`` without an edit.
+    """
+
+    def __init__(self, optimizer: TeamBalanceOptimizer, max_sessions: int = 1000,
+                 ttl_seconds: float = 3600):
+        self.optimizer = optimizer
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, SquadBalanceState]" = OrderedDict()
+        self._last_used: Dict[str, float] = {}
+
+    def create(self, players: Optional[List[Dict]] = None) -> str:
+        self._evict()
+        session_id = uuid.uuid4().hex
+        self._sessions[session_id] = SquadBalanceState(self.optimizer, players)
+        self._last_used[session_id] = time.monotonic()
+        return session_id
+
+    def get(self, session_id: str) -> Optional[SquadBalanceState]:
+        state = self._sessions.get(session_id)
+        if state is None:
+            return None
+        if time.monotonic() - self._last_used[session_id] > self.ttl_seconds:
+            self.close(session_id)
+            return None
+        self._sessions.move_to_end(session_id)
+        self._last_used[session_id] = time.monotonic()
+        return state
+
+    def close(self, session_id: str) -> bool:
+        self._last_used.pop(session_id, None)
+        return self._sessions.pop(session_id, None) is not None
+
+    def _evict(self):
+        now = time.monotonic()
+        for session_id in [sid for sid, used in self._last_used.items() if now - used > self.ttl_seconds]:
+            self.close(session_id)
+        while len(self._sessions) >= self.max_sessions:
+            session_id, _ = self._sessions.popitem(last=False)
+            self._last_used.pop(session_id, None)
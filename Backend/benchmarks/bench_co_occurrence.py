@@ -0,0 +1,45 @@
+"""Micro-benchmark: co-occurrence index updates and per-request squad scoring.
+
+    python benchmarks/bench_co_occurrence.py
+"""
+import time
+
+import numpy as np
+
+import synthetic  # noqa: F401  (sets up the import path)
+from app.model.co_occurrence import CoOccurrenceIndex
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'teams':>7} {'players':>8} {'build (s)':>10} {'save (ms)':>10} {'delete (ms)':>12} {'score (ms)':>11}")
+    for n_teams, n_players in ((1_000, 20_000), (10_000, 100_000), (50_000, 200_000)):
+        teams = {f'T{t}': [str(p) for p in rng.choice(n_players, 25, replace=False)] for t in range(n_teams)}
+        index = CoOccurrenceIndex()
+
+        start = time.perf_counter()
+        index.build({name: {'player_ids': ids} for name, ids in teams.items()})
+        build = time.perf_counter() - start
+
+        runs = 20
+        start = time.perf_counter()
+        for i in range(runs):
+            index.set_team(f'new{i}', [str(p) for p in rng.choice(n_players, 25, replace=False)])
+        save = (time.perf_counter() - start) / runs
+
+        start = time.perf_counter()
+        for i in range(runs):
+            index.remove_team(f'new{i}')
+        delete = (time.perf_counter() - start) / runs
+
+        squads = list(teams.values())[:runs]
+        start = time.perf_counter()
+        for squad in squads:
+            index.score(squad)
+        score = (time.perf_counter() - start) / runs
+
+        print(f"{n_teams:>7} {n_players:>8} {build:>10.2f} {save * 1e3:>10.2f} {delete * 1e3:>12.2f} {score * 1e3:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""Micro-benchmark: compiled tree ensemble versus sklearn's predict_proba.
+
+Trains the career phase candidates on synthetic features, then compares
+artifact load time and predict_proba latency for 1-100 row batches.
+
+    python benchmarks/bench_compiled_ensemble.py
+"""
+import time
+import tempfile
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+
+import synthetic  # noqa: F401  (sets the import path)
+from app.model.compiled_ensemble import compile_ensemble
+
+
+def timed(fn, runs: int = 50) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs
+
+
+def main():
+    rng = np.random.default_rng(0)
+    X, y = rng.normal(size=(20_000, 12)), rng.integers(0, 4, 20_000)
+    candidates = {
+        'RandomForest(200)': RandomForestClassifier(n_estimators=200, random_state=42),
+        'GradientBoosting(100)': GradientBoostingClassifier(n_estimators=100, random_state=42)
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, model in candidates.items():
+            model.fit(X, y)
+            compiled = compile_ensemble(model)
+            native_path, compiled_path = Path(tmp) / 'native.joblib', Path(tmp) / 'compiled.joblib'
+            joblib.dump(model, native_path)
+            joblib.dump(compiled, compiled_path)
+            load_native = timed(lambda: joblib.load(native_path), 3)
+            load_compiled = timed(lambda: joblib.load(compiled_path, mmap_mode='r'), 3)
+
+            print(f"\n{name}: {compiled.n_nodes} nodes, load {load_native * 1e3:.0f} ms native / "
+                  f"{load_compiled * 1e3:.1f} ms compiled (mmap)")
+            print(f"{'rows':>6} {'sklearn (ms)':>13} {'compiled (ms)':>14} {'speed-up':>9}")
+            for rows in (1, 10, 100):
+                batch = rng.normal(size=(rows, 12))
+                native = timed(lambda: model.predict_proba(batch))
+                fast = timed(lambda: compiled.predict_proba(batch))
+                print(f"{rows:>6} {native * 1e3:>13.2f} {fast * 1e3:>14.2f} {native / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
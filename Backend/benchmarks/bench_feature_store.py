@@ -0,0 +1,59 @@
+"""Micro-benchmark: feature store build, refresh, bulk reads and memory-mapped loads.
+
+"per request" is what every analysis paid before: flattening the squad's
+records and computing their features from scratch. "store read" gathers
+the same rows from the store.
+
+    python benchmarks/bench_feature_store.py
+"""
+import time
+import tempfile
+from pathlib import Path
+
+from synthetic import make_corpus
+from app.model.feature_store import FeatureStore
+from app.model.similarity_index import index_row, profile_features
+
+
+def main():
+    print(f"{'players':>8} {'build (s)':>10} {'refresh 1% (s)':>15} {'per request (ms)':>17} "
+          f"{'store read (ms)':>16} {'load (ms)':>10}")
+    for n in (10_000, 100_000):
+        corpus = make_corpus(n)
+        store = FeatureStore()
+
+        start = time.perf_counter()
+        store.upsert_many(corpus.items())
+        build = time.perf_counter() - start
+
+        # 1% of the records change; everything is offered again
+        for pid in list(corpus)[::100]:
+            corpus[pid] = dict(corpus[pid], **{'Market value': '€99.00m'})
+        start = time.perf_counter()
+        assert store.upsert_many(corpus.items()) == len(range(0, n, 100))
+        refresh = time.perf_counter() - start
+
+        squad = list(corpus)[::n // 25][:25]
+        runs = 200
+        start = time.perf_counter()
+        for _ in range(runs):
+            profile_features([index_row(pid, corpus[pid]) for pid in squad])
+        per_request = (time.perf_counter() - start) / runs
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            store.profile(squad)
+        store_read = (time.perf_counter() - start) / runs
+
+        with tempfile.TemporaryDirectory() as tmp:
+            store.save(Path(tmp))
+            start = time.perf_counter()
+            FeatureStore.load(Path(tmp))
+            load = time.perf_counter() - start
+
+        print(f"{n:>8} {build:>10.2f} {refresh:>15.2f} {per_request * 1e3:>17.3f} "
+              f"{store_read * 1e3:>16.3f} {load * 1e3:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Micro-benchmark: feature engineering, column-at-a-time pandas versus the shared module.
+
+The pandas path replays the old FeatureEngineering.transform (one
+DataFrame column per feature, then two np.percentile calls, a clip and a
+fillna(median) per column). The vectorized path is
+app.model.features.transform.
+
+    python benchmarks/bench_features.py
+"""
+import time
+
+import numpy as np
+import pandas as pd
+
+from synthetic import make_training_frame
+from app.model import features
+from app.model.roster_analyzer import FeatureEngineering
+
+
+def pandas_transform(data: pd.DataFrame) -> pd.DataFrame:
+    divide = FeatureEngineering.safe_divide
+    col = lambda name: data[name].to_numpy(dtype=float)
+    X = pd.DataFrame()
+    X['Minutes_per_Game'] = divide(col('Career_Minutes'), col('Career_Games'))
+    X['Goals_per_Game'] = divide(col('Career_Goals'), col('Career_Games'))
+    X['Assists_per_Game'] = divide(col('Career_Assists'), col('Career_Games'))
+    X['Goal_to_Assist_Ratio'] = divide(X['Goals_per_Game'].to_numpy(), X['Assists_per_Game'].to_numpy())
+    X['Minutes_per_Goal'] = divide(X['Minutes_per_Game'].to_numpy(), X['Goals_per_Game'].to_numpy())
+    X['Card_Rate'] = divide(col('Career_Yellows') + col('Career_Reds') * 3, col('Career_Games'))
+    X['Goal_Involvement'] = X['Goals_per_Game'] + X['Assists_per_Game']
+    X['Minutes_Share'] = divide(col('Career_Minutes'), 90 * col('Career_Games'))
+    X['Value_Growth'] = divide(col('Current_Value') - col('Peak_Value'), col('Peak_Value') + 1)
+    X['Value_Stability'] = divide(col('Current_Value'), col('Peak_Value') + 1)
+    X['Value_to_Squad_Ratio'] = divide(col('Current_Value'), col('Squad_Size') * col('Peak_Value').mean())
+    X['Playing_Time_Share'] = divide(col('Career_Minutes'), col('Squad_Size') * col('Career_Games') * 90)
+    for name in X.columns:
+        X[name] = X[name].clip(np.percentile(X[name], 1), np.percentile(X[name], 99))
+    X = X.replace([np.inf, -np.inf], np.nan)
+    for name in X.columns:
+        X[name] = X[name].fillna(X[name].median())
+    return X
+
+
+def timed(fn, runs: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs
+
+
+def main():
+    print(f"{'rows':>9} {'pandas (ms)':>12} {'vectorized (ms)':>16} {'as frame (ms)':>14} {'speed-up':>9}")
+    for n in (25, 1_000, 100_000, 1_000_000):
+        data = make_training_frame(n)
+        runs = 200 if n <= 1000 else (10 if n <= 100_000 else 3)
+        legacy = timed(lambda: pandas_transform(data), runs)
+        fast = timed(lambda: features.transform(data), runs)
+        frame = timed(lambda: features.transform(data, as_frame=True), runs)
+        print(f"{n:>9} {legacy * 1e3:>12.2f} {fast * 1e3:>16.2f} {frame * 1e3:>14.2f} {legacy / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""Micro-benchmark: cost of logging a 25-player analysis's phase predictions.
+
+"per-row rewrite" is the old loop in RosterAnalyzer._build_results, one
+record_phase_prediction_feedback call (a full rewrite of the feedback
+file) per player. "queued" is queue_phase_predictions; the background
+writer appends the entries off the request path.
+
+    python benchmarks/bench_feedback_writer.py
+"""
+import os
+import time
+import tempfile
+
+from synthetic import make_training_frame
+from app.model.feedback_system import FeedbackSystem
+
+
+def main():
+    team = make_training_frame(25)
+    metrics = [{'games_played': int(g), 'goals_per_game': 0.3, 'minutes_per_game': 70.0}
+               for g in team['Career_Games']]
+    print(f"{'history':>8} {'per-row rewrite (ms)':>21} {'queued (ms)':>12} {'writer batch (ms)':>18}")
+    for history in (0, 10_000, 100_000):
+        with tempfile.TemporaryDirectory() as tmp:
+            cwd = os.getcwd()
+            os.chdir(tmp)
+            try:
+                feedback = FeedbackSystem()
+                predictions = feedback.feedback_data['phase_predictions']
+                for i in range(history):
+                    predictions[f'Old {i}'] = [{'timestamp': '', 'predicted_phase': 'peak', 'actual_phase': None,
+                                                'performance_metrics': metrics[0], 'prediction_accuracy': 0}]
+
+                runs = 3
+                start = time.perf_counter()
+                for _ in range(runs):
+                    for name, metric in zip(team['Name'], metrics):
+                        feedback.record_phase_prediction_feedback(name, 'peak', None, metric)
+                rewrite = (time.perf_counter() - start) / runs
+
+                runs = 200
+                start = time.perf_counter()
+                for _ in range(runs):
+                    feedback.queue_phase_predictions(team['Name'].tolist(), ['peak'] * 25, metrics)
+                queued = (time.perf_counter() - start) / runs
+                feedback.writer.flush()
+                stats = feedback.writer.stats()
+                feedback.writer.close()
+            finally:
+                os.chdir(cwd)
+
+        print(f"{history:>8} {rewrite * 1e3:>21.1f} {queued * 1e3:>12.3f} "
+              f"{stats['write_seconds'] / stats['batches'] * 1e3:>18.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Micro-benchmark: career phase inference latency by batch size.
+
+Times the fitted pipeline's pure transform and transform + predict_proba.
+The old per-request path refitted the clip percentiles, medians and
+StandardScaler on every call and could not score a single player at all.
+
+    python benchmarks/bench_inference_pipeline.py
+"""
+import time
+
+from synthetic import make_training_frame
+from app.model.inference_pipeline import CareerPhasePipeline, age_labels
+
+
+def timed(fn, runs: int) -> float:
+    fn()
+    start = time.perf_counter()
+    for _ in range(runs):
+        fn()
+    return (time.perf_counter() - start) / runs
+
+
+def main():
+    training = make_training_frame(20_000)
+    pipeline = CareerPhasePipeline().fit(training, age_labels(training['Age']))
+
+    print(f"{'batch':>6} {'transform (us)':>15} {'predict (ms)':>13} {'per player (us)':>16}")
+    for size in (1, 25, 1000):
+        batch = make_training_frame(size, seed=size)
+        runs = 200 if size < 1000 else 20
+        transform = timed(lambda: pipeline.transform(batch), runs)
+        predict = timed(lambda: pipeline.predict_proba(batch), runs)
+        print(f"{size:>6} {transform * 1e6:>15.0f} {predict * 1e3:>13.2f} {predict / size * 1e6:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
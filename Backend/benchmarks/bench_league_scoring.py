@@ -0,0 +1,56 @@
+"""Micro-benchmark: league-wide career phase scoring.
+
+"per team" scores the league one 25-player squad at a time, as
+analyze_team requests did. "league" is score_league: large chunks with
+vectorized recommendation rules, in one process and across a pool that
+loads the model once per worker.
+
+    python benchmarks/bench_league_scoring.py
+"""
+import os
+import time
+import tempfile
+from pathlib import Path
+
+from synthetic import make_training_frame
+from app.model.inference_pipeline import CareerPhasePipeline, age_labels
+from app.model.league_scoring import publish_results, score_chunk, score_league
+from app.model.model_registry import CAREER_PHASE_PIPELINE, ModelRegistry
+
+
+def main():
+    workers = os.cpu_count() or 1
+    with tempfile.TemporaryDirectory() as tmp:
+        models = ModelRegistry(Path(tmp) / 'models')
+        training = make_training_frame(5000)
+        models.publish(CAREER_PHASE_PIPELINE,
+                       CareerPhasePipeline().fit(training, age_labels(training['Age'])), {'version': 'bench'})
+        pipeline = models.get(CAREER_PHASE_PIPELINE)
+
+        print(f"{'players':>8} {'per team (s)':>13} {'league x1 (s)':>14} "
+              f"{f'league x{workers} (s)':>15} {'publish (s)':>12}")
+        for n in (10_000, 100_000):
+            league = make_training_frame(n, seed=1)
+
+            start = time.perf_counter()
+            for offset in range(0, n, 25):
+                score_chunk(league.iloc[offset:offset + 25], pipeline)
+            per_team = time.perf_counter() - start
+
+            start = time.perf_counter()
+            score_league(league, models.model_dir, workers=1)
+            single = time.perf_counter() - start
+
+            start = time.perf_counter()
+            results = score_league(league, models.model_dir, workers=workers)
+            pooled = time.perf_counter() - start
+
+            start = time.perf_counter()
+            publish_results(results, Path(tmp) / 'league')
+            publish = time.perf_counter() - start
+
+            print(f"{n:>8} {per_team:>13.2f} {single:>14.2f} {pooled:>15.2f} {publish:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
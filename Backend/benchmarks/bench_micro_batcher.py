@@ -0,0 +1,66 @@
+"""Micro-benchmark: career phase throughput and latency under concurrent load.
+
+Simulates concurrent clients that each score one player or a 25-player
+team per request. Each request either runs predict_proba on its own
+(in a worker thread, as run_in_executor would) or goes through the
+MicroBatcher.
+
+    python benchmarks/bench_micro_batcher.py
+"""
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from synthetic import make_training_frame
+from app.model.inference_pipeline import CareerPhasePipeline, age_labels
+from app.model.micro_batcher import MicroBatcher
+
+
+async def load(submit, requests, clients: int):
+    latencies = []
+    queue = list(requests)
+
+    async def client():
+        while queue:
+            rows = queue.pop()
+            start = time.perf_counter()
+            await submit(rows)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(clients)))
+    return time.perf_counter() - start, np.array(latencies)
+
+
+def main():
+    training = make_training_frame(20_000)
+    pipeline = CareerPhasePipeline().fit(training, age_labels(training['Age']))
+    model = pipeline.model
+    corpus = pipeline.transform(make_training_frame(5000, seed=1))
+
+    print(f"{'rows/req':>8} {'clients':>8} {'mode':>9} {'req/s':>8} {'p50 (ms)':>9} "
+          f"{'p99 (ms)':>9} {'rows/batch':>11}")
+    for rows_per_request, clients, n_requests in ((1, 64, 600), (25, 16, 200)):
+        requests = [corpus[i * rows_per_request % 4000:][:rows_per_request] for i in range(n_requests)]
+        executor = ThreadPoolExecutor(max_workers=1)
+
+        async def direct(rows):
+            return await asyncio.get_running_loop().run_in_executor(executor, model.predict_proba, rows)
+
+        batcher = MicroBatcher(model.predict_proba, max_batch_size=512, max_wait_ms=2.0)
+
+        async def batched(rows):
+            return await batcher.submit(rows)
+
+        for mode, submit in (('direct', direct), ('batched', batched)):
+            elapsed, latencies = asyncio.run(load(submit, requests, clients))
+            per_batch = batcher.stats()['mean_batch_rows'] if mode == 'batched' else rows_per_request
+            print(f"{rows_per_request:>8} {clients:>8} {mode:>9} {n_requests / elapsed:>8.0f} "
+                  f"{np.percentile(latencies, 50) * 1e3:>9.1f} {np.percentile(latencies, 99) * 1e3:>9.1f} "
+                  f"{per_batch:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Micro-benchmark: model start-up time and per-process memory.
+
+Compares the old pattern (PerformancePredictor plus its RosterAnalyzer each
+calling joblib.load, three copies per process) with the shared registry
+(one lazy load). A second table shows RSS for worker processes that load
+an ndarray artifact privately versus memory-mapped.
+
+    python benchmarks/bench_model_registry.py
+"""
+import os
+import time
+import tempfile
+import multiprocessing as mp
+from pathlib import Path
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+import synthetic  # noqa: F401  (sets the import path)
+from app.model.model_registry import CAREER_PHASE_MODEL, ModelRegistry
+
+
+def rss_mb() -> float:
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+
+
+def anonymous_rss_mb() -> float:
+    """Resident heap pages; file-backed (mapped) pages are shared through the page cache"""
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            if line.startswith('Anonymous:'):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _startup(model_dir: str, shared: bool, queue):
+    before = rss_mb()
+    start = time.perf_counter()
+    if shared:
+        models = ModelRegistry(Path(model_dir))
+        loaded = [models.get(CAREER_PHASE_MODEL) for _ in range(3)]
+    else:
+        loaded = [joblib.load(Path(model_dir) / CAREER_PHASE_MODEL) for _ in range(3)]
+    queue.put((time.perf_counter() - start, rss_mb() - before))
+
+
+def _worker(path: str, mmap_mode, queue):
+    before = anonymous_rss_mb()
+    weights = joblib.load(path, mmap_mode=mmap_mode)
+    float(weights.sum())  # touch every page
+    queue.put(anonymous_rss_mb() - before)
+
+
+def run(target, *args):
+    queue = mp.Queue()
+    process = mp.Process(target=target, args=args + (queue,))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        rng = np.random.default_rng(0)
+        X, y = rng.normal(size=(20_000, 12)), rng.integers(0, 4, 20_000)
+        model = RandomForestClassifier(n_estimators=100, random_state=0).fit(X, y)
+        joblib.dump(model, Path(tmp) / CAREER_PHASE_MODEL)
+
+        print(f"{'pattern':>22} {'startup (s)':>12} {'RSS (MB)':>9}")
+        for label, shared in (('three joblib.load', False), ('shared registry', True)):
+            seconds, rss = run(_startup, tmp, shared)
+            print(f"{label:>22} {seconds:>12.2f} {rss:>9.1f}")
+
+        path = str(Path(tmp) / 'weights.joblib')
+        joblib.dump(rng.normal(size=(16_000_000,)), path)  # 128 MB of float64
+        print(f"\n{'ndarray artifact':>22} {'unshared RSS per worker (MB)':>28}")
+        for label, mmap_mode in (('private copy', None), ('mmap_mode="r"', 'r')):
+            print(f"{label:>22} {run(_worker, path, mmap_mode):>28.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Micro-benchmark: per-player performance prediction vs predict_batch.
+
+"per player" runs the test suite's reference port of the original
+one-player helpers one row at a time.
+"batch" is predict_batch; "batch + records" also streams the nested
+per-player dicts out of it with iter_predictions.
+
+    python benchmarks/bench_performance_predictor.py
+"""
+import time
+import warnings
+
+from synthetic import make_training_frame
+from app.model.performance_predictor import PerformancePredictor
+from tests.test_performance_predictor import _per_player
+
+
+def per_player(data):
+    for i in range(len(data)):
+        yield _per_player(data.iloc[i:i + 1])
+
+
+def main():
+    warnings.simplefilter('ignore', RuntimeWarning)
+    predictor = PerformancePredictor()
+    print(f"{'players':>8} {'per player (ms)':>16} {'batch (ms)':>11} {'batch + records (ms)':>21} {'speedup':>8}")
+    for n in (25, 1_000, 10_000):
+        data = make_training_frame(n)
+        loop_n = min(n, 1_000)  # the loop is timed on at most 1000 rows and scaled
+
+        start = time.perf_counter()
+        for _ in per_player(data.iloc[:loop_n]):
+            pass
+        loop = (time.perf_counter() - start) * n / loop_n
+
+        runs = 20
+        start = time.perf_counter()
+        for _ in range(runs):
+            predictor.predict_batch(data)
+        batch = (time.perf_counter() - start) / runs
+
+        start = time.perf_counter()
+        for _ in predictor.iter_predictions(predictor.predict_batch(data)):
+            pass
+        records = time.perf_counter() - start
+
+        print(f"{n:>8} {loop * 1e3:>16.1f} {batch * 1e3:>11.2f} {records * 1e3:>21.1f} {loop / batch:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
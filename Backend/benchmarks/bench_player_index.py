@@ -0,0 +1,57 @@
+"""Micro-benchmark: indexed player queries vs filtering the flattened corpus in Python.
+
+    python benchmarks/bench_player_index.py
+"""
+import time
+
+from synthetic import make_corpus
+from app.data.player_index import PlayerIndex
+from app.data.player_records import flatten_player
+
+QUERIES = {
+    'age 21-24': dict(ranges={'age': (21, 24)}),
+    'CF, <20m, 1000+ min': dict(ranges={'market_value': (None, 20e6), 'career_minutes': (1000, None)},
+                                equals={'position': 'Centre-Forward'}),
+    'club + nationality': dict(equals={'club': 'Club 7', 'nationality': 'Country 13'}),
+    'peak, 30-50m': dict(ranges={'market_value': (30e6, 50e6)}, equals={'career_phase': 'peak'}),
+}
+
+
+def scan(rows, ranges=None, equals=None):
+    ranges, equals = ranges or {}, equals or {}
+    out = []
+    for row in rows:
+        if all((lo is None or row[f] >= lo) and (hi is None or row[f] <= hi) for f, (lo, hi) in ranges.items()) \
+                and all(row[f] == v for f, v in equals.items()):
+            out.append(row)
+    return sorted(out, key=lambda r: -r['market_value'])[:50]
+
+
+def main():
+    for n in (100_000, 1_000_000):
+        corpus = make_corpus(n)
+        rows = [flatten_player(pid, record) for pid, record in corpus.items()]
+
+        start = time.perf_counter()
+        index = PlayerIndex(corpus)
+        len(index)
+        build = time.perf_counter() - start
+        print(f"\n{n} players, index built in {build:.2f}s")
+        print(f"{'query':>22} {'matches':>8} {'scan (ms)':>10} {'index (ms)':>11} {'speedup':>8}")
+
+        for name, query in QUERIES.items():
+            start = time.perf_counter()
+            scan(rows, **query)
+            scanned = time.perf_counter() - start
+
+            runs = 20
+            start = time.perf_counter()
+            for _ in range(runs):
+                page = index.query(**query, sort_by='market_value', limit=50)
+            indexed = (time.perf_counter() - start) / runs
+            print(f"{name:>22} {page['total']:>8} {scanned * 1e3:>10.1f} {indexed * 1e3:>11.2f} "
+                  f"{scanned / indexed:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""Micro-benchmark: single-pass top-k candidates vs the per-phase corpus scans.
+
+    python benchmarks/bench_recommendations.py
+"""
+import time
+
+from synthetic import make_corpus
+from app.model.recommendation_engine import RecommendationEngine
+
+
+def main():
+    engine = RecommendationEngine()
+    phases = list(engine.career_phases)
+    print(f"{'players':>8} {'phase scans (ms)':>17} {'columns (ms)':>13} {'top-k (ms)':>11} {'speedup':>8}")
+    for n in (10_000, 100_000, 1_000_000):
+        corpus = make_corpus(n)
+        squad_ids = list(corpus)[:25]
+
+        start = time.perf_counter()
+        legacy = {phase: engine._scan_phase_candidates(corpus, squad_ids, phase) for phase in phases}
+        scan = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine._candidate_columns(corpus)
+        build = time.perf_counter() - start
+
+        runs = 20
+        start = time.perf_counter()
+        for _ in range(runs):
+            batched = engine._get_candidates(corpus, squad_ids, phases)
+        topk = (time.perf_counter() - start) / runs
+        assert batched == legacy
+
+        print(f"{n:>8} {scan * 1e3:>17.1f} {build * 1e3:>13.1f} {topk * 1e3:>11.2f} {scan / topk:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Micro-benchmark: handing the player corpus to worker processes.
+
+Before, a worker either unpickled the player records or was sent its rows
+as a pickled DataFrame chunk ("pickled"). "shared" publishes the feature
+rows once to shared memory; workers attach by name, and a task carries
+only a CorpusHandle and a row range.
+
+    python benchmarks/bench_shared_corpus.py
+"""
+import os
+import time
+import pickle
+import tempfile
+from pathlib import Path
+
+from synthetic import make_corpus, make_training_frame
+from app.model.feature_store import FeatureStore
+from app.model.inference_pipeline import CareerPhasePipeline, age_labels
+from app.model.league_scoring import score_league, score_store
+from app.model.model_registry import CAREER_PHASE_PIPELINE, ModelRegistry
+from app.model.shared_corpus import SharedCorpus, attach
+
+
+def main():
+    workers = max(os.cpu_count() or 1, 2)
+    with tempfile.TemporaryDirectory() as tmp:
+        models = ModelRegistry(Path(tmp) / 'models')
+        training = make_training_frame(5000)
+        models.publish(CAREER_PHASE_PIPELINE,
+                       CareerPhasePipeline().fit(training, age_labels(training['Age'])), {'version': 'bench'})
+
+        print(f"{'players':>8} {'records (MB)':>13} {'unpickle (ms)':>14} {'publish (ms)':>13} "
+              f"{'attach (ms)':>12} {'chunk task (KB)':>16} {'shared task (KB)':>17} "
+              f"{'pickled run (s)':>16} {'shared run (s)':>15}")
+        for n in (10_000, 100_000):
+            records = make_corpus(n)
+            store = FeatureStore()
+            store.upsert_many(records.items())
+
+            payload = pickle.dumps(records, protocol=pickle.HIGHEST_PROTOCOL)
+            start = time.perf_counter()
+            pickle.loads(payload)
+            unpickle = time.perf_counter() - start
+
+            with SharedCorpus() as corpus:
+                start = time.perf_counter()
+                handle = corpus.publish(store)
+                publish = time.perf_counter() - start
+                start = time.perf_counter()
+                attach(handle)
+                attached = time.perf_counter() - start
+                frame = store.frame(store.ids, 25)
+                chunk_bytes = len(pickle.dumps(frame.iloc[:5000]))
+                task_bytes = len(pickle.dumps((handle, 0, 5000, 25)))
+
+                start = time.perf_counter()
+                score_league(frame, models.model_dir, workers=workers)
+                pickled_run = time.perf_counter() - start
+
+                start = time.perf_counter()
+                score_store(store, models.model_dir, workers=workers, corpus=corpus)
+                shared_run = time.perf_counter() - start
+
+            print(f"{n:>8} {len(payload) / 1e6:>13.1f} {unpickle * 1e3:>14.1f} {publish * 1e3:>13.1f} "
+                  f"{attached * 1e3:>12.1f} {chunk_bytes / 1e3:>16.1f} {task_bytes / 1e3:>17.1f} "
+                  f"{pickled_run:>16.2f} {shared_run:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""Micro-benchmark: similarity index build, insert and k-NN query latency.
+
+    python benchmarks/bench_similarity_index.py
+"""
+import time
+
+import numpy as np
+
+from synthetic import make_corpus
+from app.model.similarity_index import SimilarityIndex
+
+
+def main():
+    print(f"{'players':>8} {'build (s)':>10} {'insert (us)':>12} {'query (ms)':>11} "
+          f"{'filtered (ms)':>14} {'batch of 32 (ms)':>17}")
+    for n in (10_000, 100_000, 1_000_000):
+        corpus = make_corpus(n)
+        index = SimilarityIndex()
+
+        start = time.perf_counter()
+        index.build(corpus.items())
+        build = time.perf_counter() - start
+
+        extra = make_corpus(200, seed=7)
+        start = time.perf_counter()
+        for pid, record in extra.items():
+            index.upsert(f'new-{pid}', record)
+        insert = (time.perf_counter() - start) / len(extra)
+
+        ids = list(corpus)[:32]
+        runs = 10
+        start = time.perf_counter()
+        for i in range(runs):
+            index.query(ids[i], k=10)
+        query = (time.perf_counter() - start) / runs
+
+        start = time.perf_counter()
+        for i in range(runs):
+            index.query(ids[i], k=10, phase='peak', position='Centre-Forward', max_value=20e6)
+        filtered = (time.perf_counter() - start) / runs
+
+        start = time.perf_counter()
+        index.query_many(ids, k=10)
+        batch = time.perf_counter() - start
+
+        print(f"{n:>8} {build:>10.2f} {insert * 1e6:>12.0f} {query * 1e3:>11.2f} "
+              f"{filtered * 1e3:>14.2f} {batch * 1e3:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
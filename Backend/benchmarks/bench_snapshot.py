@@ -0,0 +1,95 @@
+"""Load time and RSS of the Arrow/Parquet snapshots vs the JSON and CSV paths.
+
+Each load runs in a fresh process so resident memory is measured in isolation.
+
+    python benchmarks/bench_snapshot.py --players 200000
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from synthetic import make_corpus, make_training_frame
+
+
+def rss_mb() -> float:
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+
+
+def _measure(label, loader, path, queue):
+    # Import cost is the same for every path; keep it out of the numbers
+    import pandas  # noqa: F401
+    import app.data.snapshot  # noqa: F401
+    before = rss_mb()
+    start = time.perf_counter()
+    result = loader(path)
+    elapsed = time.perf_counter() - start
+    queue.put((label, elapsed, rss_mb() - before, len(result)))
+
+
+def load_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_csv(path):
+    import pandas as pd
+    return pd.read_csv(path)
+
+
+def load_arrow(path):
+    from app.data.snapshot import load_snapshot_frame
+    return load_snapshot_frame(path)
+
+
+def load_arrow_table(path):
+    from app.data.snapshot import load_snapshot
+    return load_snapshot(path)
+
+
+def run(label, loader, path):
+    queue = mp.Queue()
+    proc = mp.Process(target=_measure, args=(label, loader, path, queue))
+    proc.start()
+    result = queue.get()
+    proc.join()
+    label, elapsed, rss, rows = result
+    print(f"{label:<32} {elapsed * 1000:>10.1f} ms {rss:>10.1f} MB {rows:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--players', type=int, default=100000)
+    args = parser.parse_args()
+
+    from app.data.player_store import PlayerStore
+    from app.data.snapshot import export_corpus_snapshot, export_csv_snapshot
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        with open(tmp / 'players.json', 'w', encoding='utf-8') as f:
+            json.dump(make_corpus(args.players), f, indent=2)
+        make_training_frame(args.players).to_csv(tmp / 'player_database.csv', index=False)
+
+        store = PlayerStore(tmp / 'players.json')
+        export_corpus_snapshot(store, tmp / 'corpus_arrow', fmt='arrow')
+        export_corpus_snapshot(store, tmp / 'corpus_parquet', fmt='parquet')
+        export_csv_snapshot(tmp / 'player_database.csv', tmp / 'training_arrow', fmt='arrow')
+        export_csv_snapshot(tmp / 'player_database.csv', tmp / 'training_parquet', fmt='parquet')
+
+        print(f"{'path':<32} {'load':>13} {'RSS delta':>13} {'rows':>10}")
+        run('corpus json.load', load_json, tmp / 'players.json')
+        run('corpus arrow (mmap table)', load_arrow_table, tmp / 'corpus_arrow')
+        run('corpus arrow -> pandas', load_arrow, tmp / 'corpus_arrow')
+        run('corpus parquet -> pandas', load_arrow, tmp / 'corpus_parquet')
+        run('training pd.read_csv', load_csv, tmp / 'player_database.csv')
+        run('training arrow -> pandas', load_arrow, tmp / 'training_arrow')
+        run('training parquet -> pandas', load_arrow, tmp / 'training_parquet')
+
+
+if __name__ == "__main__":
+    main()
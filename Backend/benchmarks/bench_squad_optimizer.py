@@ -0,0 +1,41 @@
+"""Squad composition search time across candidate pool sizes and move limits.
+
+    python benchmarks/bench_squad_optimizer.py
+"""
+import time
+
+import numpy as np
+
+import synthetic  # noqa: F401  (sets up the import path)
+from app.model.squad_optimizer import SquadCompositionOptimizer
+
+
+def make_pool(n: int, seed: int = 1):
+    rng = np.random.default_rng(seed)
+    ages = rng.integers(16, 39, n)
+    values = rng.uniform(2e5, 8e7, n)
+    return [{'id': f'c{i}', 'name': f'Candidate {i}', 'age': int(ages[i]), 'market_value': float(values[i])}
+            for i in range(n)]
+
+
+def make_squad(size: int, seed: int = 2):
+    rng = np.random.default_rng(seed)
+    return [{'id': f's{i}', 'age': int(a), 'market_value': '€5.00m'} for i, a in enumerate(rng.integers(17, 36, size))]
+
+
+def main():
+    optimizer = SquadCompositionOptimizer()
+    print(f"{'pool':>8} {'squad':>6} {'max moves':>10} {'time (ms)':>10} {'best balance':>13}")
+    for pool_size in (1000, 10000, 100000):
+        pool = make_pool(pool_size)
+        for squad_size, max_moves in ((25, 4), (25, 8), (12, 10), (2, 6)):
+            squad = make_squad(squad_size)
+            start = time.perf_counter()
+            result = optimizer.optimize(squad, pool, budget=1.5e8, max_moves=max_moves, top_n=5)
+            elapsed = time.perf_counter() - start
+            best = result['options'][0]['balance_scores']['overall_balance'] if result['options'] else float('nan')
+            print(f"{pool_size:>8} {squad_size:>6} {max_moves:>10} {elapsed * 1e3:>10.1f} {best:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
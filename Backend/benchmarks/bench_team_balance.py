@@ -0,0 +1,63 @@
+"""Micro-benchmark: NumPy kernel vs the original pandas squad balance analysis.
+
+    python benchmarks/bench_team_balance.py
+"""
+import timeit
+
+import numpy as np
+import pandas as pd
+
+import synthetic  # noqa: F401  (sets up the import path)
+from app.model.team_balance import TeamBalanceOptimizer
+
+
+def make_squad(size: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    return [
+        {'name': f'Player {i}', 'Date of birth/Age': f'2000-01-01 ({age})'}
+        for i, age in enumerate(rng.integers(17, 36, size))
+    ]
+
+
+def main():
+    optimizer = TeamBalanceOptimizer()
+    print(f"{'squad':>6} {'pandas (us)':>12} {'kernel (us)':>12} {'speedup':>8}")
+    for size in (11, 25, 40, 100):
+        squad = make_squad(size)
+        frame = pd.DataFrame(squad)
+        assert optimizer.analyze_squad_balance(squad) == optimizer._analyze_squad_balance_frame(frame)
+
+        runs = 200
+        legacy = min(timeit.repeat(lambda: optimizer._analyze_squad_balance_frame(pd.DataFrame(squad)),
+                                   number=runs, repeat=3)) / runs
+        kernel = min(timeit.repeat(lambda: optimizer.analyze_squad_balance(squad),
+                                   number=runs, repeat=3)) / runs
+        print(f"{size:>6} {legacy * 1e6:>12.1f} {kernel * 1e6:>12.1f} {legacy / kernel:>7.1f}x")
+
+    print(f"\n{'squads':>6} {'per-squad loop (ms)':>20} {'batch (ms)':>11} {'speedup':>8}")
+    for n_squads in (20, 100, 1000):
+        squads = {f'Club {i}': make_squad(25, seed=i) for i in range(n_squads)}
+        names, ages, offsets = optimizer.pack_squads(squads)
+
+        runs = 5
+        loop = min(timeit.repeat(lambda: [optimizer.analyze_squad_balance(s) for s in squads.values()],
+                                 number=runs, repeat=3)) / runs
+        batch = min(timeit.repeat(lambda: optimizer.analyze_league_balance(ages, offsets, names),
+                                  number=runs, repeat=3)) / runs
+        print(f"{n_squads:>6} {loop * 1e3:>20.2f} {batch * 1e3:>11.2f} {loop / batch:>7.1f}x")
+
+    print(f"\n{'squads':>6} {'seasons':>8} {'simulate (ms)':>14}")
+    for n_squads in (20, 100, 1000):
+        squads = {f'Club {i}': make_squad(25, seed=i) for i in range(n_squads)}
+        names, ages, offsets = optimizer.pack_squads(squads)
+        values = np.random.default_rng(0).uniform(1e5, 8e7, len(ages))
+        for seasons in (3, 5, 10):
+            runs = 5
+            sim = min(timeit.repeat(
+                lambda: optimizer.simulate_aging(ages, offsets, seasons, values=values, squad_names=names),
+                number=runs, repeat=3)) / runs
+            print(f"{n_squads:>6} {seasons:>8} {sim * 1e3:>14.2f}")
+
+
+if __name__ == "__main__":
+    main()
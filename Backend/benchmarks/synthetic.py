@@ -0,0 +1,66 @@
+"""Synthetic player data shared by the benchmark scripts"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add Backend directory to system path
+sys.path.append(str(Path(__file__).parent.parent))
+
+POSITIONS = ['Goalkeeper', 'Centre-Back', 'Left-Back', 'Right-Back', 'Defensive Midfield',
+             'Central Midfield', 'Attacking Midfield', 'Left Winger', 'Right Winger', 'Centre-Forward']
+CLUBS = [f'Club {i}' for i in range(400)]
+NATIONALITIES = [f'Country {i}' for i in range(120)]
+
+
+def make_corpus(n: int, seed: int = 42) -> dict:
+    """Scraped-format player records keyed by id"""
+    rng = np.random.default_rng(seed)
+    ages = rng.integers(16, 39, n)
+    apps = rng.integers(0, 45, n)
+    values = rng.uniform(0.1, 80, n)
+    corpus = {}
+    for i in range(n):
+        pid = str(100000 + i)
+        corpus[pid] = {
+            'id': pid,
+            'Full name': f'Player {i}',
+            'Date of birth/Age': f'{2023 - ages[i]}-01-01 ({ages[i]})',
+            'Position': POSITIONS[i % len(POSITIONS)],
+            'Current club': CLUBS[(i * 7) % len(CLUBS)],
+            'Citizenship': NATIONALITIES[(i * 13) % len(NATIONALITIES)],
+            'Market value': f'€{values[i]:.2f}m',
+            'image_url': None,
+            'careerStats': [{
+                'Season': '2022/23',
+                'Appearances': str(apps[i]),
+                'Goals': str(int(apps[i] * rng.uniform(0, 0.6))),
+                'Assists': str(int(apps[i] * rng.uniform(0, 0.4))),
+                'Minutes': str(int(apps[i] * rng.uniform(20, 90)))
+            }]
+        }
+    return corpus
+
+
+def make_training_frame(n: int, seed: int = 42) -> pd.DataFrame:
+    """Rows shaped like player_database.csv / the RosterAnalyzer input"""
+    rng = np.random.default_rng(seed)
+    games = rng.integers(0, 500, n)
+    peak = rng.uniform(1e5, 8e7, n)
+    return pd.DataFrame({
+        'id': [str(100000 + i) for i in range(n)],
+        'Name': [f'Player {i}' for i in range(n)],
+        'Age': rng.integers(16, 39, n),
+        'Position': rng.choice(POSITIONS, n),
+        'Nationality': rng.choice(NATIONALITIES, n),
+        'Career_Games': games,
+        'Career_Minutes': games * rng.integers(20, 90, n),
+        'Career_Goals': (games * rng.uniform(0, 0.6, n)).astype(int),
+        'Career_Assists': (games * rng.uniform(0, 0.4, n)).astype(int),
+        'Career_Yellows': (games * rng.uniform(0, 0.2, n)).astype(int),
+        'Career_Reds': (games * rng.uniform(0, 0.02, n)).astype(int),
+        'Current_Value': peak * rng.uniform(0.3, 1.2, n),
+        'Peak_Value': peak,
+        'Squad_Size': rng.integers(20, 35, n)
+    })
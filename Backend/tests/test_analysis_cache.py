@@ -0,0 +1,66 @@
+import sys
+from pathlib import Path
+
+# Add Backend directory to system path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.model.analysis_cache import AnalysisCache, SignatureCache
+from app.team_balance_service import TeamBalanceService
+
+
+def test_key_depends_on_ids_and_record_content():
+    a = {'1': {'id': '1', 'age': 20}, '2': {'id': '2', 'age': 30}}
+    reordered = {'2': {'age': 30, 'id': '2'}, '1': {'id': '1', 'age': 20}}
+    assert AnalysisCache.squad_key('x', a) == AnalysisCache.squad_key('x', reordered)
+
+    touched = {'1': {'id': '1', 'age': 20, 'last_updated': 'now'}, '2': {'id': '2', 'age': 30}}
+    assert AnalysisCache.squad_key('x', a) == AnalysisCache.squad_key('x', touched)
+
+    changed = {'1': {'id': '1', 'age': 21}, '2': {'id': '2', 'age': 30}}
+    assert AnalysisCache.squad_key('x', a) != AnalysisCache.squad_key('x', changed)
+    assert AnalysisCache.squad_key('x', a) != AnalysisCache.squad_key('y', a)
+
+
+def test_saved_team_analysis_is_cached_and_invalidated(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    service = TeamBalanceService()
+    for pid, age in [('1', 19), ('2', 23), ('3', 27), ('4', 31)]:
+        service.add_player({'id': pid, 'name': f'P{pid}', 'age': age})
+    assert service.save_team('Test FC', ['1', '2', '3', '4'])
+
+    calls = []
+    analyze = service.optimizer.analyze_squad_balance
+    service.optimizer.analyze_squad_balance = lambda squad: calls.append(1) or analyze(squad)
+
+    listed = service.list_saved_teams()['Test FC']
+    assert listed['balance_scores'] == service.analyze_saved_team('Test FC')['balance_scores']
+    assert calls == [], "Scores precomputed on save should be served from cache"
+
+    # Re-adding an unchanged record keeps the cached result
+    service.add_player({'id': '1', 'name': 'P1', 'age': 19})
+    service.analyze_saved_team('Test FC')
+    assert calls == []
+
+    # A changed record invalidates every analysis that includes the player
+    service.add_player({'id': '1', 'name': 'P1', 'age': 33})
+    assert service.cache.stats()['entries'] == 0
+    analysis = service.analyze_saved_team('Test FC')
+    assert calls == [1]
+    assert analysis['age_analysis']['current']['u21'] == 0.0
+
+
+def test_signature_cache_evicts_on_version_bump():
+    key = SignatureCache.signature('candidates', ['peak', 'twilight'], ['2', '1'], 3)
+    assert key == SignatureCache.signature('candidates', ['peak', 'twilight'], {'1', '2'}, 3)
+    assert key != SignatureCache.signature('candidates', ['peak'], ['1', '2'], 3)
+    assert key != SignatureCache.signature('candidates', ['peak', 'twilight'], ['1', '2'], 4)
+
+    cache = SignatureCache()
+    cache.sync_version(3)
+    cache.put(key, {'peak': []})
+    assert cache.sync_version(3) == 0 and cache.get(key) == {'peak': []}
+    assert cache.sync_version(4) == 1
+    assert cache.get(key) is None
+    stats = cache.stats()
+    assert stats['version'] == '4' and stats['version_evictions'] == 1
+    assert stats['hits'] == 1 and stats['misses'] == 1
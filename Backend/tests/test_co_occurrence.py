@@ -0,0 +1,90 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import scipy.sparse as sp
+
+# Add Backend directory to system path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.model.co_occurrence import CoOccurrenceIndex
+from app.model.recommendation_engine import RecommendationEngine
+from app.team_balance_service import TeamBalanceService
+
+
+def from_scratch(index):
+    """A.T @ A over the teams currently in the index"""
+    rows, cols = [], []
+    for t, members in enumerate(index.teams.values()):
+        rows.extend([t] * len(members))
+        cols.extend(members)
+    n = len(index.ids)
+    a = sp.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(index.teams), n))
+    return (a.T @ a).toarray()
+
+
+def test_incremental_updates_match_full_rebuild():
+    rng = np.random.default_rng(0)
+    index = CoOccurrenceIndex()
+    index.FOLD_RATIO = 0.002  # Fold some updates into the main matrix and leave others pending
+    for t in range(40):
+        index.set_team(f'T{t}', [str(p) for p in rng.choice(120, 15, replace=False)])
+    index.set_team('T3', ['1', '2', '3'])
+    assert index.remove_team('T7') and not index.remove_team('T7')
+
+    assert np.array_equal(index.cooccurrence().toarray(), from_scratch(index))
+    assert np.array_equal(index.counts, np.diag(from_scratch(index)))
+
+    # Cosine scores summed over the squad, squad members excluded
+    dense = from_scratch(index)
+    norm = np.sqrt(np.diag(dense))
+    squad = [index.cols[p] for p in ('1', '2', '3') if p in index.cols]
+    expected = (dense[squad] / np.outer(norm[squad], norm)).sum(axis=0)
+    expected[squad] = 0
+    scored = dict(index.score(['1', '2', '3', 'unknown']))
+    assert set(scored) == {index.ids[c] for c in np.flatnonzero(expected > 0)}
+    for pid, score in scored.items():
+        assert abs(score - expected[index.cols[pid]]) < 1e-12
+
+
+def test_new_players_do_not_resize_matrices_under_readers():
+    index = CoOccurrenceIndex()
+    index.set_team('A', ['1', '2', '3'])
+    matrix, delta = index.matrix, index.delta
+    shapes = (matrix.shape, delta.shape)
+    index.set_team('B', ['3', '4', '5', '6'])
+    # A score() that took the old references keeps slicing consistent shapes
+    assert (matrix.shape, delta.shape) == shapes
+    assert index.matrix.shape == index.delta.shape == (6, 6)
+    assert np.array_equal(index.cooccurrence().toarray(), from_scratch(index))
+
+
+def test_saved_teams_feed_co_occurrence_recommendations(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    service = TeamBalanceService()
+    ages = {'1': 27, '2': 28, '3': 26, '4': 19, '5': 20, '6': 33, '7': 18}
+    for pid, age in ages.items():
+        service.add_player({'id': pid, 'name': f'P{pid}', 'age': age})
+    service.save_team('A', ['1', '2', '4'])
+    service.save_team('B', ['1', '2', '5', '6'])
+    service.save_team('C', ['3', '7'])
+
+    engine = RecommendationEngine(co_occurrence=service.co_occurrence)
+    response = engine.get_co_occurrence_recommendations(['1', '2', '3'])
+    assert response['identified_needs'] == ['breakthrough', 'development', 'twilight']
+    # Breakthrough candidates co-occur with the squad; '4' and '5' sit with both 1 and 2
+    breakthrough = [c['id'] for c in response['recommendations']['breakthrough']]
+    assert breakthrough[:2] in (['4', '5'], ['5', '4']) and breakthrough[2] == '7'
+    assert [c['id'] for c in response['recommendations']['twilight']] == ['6']
+
+    assert service.delete_saved_team('B')
+    response = engine.get_co_occurrence_recommendations(['1', '2', '3'])
+    assert '5' not in [c['id'] for c in response['recommendations']['breakthrough']]
+    assert response['recommendations']['twilight'] == []
+
+    # Rebuilt from saved_teams.json on startup
+    assert TeamBalanceService().co_occurrence.score(['1', '3']) == service.co_occurrence.score(['1', '3'])
+
+
+if __name__ == "__main__":
+    test_incremental_updates_match_full_rebuild()
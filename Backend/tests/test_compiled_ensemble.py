@@ -0,0 +1,80 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from sklearn.ensemble import ExtraTreesClassifier, GradientBoostingClassifier, RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+
+# Add the parent directory to system path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.model.compiled_ensemble import CompiledEnsemble, compile_ensemble
+from app.model.model_registry import ModelRegistry
+
+rng = np.random.default_rng(0)
+X_TRAIN = rng.normal(size=(1500, 12))
+X_TEST = np.vstack([rng.normal(size=(300, 12)) * 3, X_TRAIN[:50]])
+
+
+@pytest.mark.parametrize('model, n_classes', [
+    (RandomForestClassifier(n_estimators=40, random_state=0), 4),
+    (ExtraTreesClassifier(n_estimators=20, random_state=0), 4),
+    (GradientBoostingClassifier(n_estimators=30, random_state=0), 4),
+    (GradientBoostingClassifier(n_estimators=30, random_state=0), 2),
+])
+def test_matches_sklearn_exactly(model, n_classes):
+    model.fit(X_TRAIN, rng.integers(0, n_classes, len(X_TRAIN)))
+    compiled = compile_ensemble(model)
+    np.testing.assert_array_equal(compiled.predict_proba(X_TEST), model.predict_proba(X_TEST))
+    np.testing.assert_array_equal(compiled.predict(X_TEST), model.predict(X_TEST))
+    np.testing.assert_array_equal(compiled.predict_proba(X_TEST[:1]), model.predict_proba(X_TEST[:1]))
+
+
+def test_forests_with_count_valued_leaves():
+    # Bootstrap plus sample weights leave leaves with uneven weighted counts
+    y = rng.integers(0, 3, len(X_TRAIN))
+    weights = rng.uniform(0.1, 5.0, len(X_TRAIN))
+    model = RandomForestClassifier(n_estimators=25, bootstrap=True, random_state=2).fit(X_TRAIN, y, sample_weight=weights)
+    expected = model.predict_proba(X_TEST)
+
+    # scikit-learn 0.24 (app/requirements.txt) stores weighted class counts in tree.value
+    # and normalizes each tree's leaf in predict_proba before averaging
+    for estimator in model.estimators_:
+        tree = estimator.tree_
+        tree.value[:, 0, :] *= tree.weighted_n_node_samples[:, None]
+    assert not np.allclose(model.estimators_[0].tree_.value.sum(axis=2), 1.0)
+
+    compiled = compile_ensemble(model)
+    np.testing.assert_allclose(compiled.predict_proba(X_TEST), expected, rtol=1e-12, atol=1e-15)
+    np.testing.assert_array_equal(compiled.predict(X_TEST), model.classes_[expected.argmax(axis=1)])
+
+
+def test_leaves_match_sklearn_apply():
+    model = RandomForestClassifier(n_estimators=10, random_state=1).fit(X_TRAIN, X_TRAIN[:, 0] > 0)
+    compiled = compile_ensemble(model)
+    offsets = compiled.roots.ravel()
+    np.testing.assert_array_equal(compiled.apply(X_TEST) - offsets, model.apply(X_TEST))
+
+
+def test_registry_round_trip_is_memory_mapped(tmp_path):
+    model = RandomForestClassifier(n_estimators=10, random_state=2).fit(X_TRAIN, X_TRAIN[:, 1] > 0)
+    models = ModelRegistry(tmp_path)
+    models.publish('compiled.joblib', compile_ensemble(model))
+    loaded = models.get('compiled.joblib')
+    assert isinstance(loaded, CompiledEnsemble)
+    assert isinstance(loaded.threshold, np.memmap)
+    np.testing.assert_array_equal(loaded.predict_proba(X_TEST), model.predict_proba(X_TEST))
+
+
+def test_rejects_unsupported_models():
+    with pytest.raises(TypeError):
+        compile_ensemble(LogisticRegression().fit(X_TRAIN, X_TRAIN[:, 0] > 0))
+    with pytest.raises(ValueError):
+        compile_ensemble(RandomForestClassifier(n_estimators=2).fit(X_TRAIN, X_TRAIN[:, 0] > 0)).apply(X_TEST[:, :5])
+
+
+if __name__ == "__main__":
+    test_leaves_match_sklearn_apply()
+    test_rejects_unsupported_models()
+    print("All compiled ensemble tests passed")
@@ -0,0 +1,128 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add Backend directory to system path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.model.feature_store import FeatureStore, PROFILE_COLUMNS
+from app.model.features import compute_features
+from app.model.inference_pipeline import CareerPhasePipeline, age_labels
+from app.model.model_registry import CAREER_PHASE_PIPELINE, ModelRegistry
+from app.model.recommendation_engine import RecommendationEngine
+from app.model.roster_analyzer import RosterAnalyzer
+from app.model.similarity_index import index_row, profile_features
+
+
+def make_players(n):
+    return {
+        str(i): {
+            "Full name": f"Player {i}",
+            "Date of birth/Age": f"2000-01-01 ({16 + i % 22})",
+            "Market value": f"€{1 + i % 50}.50m",
+            "careerStats": [
+                {"Appearances": str(i % 40), "Minutes played": str((i % 40) * 80),
+                 "Goals": str(i % 21), "Assists": str(i % 13), "Yellow cards": str(i % 7)},
+                {"Appearances": str(i % 30), "Minutes played": str((i % 30) * 70),
+                 "Goals": str(i % 9), "Assists": str(i % 5), "Red cards": str(i % 2)}
+            ]
+        }
+        for i in range(n)
+    }
+
+
+def test_recomputes_only_changed_records():
+    store = FeatureStore()
+    players = make_players(6)
+
+    assert store.upsert_many(players.items()) == 6
+    assert store.upsert_many(players.items()) == 0
+    assert not store.upsert("2", dict(players["2"], last_updated="later")), "Bookkeeping changes are ignored"
+    version = store.data_version
+
+    changed = dict(players["2"], careerStats=[{"Appearances": "38", "Minutes played": "3420",
+                                               "Goals": "20", "Assists": "15"}])
+    assert not store.is_fresh("2", changed)
+    assert store.upsert_many(dict(players, **{"2": changed}).items()) == 1
+    assert store.data_version == version + 1
+    assert store.read(store.row_indices(["2"]), ["Career_Games", "Candidate_Score"]).tolist() == [[38, 0.95]]
+
+
+def test_rows_match_the_consumers_features():
+    players = make_players(120)
+    store = FeatureStore(capacity=16)  # forces growth
+    store.upsert_many(players.items())
+    ids = list(players)[::-1]
+
+    expected = profile_features([index_row(pid, players[pid]) for pid in ids])
+    np.testing.assert_array_equal(store.profile(ids), expected)
+    engine = RecommendationEngine()
+    scores = store.read(store.row_indices(ids), ["Candidate_Score"])[:, 0]
+    assert scores.tolist() == [engine._calculate_similarity(players[pid]) for pid in ids]
+
+    # The CSV-shaped rows reproduce the stored profile
+    frame = store.frame(ids)
+    np.testing.assert_array_equal(compute_features(frame)[:, :len(PROFILE_COLUMNS)], expected)
+    assert frame['id'].tolist() == ids and (frame['Squad_Size'] == len(ids)).all()
+
+
+def test_save_and_load_memory_mapped(tmp_path):
+    players = make_players(50)
+    store = FeatureStore()
+    store.upsert_many(players.items())
+    store.save(tmp_path / "features")
+
+    loaded = FeatureStore.load(tmp_path / "features")
+    assert isinstance(loaded.matrix, np.memmap)
+    assert loaded.ids == store.ids and loaded.data_version == store.data_version
+    np.testing.assert_array_equal(loaded.read(loaded.row_indices(list(players))),
+                                  store.read(store.row_indices(list(players))))
+    assert loaded.upsert_many(players.items()) == 0
+
+    # Updates after loading stay private until the next save
+    loaded.upsert("7", dict(players["7"], careerStats=[]))
+    assert loaded.upsert("new", players["8"])
+    assert FeatureStore.load(tmp_path / "features").is_fresh("7", players["7"])
+    assert len(FeatureStore.load(tmp_path / "missing")) == 0
+
+
+def test_engine_reads_candidates_from_store():
+    players = make_players(200)
+    squad_ids = [str(i) for i in range(0, 200, 9)]
+    store = FeatureStore()
+    engine = RecommendationEngine(feature_store=store)
+    phases = list(engine.career_phases)
+
+    assert engine._get_candidates(players, squad_ids, phases) == \
+        RecommendationEngine()._get_candidates(players, squad_ids, phases)
+    assert len(store) == 200, "Unseen players are computed into the store once"
+
+
+def test_roster_analyzer_reads_from_store(tmp_path, monkeypatch):
+    players = make_players(40)
+    store = FeatureStore()
+    store.upsert_many(players.items())
+    training = store.frame(list(players))
+    models = ModelRegistry(tmp_path / 'models')
+    models.publish(CAREER_PHASE_PIPELINE,
+                   CareerPhasePipeline().fit(training, age_labels(training['Age'])), {'version': 'test'})
+    monkeypatch.chdir(tmp_path)  # FeedbackSystem writes under the working directory
+
+    analyzer = RosterAnalyzer(models, store)
+    squad = [str(i) for i in range(0, 40, 3)]
+    stored = analyzer.analyze_players(squad)
+    direct = analyzer.analyze_team(store.frame(squad))
+    assert stored['Career_Phase'].tolist() == direct['Career_Phase'].tolist()
+    assert stored['Confidence'].tolist() == direct['Confidence'].tolist()
+    assert stored['Name'].tolist() == [players[pid]["Full name"] for pid in squad]
+
+
+if __name__ == "__main__":
+    import tempfile
+    test_recomputes_only_changed_records()
+    test_rows_match_the_consumers_features()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_save_and_load_memory_mapped(Path(tmp))
+    test_engine_reads_candidates_from_store()
+    print("All feature store tests passed")
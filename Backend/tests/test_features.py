@@ -0,0 +1,95 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Add the parent directory to system path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.model import features
+from app.model.features import FEATURE_COLUMNS
+from app.model.roster_analyzer import FeatureEngineering
+from benchmarks.synthetic import make_training_frame
+
+
+def _frame(n: int, seed: int = 0) -> pd.DataFrame:
+    data = make_training_frame(n, seed).set_axis(np.arange(100, 100 + n))
+    data.loc[data.index[:3], 'Career_Games'] = 0  # players without appearances divide by zero
+    return data
+
+
+def _legacy_transform(data: pd.DataFrame) -> pd.DataFrame:
+    """FeatureEngineering.transform as it was: one column at a time, then per-column percentiles"""
+    divide = lambda a, b: FeatureEngineering.safe_divide(np.asarray(a, dtype=float), np.asarray(b, dtype=float))
+    col = lambda name: data[name].to_numpy(dtype=float)
+    X = pd.DataFrame()
+    X['Minutes_per_Game'] = divide(col('Career_Minutes'), col('Career_Games'))
+    X['Goals_per_Game'] = divide(col('Career_Goals'), col('Career_Games'))
+    X['Assists_per_Game'] = divide(col('Career_Assists'), col('Career_Games'))
+    X['Goal_to_Assist_Ratio'] = divide(X['Goals_per_Game'], X['Assists_per_Game'])
+    X['Minutes_per_Goal'] = divide(X['Minutes_per_Game'], X['Goals_per_Game'])
+    X['Card_Rate'] = divide(col('Career_Yellows') + col('Career_Reds') * 3, col('Career_Games'))
+    X['Goal_Involvement'] = X['Goals_per_Game'] + X['Assists_per_Game']
+    X['Minutes_Share'] = divide(col('Career_Minutes'), 90 * col('Career_Games'))
+    X['Value_Growth'] = divide(col('Current_Value') - col('Peak_Value'), col('Peak_Value') + 1)
+    X['Value_Stability'] = divide(col('Current_Value'), col('Peak_Value') + 1)
+    X['Value_to_Squad_Ratio'] = divide(col('Current_Value'), col('Squad_Size') * col('Peak_Value').mean())
+    X['Playing_Time_Share'] = divide(col('Career_Minutes'), col('Squad_Size') * col('Career_Games') * 90)
+    for name in X.columns:
+        X[name] = X[name].clip(np.percentile(X[name], 1), np.percentile(X[name], 99))
+    X = X.replace([np.inf, -np.inf], np.nan)
+    for name in X.columns:
+        X[name] = X[name].fillna(X[name].median())
+    return X
+
+
+def test_matches_legacy_feature_engineering():
+    for n in (1, 25, 2000):
+        data = _frame(n, seed=n)
+        expected = _legacy_transform(data)
+        result = FeatureEngineering().transform(data)
+        assert list(result.columns) == FEATURE_COLUMNS
+        assert (result.index == data.index).all()
+        np.testing.assert_allclose(result.to_numpy(), expected.to_numpy(), rtol=2e-6, atol=1e-9)
+
+
+def test_matrix_layout_and_dtype():
+    X = features.compute_features(_frame(50))
+    assert X.dtype == np.float32 and X.shape == (50, len(FEATURE_COLUMNS))
+    assert X.flags['F_CONTIGUOUS']
+    profile = features.compute_features(_frame(50).drop(columns='Squad_Size'), relative=False)
+    np.testing.assert_array_equal(profile, X[:, :len(features.PROFILE_COLUMNS)])
+
+
+def test_missing_values_use_column_medians():
+    data = _frame(200)
+    data.loc[data.index[5], 'Current_Value'] = np.nan
+    X = features.compute_features(data)
+    assert np.isfinite(X).all()
+
+    raw = FeatureEngineering().transform(data)
+    raw.iloc[7, 2] = np.nan
+    cleaned = FeatureEngineering().process_features(raw)
+    others = raw.iloc[:, 2].drop(raw.index[7])
+    np.testing.assert_allclose(cleaned.iloc[7, 2], others.median(), rtol=1e-6)
+    assert np.isfinite(cleaned.to_numpy()).all()
+
+
+def test_fitted_statistics_make_rows_independent():
+    data = _frame(500)
+    X = features.compute_features(data, peak_value_mean=1e7)
+    low, high = features.clip_bounds(X)
+    medians = features.impute_medians(X)
+    batch = features.clean_features(X.copy(), low, high, medians)
+    single = features.clean_features(features.compute_features(data.iloc[[42]], peak_value_mean=1e7),
+                                     low, high, medians)
+    np.testing.assert_array_equal(single[0], batch[42])
+
+
+if __name__ == "__main__":
+    test_matches_legacy_feature_engineering()
+    test_matrix_layout_and_dtype()
+    test_missing_values_use_column_medians()
+    test_fitted_statistics_make_rows_independent()
+    print("All feature tests passed")
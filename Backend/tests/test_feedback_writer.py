@@ -0,0 +1,65 @@
+import sys
+import json
+import threading
+from pathlib import Path
+
+# Add Backend directory to system path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.model.feedback_system import FeedbackSystem
+from app.model.feedback_writer import FeedbackWriter
+
+
+def test_entries_are_bulk_appended(tmp_path):
+    writer = FeedbackWriter(tmp_path / "log.jsonl")
+    for request in range(40):
+        assert writer.submit([{"request": request, "player": i} for i in range(25)]) == 25
+    writer.flush()
+
+    lines = (tmp_path / "log.jsonl").read_text().splitlines()
+    assert len(lines) == 1000
+    assert json.loads(lines[-1]) == {"request": 39, "player": 24}
+    stats = writer.stats()
+    assert stats["written"] == 1000 and stats["dropped"] == 0
+    assert stats["batches"] <= 40
+    writer.close()
+
+
+def test_full_queue_drops_and_counts(tmp_path):
+    writer = FeedbackWriter(tmp_path / "log.jsonl", max_queue=10, put_timeout=0.01)
+    release = threading.Event()
+    write = writer._write
+    writer._write = lambda entries: (release.wait(), write(entries))
+
+    accepted = sum(writer.submit([{"i": i}]) for i in range(30))
+    assert accepted < 30
+    assert writer.stats()["dropped"] == 30 - accepted
+
+    release.set()
+    writer.close()
+    assert len((tmp_path / "log.jsonl").read_text().splitlines()) == accepted
+    assert writer.stats()["written"] == accepted
+
+
+def test_queued_predictions_reach_feedback_analysis(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # FeedbackSystem writes under the working directory
+    feedback = FeedbackSystem()
+    feedback.queue_phase_predictions(["a", "b", "a"], ["peak", "twilight", "peak"],
+                                     [{"games_played": 10}, {"games_played": 3}, {"games_played": 11}])
+    feedback.writer.flush()
+
+    assert feedback.get_feedback_summary()["phase_prediction_count"] == 3
+    assert len(feedback.feedback_data["phase_predictions"]["a"]) == 2
+    # Merged entries are saved with the log offset, so they are not merged twice
+    feedback.record_phase_prediction_feedback("c", "peak", "peak", {})
+    assert FeedbackSystem().get_feedback_summary()["phase_prediction_count"] == 4
+    feedback.writer.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+    with tempfile.TemporaryDirectory() as tmp:
+        test_entries_are_bulk_appended(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_full_queue_drops_and_counts(Path(tmp))
+    print("All feedback writer tests passed")
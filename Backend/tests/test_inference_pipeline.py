@@ -0,0 +1,199 @@
+import sys
+import asyncio
+from pathlib import Path
+
+import numpy as np
+
+# Add the parent directory to system path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.data.snapshot import export_csv_snapshot
+from app.model import inference_pipeline
+from app.model.inference_pipeline import CareerPhasePipeline, age_labels, career_phase_labels
+from app.model.micro_batcher import MicroBatcher
+from app.model.model_registry import CAREER_PHASE_PIPELINE, ModelRegistry
+from app.model.roster_analyzer import FEATURE_COLUMNS, RosterAnalyzer
+from benchmarks.synthetic import make_training_frame
+
+
+def fitted_pipeline() -> CareerPhasePipeline:
+    """A pipeline fitted on synthetic rows with age-based labels, shared with other tests"""
+    training = make_training_frame(600, 0)
+    return CareerPhasePipeline().fit(training, age_labels(training['Age']))
+
+
+def test_predictions_do_not_depend_on_the_batch():
+    pipeline = fitted_pipeline()
+    team = make_training_frame(25, 1)
+    batch = pipeline.transform(team)
+    batch_proba = pipeline.predict_proba(team)
+    for i in range(len(team)):
+        row = team.iloc[[i]]
+        np.testing.assert_allclose(pipeline.transform(row), batch[i:i + 1])
+        np.testing.assert_allclose(pipeline.predict_proba(row), batch_proba[i:i + 1])
+
+
+def test_transform_uses_training_statistics():
+    pipeline = fitted_pipeline()
+    low, high, mean = pipeline.clip_low.copy(), pipeline.clip_high.copy(), pipeline.scaler.mean_.copy()
+    outlier = make_training_frame(1, 2)
+    outlier['Career_Goals'] = outlier['Career_Games'] * 50
+    features = pipeline.features(outlier)
+    assert features.shape == (1, len(FEATURE_COLUMNS))
+    assert (features <= pipeline.clip_high + 1e-12).all() and (features >= pipeline.clip_low - 1e-12).all()
+    np.testing.assert_array_equal(pipeline.clip_low, low)
+    np.testing.assert_array_equal(pipeline.clip_high, high)
+    np.testing.assert_array_equal(pipeline.scaler.mean_, mean)
+
+
+def test_missing_values_are_imputed_with_training_medians():
+    pipeline = fitted_pipeline()
+    row = make_training_frame(1, 3)
+    raw = pipeline.engineer(row)
+    raw[0, 0], raw[0, 1] = np.nan, np.inf
+    cleaned = pipeline._clean(raw)
+    assert np.isfinite(cleaned).all()
+    assert cleaned[0, 0] == pipeline.medians[0]
+    assert cleaned[0, 1] == pipeline.clip_high[1]
+
+
+def test_roster_analyzer_single_player(tmp_path, monkeypatch):
+    models = ModelRegistry(tmp_path / 'models')
+    models.publish(CAREER_PHASE_PIPELINE, fitted_pipeline(), {'version': 'test'})
+    monkeypatch.chdir(tmp_path)  # FeedbackSystem writes under the working directory
+
+    analyzer = RosterAnalyzer(models)
+    team = make_training_frame(8, 4)
+    results = analyzer.analyze_team(team)
+    single = analyzer.analyze_team(team.iloc[[3]])
+    assert len(single) == 1
+    assert single['Career_Phase'].iloc[0] == results['Career_Phase'].iloc[3]
+    assert single['Confidence'].iloc[0] == results['Confidence'].iloc[3]
+
+
+def test_batched_analysis_matches_direct(tmp_path, monkeypatch):
+    models = ModelRegistry(tmp_path / 'models')
+    models.publish(CAREER_PHASE_PIPELINE, fitted_pipeline(), {'version': 'test'})
+    monkeypatch.chdir(tmp_path)
+
+    analyzer = RosterAnalyzer(models)
+    batcher = MicroBatcher(analyzer.predict_proba_scaled, max_wait_ms=20)
+    teams = [make_training_frame(n, 10 + n) for n in (1, 5, 11)]
+
+    async def run():
+        results = await asyncio.gather(*(analyzer.analyze_team_async(team, batcher) for team in teams))
+        await batcher.close()
+        return results
+
+    for team, batched in zip(teams, asyncio.run(run())):
+        direct = analyzer.analyze_team(team)
+        assert batched['Career_Phase'].tolist() == direct['Career_Phase'].tolist()
+        np.testing.assert_allclose(batched['Confidence'], direct['Confidence'])
+    assert batcher.stats()['batches'] == 1
+
+
+def test_batched_rows_keep_the_pipeline_that_scaled_them(tmp_path, monkeypatch):
+    models = ModelRegistry(tmp_path / 'models')
+    models.publish(CAREER_PHASE_PIPELINE, fitted_pipeline(), {'version': 'old'})
+    monkeypatch.chdir(tmp_path)
+
+    analyzer = RosterAnalyzer(models)
+    batcher = MicroBatcher(analyzer.predict_proba_scaled, max_wait_ms=50)
+    teams = [make_training_frame(6, 20), make_training_frame(9, 21)]
+    old = analyzer.analyze_team(teams[0])
+    retrained = make_training_frame(600, 7)
+    new_pipeline = CareerPhasePipeline().fit(retrained, career_phase_labels(retrained))
+
+    async def run():
+        first = asyncio.ensure_future(analyzer.analyze_team_async(teams[0], batcher))
+        await asyncio.sleep(0)  # scaled and queued with the old pipeline
+        models.publish(CAREER_PHASE_PIPELINE, new_pipeline, {'version': 'new'})
+        models.reload(CAREER_PHASE_PIPELINE)
+        second = analyzer.analyze_team_async(teams[1], batcher)
+        results = await asyncio.gather(first, second)
+        await batcher.close()
+        return results
+
+    before, after = asyncio.run(run())
+    np.testing.assert_allclose(before['Confidence'], old['Confidence'])
+    new = analyzer.analyze_team(teams[1])
+    assert after['Career_Phase'].tolist() == new['Career_Phase'].tolist()
+    np.testing.assert_allclose(after['Confidence'], new['Confidence'])
+    assert batcher.stats()['batches'] == 2
+
+
+def _determine_phase(age, games_played, value_trend):
+    """CareerPhaseClassifier.determine_phase from Machine Learning Code/machine_learning.ipynb"""
+    if games_played < 50:
+        return 0
+    performance_score = (games_played / 200) * (1 + value_trend)
+    if age < 21:
+        return 0 if performance_score < 0.3 else 1
+    elif age < 24:
+        if performance_score < 0.2:
+            return 0
+        elif performance_score < 0.5:
+            return 1
+        return 2
+    elif age < 29:
+        if performance_score < 0.3:
+            return 1
+        elif value_trend < -0.2:
+            return 3
+        return 2
+    if performance_score > 0.6 and value_trend > 0.2:
+        return 2
+    return 3
+
+
+def test_default_labels_follow_the_notebook_rule():
+    data = make_training_frame(2000, 3)
+    trend = data['Current_Value'] / (data['Peak_Value'] + 1)
+    trend = 2 * (trend - trend.min()) / (trend.max() - trend.min()) - 1
+    expected = [_determine_phase(a, g, t) for a, g, t in zip(data['Age'], data['Career_Games'], trend)]
+    labels = career_phase_labels(data)
+    assert labels.tolist() == expected
+    assert set(labels) == {0, 1, 2, 3}
+
+    # Rows without a value neither move the scaling nor get a NaN trend
+    missing = data.copy()
+    missing.loc[[5, 9], 'Current_Value'] = np.nan
+    missing.loc[12, 'Peak_Value'] = np.nan
+    relabelled = career_phase_labels(missing)
+    others = np.setdiff1d(np.arange(len(data)), [5, 9, 12])
+    assert relabelled[others].tolist() == career_phase_labels(data.drop(index=[5, 9, 12])).tolist()
+    assert relabelled[[5, 9, 12]].tolist() == [_determine_phase(data['Age'][i], data['Career_Games'][i], 0.0)
+                                               for i in (5, 9, 12)]
+
+
+def test_cli_trains_from_a_snapshot_directory(tmp_path, monkeypatch):
+    import joblib
+    from sklearn.ensemble import RandomForestClassifier
+
+    training = make_training_frame(300, 4)
+    csv_path = tmp_path / 'players.csv'
+    training.to_csv(csv_path, index=False)
+    snapshot_dir = export_csv_snapshot(csv_path, tmp_path / 'snapshot')
+    model_file = tmp_path / 'model.joblib'
+    joblib.dump(RandomForestClassifier(n_estimators=10, random_state=0).fit(
+        np.zeros((4, len(FEATURE_COLUMNS))), [0, 1, 2, 3]), model_file)
+
+    published = {}
+    for name, source in [('csv', csv_path), ('snapshot', snapshot_dir)]:
+        models = ModelRegistry(tmp_path / name)
+        monkeypatch.setattr(sys, 'argv', ['inference_pipeline', '--data', str(source),
+                                          '--model-file', str(model_file), '--model-dir', str(models.model_dir)])
+        inference_pipeline.main()
+        published[name] = models.get(CAREER_PHASE_PIPELINE)
+        assert models.metadata(CAREER_PHASE_PIPELINE)['source'] == str(source)
+
+    team = make_training_frame(25, 5)
+    assert np.allclose(published['csv'].transform(team), published['snapshot'].transform(team))
+
+
+if __name__ == "__main__":
+    test_predictions_do_not_depend_on_the_batch()
+    test_transform_uses_training_statistics()
+    test_missing_values_are_imputed_with_training_medians()
+    test_default_labels_follow_the_notebook_rule()
+    print("All inference pipeline tests passed")
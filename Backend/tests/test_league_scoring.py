@@ -0,0 +1,66 @@
+import sys
+import itertools
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+# Add Backend directory to system path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.model.league_scoring import latest_run, publish_results, read_league_phases, score_league
+from app.model.model_registry import CAREER_PHASE_PIPELINE, ModelRegistry
+from app.model.roster_analyzer import RECOMMENDATION_RULES, RosterAnalyzer, recommend
+from benchmarks.synthetic import make_training_frame
+from tests.test_inference_pipeline import fitted_pipeline
+
+
+def _publish_pipeline(model_dir: Path):
+    ModelRegistry(model_dir).publish(CAREER_PHASE_PIPELINE, fitted_pipeline(), {'version': 'test'})
+
+
+def test_vectorized_recommendations_follow_the_rules():
+    values = {'Career_Phase': ['breakthrough', 'development', 'peak', 'twilight'],
+              'Games_Played': [9, 10], 'Goals_per_Game': [0.5, 0.6], 'Value_Growth': [0.2, 0.3],
+              'Confidence': [0.8, 0.9], 'Minutes_per_Game': [60, 61]}
+    rows = pd.DataFrame([dict(zip(values, combo)) for combo in itertools.product(*values.values())])
+    texts = recommend(rows)
+    assert texts.tolist() == [RosterAnalyzer._get_recommendation(None, row) for _, row in rows.iterrows()]
+    assert {text.split('\n')[0] for text in texts} == {rule[0] for rule in RECOMMENDATION_RULES}
+
+
+def test_pool_scoring_matches_analyze_team(tmp_path, monkeypatch):
+    _publish_pipeline(tmp_path / 'models')
+    league = make_training_frame(230, 1)
+    results = score_league(league, tmp_path / 'models', workers=2, chunk_size=50)
+
+    monkeypatch.chdir(tmp_path)  # FeedbackSystem writes under the working directory
+    direct = RosterAnalyzer(ModelRegistry(tmp_path / 'models')).analyze_team(league)
+    assert results['id'].tolist() == league['id'].tolist()
+    for column in ('Career_Phase', 'Confidence', 'Recommendation', 'Goals_per_Game'):
+        assert results[column].tolist() == direct[column].tolist()
+
+
+def test_published_runs_are_read_back_by_phase(tmp_path):
+    _publish_pipeline(tmp_path / 'models')
+    results = score_league(make_training_frame(120, 2), tmp_path / 'models', workers=1)
+    out = tmp_path / 'league'
+    for _ in range(3):
+        publish_results(results, out, {'model': 'test'})
+    assert len([path for path in out.iterdir() if path.is_dir()]) == 2, "Old runs are pruned"
+
+    everything = read_league_phases(out, limit=1000)
+    assert everything['total'] == 120 and everything['metadata'] == {'model': 'test'}
+    assert everything['version'] == latest_run(out).name
+    peak = read_league_phases(out, phase='peak', limit=5)
+    assert peak['total'] == (results['Career_Phase'] == 'peak').sum()
+    assert len(peak['players']) == min(5, peak['total'])
+    assert all(player['Career_Phase'] == 'peak' for player in peak['players'])
+    for offset, limit in ((-1, 10), (0, 0), (0, -5)):
+        with pytest.raises(ValueError):
+            read_league_phases(out, offset=offset, limit=limit)
+
+
+if __name__ == "__main__":
+    test_vectorized_recommendations_follow_the_rules()
+    print("All league scoring tests passed")
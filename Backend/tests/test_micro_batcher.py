@@ -0,0 +1,102 @@
+import sys
+import asyncio
+from pathlib import Path
+
+import numpy as np
+
+# Add the parent directory to system path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.model.micro_batcher import MicroBatcher
+
+
+class RecordingModel:
+    def __init__(self):
+        self.batch_sizes = []
+
+    def __call__(self, X):
+        self.batch_sizes.append(len(X))
+        return X * 2
+
+
+def test_concurrent_requests_share_batches():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_batch_size=1000, max_wait_ms=20)
+
+    async def run():
+        requests = [np.full((1 + i % 3, 4), float(i)) for i in range(30)]
+        results = await asyncio.gather(*(batcher.submit(rows) for rows in requests))
+        await batcher.close()
+        return requests, results
+
+    requests, results = asyncio.run(run())
+    for rows, result in zip(requests, results):
+        np.testing.assert_array_equal(result, rows * 2)
+    assert len(model.batch_sizes) < len(requests)
+    assert sum(model.batch_sizes) == sum(len(rows) for rows in requests)
+    assert batcher.stats()['requests'] == len(requests)
+
+
+def test_batches_respect_the_size_limit():
+    model = RecordingModel()
+    batcher = MicroBatcher(model, max_batch_size=8, max_wait_ms=20)
+
+    async def run():
+        await asyncio.gather(*(batcher.submit(np.ones((1, 2))) for _ in range(20)))
+        await batcher.close()
+
+    asyncio.run(run())
+    assert max(model.batch_sizes) <= 8
+    assert sum(model.batch_sizes) == 20
+
+
+def test_errors_reach_every_caller_and_batcher_recovers():
+    calls = []
+
+    def flaky(X):
+        calls.append(len(X))
+        if len(calls) == 1:
+            raise ValueError("model failed")
+        return X
+
+    batcher = MicroBatcher(flaky, max_wait_ms=20)
+
+    async def run():
+        failed = await asyncio.gather(*(batcher.submit(np.ones((1, 2))) for _ in range(3)),
+                                      return_exceptions=True)
+        recovered = await batcher.submit(np.ones((2, 2)))
+        await batcher.close()
+        return failed, recovered
+
+    failed, recovered = asyncio.run(run())
+    assert all(isinstance(result, ValueError) for result in failed)
+    assert recovered.shape == (2, 2)
+    assert batcher.stats()['errors'] == 1
+
+
+def test_requests_with_different_arguments_are_not_mixed():
+    calls = []
+
+    def model(X, scale):
+        calls.append((scale, len(X)))
+        return X * scale
+
+    batcher = MicroBatcher(model, max_wait_ms=20)
+
+    async def run():
+        results = await asyncio.gather(*(batcher.submit(np.ones((1, 2)), 2 + i % 2) for i in range(6)))
+        await batcher.close()
+        return results
+
+    results = asyncio.run(run())
+    for i, result in enumerate(results):
+        np.testing.assert_array_equal(result, np.full((1, 2), 2 + i % 2))
+    assert sorted(calls) == [(2, 3), (3, 3)]
+
+
+if __name__ == "__main__":
+    test_concurrent_requests_share_batches()
+    test_batches_respect_the_size_limit()
+    test_errors_reach_every_caller_and_batcher_recovers()
+    test_requests_with_different_arguments_are_not_mixed()
+    print("All micro-batcher tests passed")
@@ -0,0 +1,104 @@
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import joblib
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+# Add the parent directory to system path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.model.model_registry import CAREER_PHASE_MODEL, CAREER_PHASE_PIPELINE, MODEL_DIR_ENV, ModelRegistry
+from app.model.roster_analyzer import RosterAnalyzer
+
+
+def _train(seed: int) -> RandomForestClassifier:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(200, 12))
+    y = rng.integers(0, 4, 200)
+    return RandomForestClassifier(n_estimators=5, random_state=seed).fit(X, y)
+
+
+def test_loads_lazily_and_once(tmp_path):
+    joblib.dump({'model': _train(0)}, tmp_path / CAREER_PHASE_PIPELINE)
+    models = ModelRegistry(tmp_path)
+    assert not models.is_loaded(CAREER_PHASE_PIPELINE)
+
+    first = RosterAnalyzer(models)
+    second = RosterAnalyzer(models)
+    assert not models.is_loaded(CAREER_PHASE_PIPELINE)
+    assert first.pipeline is second.pipeline
+    assert models.info()[CAREER_PHASE_PIPELINE]['generation'] == 1
+
+
+def test_model_dir_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv(MODEL_DIR_ENV, str(tmp_path))
+    assert ModelRegistry().model_dir == tmp_path
+
+
+def test_memory_mapped_arrays(tmp_path):
+    joblib.dump({'weights': np.arange(1000, dtype=np.float64)}, tmp_path / 'weights.joblib')
+    models = ModelRegistry(tmp_path)
+    weights = models.get('weights.joblib')['weights']
+    assert isinstance(weights, np.memmap)
+    assert weights[999] == 999
+
+
+def test_version_metadata_and_hot_reload(tmp_path):
+    models = ModelRegistry(tmp_path)
+    models.publish(CAREER_PHASE_MODEL, _train(0), {'version': 'v1'})
+    old = models.get()
+    assert models.info()[CAREER_PHASE_MODEL]['version'] == 'v1'
+
+    models.publish(CAREER_PHASE_MODEL, _train(1), {'version': 'v2'})
+    info = models.info()[CAREER_PHASE_MODEL]
+    assert info['version'] == 'v2' and info['generation'] == 2
+    assert models.get() is not old
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_refresh_picks_up_changed_files_and_keeps_model_on_failure(tmp_path):
+    path = tmp_path / CAREER_PHASE_MODEL
+    joblib.dump(_train(0), path)
+    models = ModelRegistry(tmp_path)
+    old = models.get()
+    assert models.refresh() == {}
+
+    joblib.dump(_train(1), path)
+    os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10**9))
+    assert CAREER_PHASE_MODEL in models.refresh()
+    reloaded = models.get()
+    assert reloaded is not old
+
+    path.write_bytes(b'not a model')
+    # The exception type for a corrupt file is up to joblib's unpickler
+    with pytest.raises(Exception):
+        models.reload()
+    assert models.get() is reloaded
+
+
+def test_reload_only_accepts_known_artifacts(tmp_path):
+    (tmp_path / 'models').mkdir()
+    joblib.dump(_train(0), tmp_path / 'outside.joblib')
+    models = ModelRegistry(tmp_path / 'models')
+    for name in ('../outside.joblib', str(tmp_path / 'outside.joblib'), 'weights.joblib'):
+        with pytest.raises(KeyError, match="Unknown model"):
+            models.reload(name)
+    with pytest.raises(ValueError):
+        models.get('../outside.joblib')
+    assert not models.info()
+
+    models.register('outside', tmp_path / 'outside.joblib')
+    assert models.reload('outside')['generation'] == 1
+
+
+if __name__ == "__main__":
+    import tempfile
+    for test in (test_loads_lazily_and_once, test_memory_mapped_arrays, test_version_metadata_and_hot_reload,
+                 test_refresh_picks_up_changed_files_and_keeps_model_on_failure,
+                 test_reload_only_accepts_known_artifacts):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    print("All model registry tests passed")
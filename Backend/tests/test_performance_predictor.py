@@ -1,4 +1,6 @@
+import math
 import pandas as pd
+import pytest
 from pathlib import Path
 import sys
 
@@ -6,6 +8,7 @@ import sys
 sys.path.append(str(Path(__file__).parent.parent))
 
 from app.model.performance_predictor import PerformancePredictor
+from benchmarks.synthetic import make_training_frame
 
 def test_performance_predictor():
     # Create test player data
@@ -77,5 +80,87 @@ def test_performance_predictor():
         print(f"Error during testing: {str(e)}")
         raise
 
+def _per_player(row):
+    """Reference one-player computation, in the shape of the original per-player helpers"""
+    player = row.iloc[0]
+    age, games = player['Age'], max(1, player['Career_Games'])
+    current = {
+        'games_per_season': player['Career_Games'] / max(1, age - 17),
+        'goals_per_game': player['Career_Goals'] / games,
+        'assists_per_game': player['Career_Assists'] / games,
+        'minutes_per_game': player['Career_Minutes'] / games,
+        'cards_per_game': (player['Career_Yellows'] + player['Career_Reds']) / games
+    }
+    scaled = lambda factor: {metric: value * factor for metric, value in current.items()}
+    scoring = current['goals_per_game'] + current['assists_per_game']
+
+    if age <= 20:
+        phase, next_phase, next_age, multiplier = 'breakthrough', 'development', 21, 1.3
+    elif age <= 24:
+        phase, next_phase, next_age, multiplier = 'development', 'peak', 25, 1.15
+    elif age <= 29:
+        phase, next_phase, next_age, multiplier = 'peak', 'twilight', 30, 1.05
+    else:
+        phase, next_phase, next_age, multiplier = 'twilight', 'retirement', 35, 0.9
+    peak_age = 26 if age < 23 and scoring > 0.5 else 27
+    years_to_peak = max(0, peak_age - age)
+    potential = max(0, 1 - (age - 17) / 15) * 0.7 + min(1, scoring / 1.5) * 0.3
+
+    current_value, peak_value = player['Current_Value'], player['Peak_Value']
+    growth = (peak_value / current_value) ** (1 / max(1, years_to_peak)) if years_to_peak > 0 else 1
+    projected = {
+        age + year: current_value * growth ** year if age + year < peak_age
+        else peak_value * 0.85 ** (age + year - peak_age)
+        for year in range(5)
+    }
+    return {
+        'current_metrics': current,
+        'predicted_metrics': {'next_season': scaled(multiplier), 'peak_potential': scaled(1.5)},
+        'career_trajectory': {
+            'current_phase': phase,
+            'next_phase': next_phase,
+            'years_to_next_phase': next_age - age,
+            'development_potential': min(1, max(0, potential)),
+            'expected_peak_age': peak_age
+        },
+        'peak_prediction': {
+            'peak_age': peak_age,
+            'years_to_peak': years_to_peak,
+            'peak_metrics': scaled(1 + years_to_peak * 0.1)
+        },
+        'value_projection': {
+            'current_value': current_value,
+            'peak_value': peak_value,
+            'years_to_peak_value': years_to_peak,
+            'annual_growth_rate': growth - 1,
+            'projected_values': projected
+        }
+    }
+
+def _close(a, b):
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_close(a[key], b[key]) for key in a)
+    if isinstance(a, str):
+        return a == b
+    return math.isclose(a, b, rel_tol=1e-12)
+
+def test_batch_matches_per_player():
+    n = 300
+    players = make_training_frame(n, seed=0)
+    predictor = PerformancePredictor()
+
+    batch = predictor.predict_batch(players)
+    assert batch['current_metrics'].shape == (n, 5) and batch['projected_values'].shape == (n, 5)
+    predictions = list(predictor.iter_predictions(batch))
+    for i, prediction in enumerate(predictions):
+        assert _close(prediction, _per_player(players.iloc[i:i + 1])), f"Row {i} differs"
+    assert _close(predictor.predict_performance(players.iloc[7:9]), predictions[7])
+
+def test_predict_performance_without_rows():
+    players = make_training_frame(5, seed=0)
+    with pytest.raises(ValueError, match="No player rows"):
+        PerformancePredictor().predict_performance(players.iloc[:0])
+
 if __name__ == "__main__":
-    test_performance_predictor()
\ No newline at end of file
+    test_performance_predictor()
+    test_batch_matches_per_player()
\ No newline at end of file
@@ -0,0 +1,108 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add Backend directory to system path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.data.player_index import PlayerIndex
+from app.data.player_records import flatten_player
+from app.model.recommendation_engine import RecommendationEngine
+from app.model.feature_store import FeatureStore
+
+POSITIONS = ['Goalkeeper', 'Centre-Back', 'Central Midfield', 'Centre-Forward']
+
+
+class DictSource(dict):
+    """Minimal stand-in for PlayerStore: items() and get()"""
+
+
+def make_records(n, seed=0):
+    rng = np.random.default_rng(seed)
+    records = DictSource()
+    for i in range(n):
+        apps = int(rng.integers(0, 40))
+        records[str(i)] = {
+            'Full name': f'Player {i}',
+            'Date of birth/Age': f"2000-01-01 ({int(rng.integers(16, 38))})",
+            'Position': POSITIONS[i % len(POSITIONS)],
+            'Current club': f'Club {i % 7}',
+            'Citizenship': f'Country {i % 5}',
+            # Every 10th player has no known value
+            'Market value': f"€{rng.uniform(0.1, 50):.2f}m" if i % 10 else '-',
+            'careerStats': [{'Appearances': str(apps), 'Goals': str(apps // 4),
+                             'Minutes': str(int(apps * rng.uniform(20, 90)))}]
+        }
+    return records
+
+
+def brute_force(records, min_age, max_age, positions, max_value, min_minutes):
+    rows = [flatten_player(pid, r) for pid, r in records.items()]
+    return [row['id'] for row in rows
+            if min_age <= row['age'] <= max_age and row['position'] in positions
+            and row['market_value'] <= max_value and row['career_minutes'] >= min_minutes]
+
+
+def test_filters_match_brute_force():
+    records = make_records(2000)
+    index = PlayerIndex(records)
+    filters = dict(ranges={'age': (21, 27), 'market_value': (None, 25e6), 'career_minutes': (500, None)},
+                   equals={'position': ['Centre-Back', 'Centre-Forward']})
+    expected = brute_force(records, 21, 27, {'Centre-Back', 'Centre-Forward'}, 25e6, 500)
+    assert index.match_ids(**filters) == expected
+
+    assert index.match_ids(equals={'club': 'Club 3', 'nationality': 'Country 1'}) == \
+        [pid for pid in records if int(pid) % 7 == 3 and int(pid) % 5 == 1]
+    assert index.match_ids(equals={'club': 'Nowhere FC'}) == []
+
+
+def test_cursor_pages_cover_every_match_in_order():
+    records = make_records(700)
+    index = PlayerIndex(records)
+    filters = {'ranges': {'age': (18, 30)}}
+    total = len(index.match_ids(**filters))
+
+    seen, cursor = [], None
+    while True:
+        page = index.query(**filters, sort_by='market_value', descending=True, limit=37, cursor=cursor)
+        assert page['total'] == total
+        seen.extend(page['players'])
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert len(seen) == total and len({p['id'] for p in seen}) == total
+    values = [p['market_value'] for p in seen if p['market_value'] is not None]
+    assert values == sorted(values, reverse=True)
+    assert all(p['market_value'] is None for p in seen[len(values):]), "Unknown values come last"
+
+
+def test_upserts_are_visible_before_merge():
+    records = make_records(500)
+    index = PlayerIndex(records)
+    index.upsert('new', {'Full name': 'New Signing', 'Date of birth/Age': '2005-01-01 (18)',
+                         'Position': 'Goalkeeper', 'Current club': 'Club Z', 'Market value': '€1.00m'})
+    index.upsert('3', dict(records['3'], **{'Date of birth/Age': '1980-01-01 (43)'}))
+    assert index.pending, "Small updates wait in the pending set"
+
+    assert index.match_ids(equals={'club': 'Club Z'}) == ['new']
+    assert index.match_ids(ranges={'age': (43, 43)}) == ['3']
+    assert '3' not in index.match_ids(ranges={'age': (16, 37)})
+    assert index.remove('new') and index.match_ids(equals={'club': 'Club Z'}) == []
+
+
+def test_engine_generates_candidates_from_index():
+    records = make_records(400)
+    squad_ids = [str(i) for i in range(0, 400, 13)]
+    indexed = RecommendationEngine(player_index=PlayerIndex(records), feature_store=FeatureStore())
+    phases = list(indexed.career_phases)
+    assert indexed._get_candidates(records, squad_ids, phases) == \
+        RecommendationEngine()._get_candidates(records, squad_ids, phases)
+
+
+if __name__ == "__main__":
+    test_filters_match_brute_force()
+    test_cursor_pages_cover_every_match_in_order()
+    test_upserts_are_visible_before_merge()
+    test_engine_generates_candidates_from_index()
@@ -0,0 +1,88 @@
+import sys
+import json
+from pathlib import Path
+
+# Add Backend directory to system path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.data.player_store import PlayerStore
+
+
+def make_players(n):
+    return {
+        str(1000 + i): {
+            "id": str(1000 + i),
+            "Full name": f"Jogador Ñúñez {i}",
+            "Date of birth/Age": f"2000-01-01 ({18 + i % 15})",
+            "Market value": "€1.50m",
+            "careerStats": [{"Season": "2022/23", "Appearances": str(i)}]
+        }
+        for i in range(n)
+    }
+
+
+def write_store(tmp_path, players):
+    data_file = tmp_path / "players.json"
+    with open(data_file, 'w', encoding='utf-8') as f:
+        json.dump(players, f, indent=2, ensure_ascii=False)
+    return data_file
+
+
+def test_lazy_point_lookups(tmp_path):
+    players = make_players(50)
+    store = PlayerStore(write_store(tmp_path, players))
+    # Small chunks force records to straddle read boundaries
+    store.CHUNK_SIZE = 64
+
+    assert store._index is None, "Store should not read the file on creation"
+    assert store.get("1037") == players["1037"]
+    assert store.get("missing") is None
+    assert "1000" in store and "missing" not in store
+    assert len(store) == 50
+    assert list(store._touched) == ["1037"]
+
+
+def test_streaming_scan_matches_json_load(tmp_path):
+    players = make_players(30)
+    store = PlayerStore(write_store(tmp_path, players))
+    store.CHUNK_SIZE = 100
+
+    assert dict(store.items()) == players
+    assert not store._touched, "Full scans should not keep records resident"
+    assert json.loads(''.join(store.iter_json())) == players
+
+
+def test_flush_preserves_untouched_records(tmp_path):
+    players = make_players(10)
+    data_file = write_store(tmp_path, players)
+    store = PlayerStore(data_file)
+
+    store.put("1003", {"id": "1003", "Full name": "Updated"})
+    store.put("2000", {"id": "2000", "Full name": "New Player"})
+    assert store.remove("1005")
+    assert not store.remove("missing")
+    store.flush()
+
+    with open(data_file, 'r', encoding='utf-8') as f:
+        on_disk = json.load(f)
+
+    expected = dict(players)
+    expected["1003"] = {"id": "1003", "Full name": "Updated"}
+    expected["2000"] = {"id": "2000", "Full name": "New Player"}
+    del expected["1005"]
+    assert on_disk == expected
+
+    # The index written during flush must point at the new offsets
+    reopened = PlayerStore(data_file)
+    assert reopened.get("1009") == players["1009"]
+    assert store.get("1009") == players["1009"]
+    assert store._index == reopened._get_index()
+
+
+def test_missing_file_is_empty(tmp_path):
+    store = PlayerStore(tmp_path / "players.json")
+    assert len(store) == 0
+    assert list(store.items()) == []
+    store.put("1", {"id": "1"})
+    store.flush()
+    assert PlayerStore(tmp_path / "players.json").get("1") == {"id": "1"}
@@ -9,7 +9,7 @@ import pytest
 import pandas as pd
 import json
 import logging
-from app.model.recommendation_engine import RecommendationEngine
+from app.model.recommendation_engine import RecommendationEngine, CorpusSnapshot
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -165,5 +165,82 @@ def test_recommendation_engine():
         print(f"Unexpected error: {str(e)}")
         raise
 
+def test_single_pass_candidates_match_phase_scan():
+    """Top-k selection over the cached columns matches the per-phase scan, ties included"""
+    engine = RecommendationEngine()
+    all_players = {}
+    for i in range(300):
+        apps = (i * 7) % 40
+        all_players[str(i)] = {
+            "Full name": f"Player {i}",
+            "Date of birth/Age": f"2000-01-01 ({15 + i % 28})" if i % 50 else "Unknown",
+            "careerStats": [{"Appearances": str(apps), "Minutes played": str(apps * 80),
+                             "Goals": str(i % 9), "Assists": str(i % 5)}]
+        }
+    squad_ids = [str(i) for i in range(0, 300, 11)]
+
+    phases = list(engine.career_phases)
+    batched = engine._get_candidates(all_players, squad_ids, phases)
+    for phase in phases:
+        assert batched[phase] == engine._scan_phase_candidates(all_players, squad_ids, phase)
+        assert not {c['id'] for c in batched[phase]} & set(squad_ids)
+
+    # Columns are reused until the corpus changes
+    columns = engine._candidate_columns(all_players)
+    assert engine._candidate_columns(all_players) is columns
+    all_players["999"] = {"Date of birth/Age": "2000-01-01 (22)", "careerStats": [{"Appearances": "38"}]}
+    assert engine._candidate_columns(all_players) is not columns
+
+def test_request_overlay_does_not_leak_into_corpus():
+    """Client-supplied squad players apply to one request and never reach the shared corpus"""
+    from app.data.player_service import PlayerService
+    saved_cache, saved_version = dict(PlayerService._players_cache), PlayerService.corpus_version
+    try:
+        service = PlayerService()
+        for pid, record in setup_test_data().items():
+            service.cache_player(pid, record)
+        engine = RecommendationEngine()
+        snapshot = engine.snapshot()
+        assert engine.snapshot() is snapshot, "Unchanged corpus keeps the same snapshot"
+
+        overlay = {"900": {"id": "900", "Full name": "Client Player", "Date of birth/Age": "2004-01-01 (19)"},
+                   "901": {"id": "901", "Full name": "Client Player 2", "Date of birth/Age": "1990-01-01 (33)"}}
+        response = engine.get_recommendations(["900", "901"], overlay)
+        assert response["squad_analysis"]["phase_analysis"]["current"]["breakthrough"] == 0.5
+        assert "900" not in PlayerService._players_cache and "900" not in engine.snapshot().players
+        assert engine.snapshot() is snapshot
+
+        # Without the overlay the same ids are unknown to every other request
+        assert engine.get_recommendations(["900", "901"])["identified_needs"] == []
+
+        service.cache_player("902", dict(overlay["900"], id="902"))
+        assert engine.snapshot() is not snapshot and "902" in engine.snapshot().players
+        assert "902" not in snapshot.players, "Published snapshots never change"
+    finally:
+        PlayerService._players_cache.clear()
+        PlayerService._players_cache.update(saved_cache)
+        PlayerService.corpus_version = saved_version
+
+def test_squads_with_same_signature_share_candidates():
+    """Same needs and exclusions reuse cached candidates even when the squad records differ"""
+    engine = RecommendationEngine()
+    engine.snapshot = lambda: CorpusSnapshot(setup_test_data(), 1)
+    overlay = {"123": {"id": "123", "Date of birth/Age": "1995-01-01 (28)"},
+               "456": {"id": "456", "Date of birth/Age": "1999-01-01 (24)"}}
+
+    first = engine.get_recommendations(["123", "456"], overlay)
+    refreshed = {pid: dict(record, careerStats=[{"Appearances": "3"}]) for pid, record in overlay.items()}
+    second = engine.get_recommendations(["123", "456"], refreshed)
+    assert second["recommendations"] == first["recommendations"]
+    assert engine.candidate_cache.stats()["hits"] == 1
+
+    # A new corpus version evicts the shared entries
+    engine.snapshot = lambda: CorpusSnapshot(setup_test_data(), 2)
+    engine.get_recommendations(["123", "456"], overlay)
+    assert engine.candidate_cache.stats()["version_evictions"] == 1
+
 if __name__ == "__main__":
-    test_recommendation_engine() 
\ No newline at end of file
+    test_recommendation_engine()
+    test_single_pass_candidates_match_phase_scan()
+    test_request_overlay_does_not_leak_into_corpus()
+    test_squads_with_same_signature_share_candidates() 
\ No newline at end of file
@@ -0,0 +1,84 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add Backend directory to system path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.model.feature_store import FeatureStore
+from app.model.inference_pipeline import CareerPhasePipeline, age_labels
+from app.model.league_scoring import score_league, score_store
+from app.model.model_registry import CAREER_PHASE_PIPELINE, ModelRegistry
+from app.model.shared_corpus import SharedCorpus, attach
+from tests.test_feature_store import make_players
+
+
+def test_attach_reads_the_published_rows_without_copying():
+    players = make_players(80)
+    store = FeatureStore()
+    store.upsert_many(players.items())
+
+    with SharedCorpus(prefix='test-corpus-a') as corpus:
+        handle = corpus.publish(store)
+        assert corpus.publish(store) is handle, "An unchanged store is not published again"
+        shared = attach(handle)
+        assert attach(handle) is shared
+        assert shared.ids == store.ids and shared.data_version == store.data_version
+        np.testing.assert_array_equal(shared.profile(list(players)), store.profile(list(players)))
+        assert not shared.matrix.flags.writeable and not shared.matrix.flags.owndata
+        with pytest.raises(ValueError):
+            shared.upsert("3", dict(players["3"], careerStats=[]))
+
+
+def test_versioned_handoff_keeps_recent_generations():
+    players = make_players(30)
+    store = FeatureStore()
+    store.upsert_many(players.items())
+
+    with SharedCorpus(prefix='test-corpus-b', keep=2) as corpus:
+        first = corpus.publish(store)
+        store.upsert("new", players["1"])
+        second = corpus.publish(store)
+        assert corpus.current == second and second.version > first.version
+        assert len(attach(first)) == 30, "Tasks holding the previous handle still attach"
+        assert len(attach(second)) == 31
+
+        store.upsert("newer", players["2"])
+        corpus.publish(store)
+        with pytest.raises(FileNotFoundError):
+            attach(first)
+
+
+def test_corpora_in_one_process_do_not_collide():
+    players = make_players(20)
+    stores = [FeatureStore(), FeatureStore()]
+    for store in stores:
+        store.upsert_many(players.items())
+    assert stores[0].data_version == stores[1].data_version
+
+    with SharedCorpus() as first, SharedCorpus() as second:
+        handles = [first.publish(stores[0]), second.publish(stores[1])]
+        assert handles[0].segments['matrix'][0] != handles[1].segments['matrix'][0]
+        assert all(len(attach(handle)) == 20 for handle in handles)
+
+
+def test_pool_scores_the_shared_corpus(tmp_path):
+    players = make_players(120)
+    store = FeatureStore()
+    store.upsert_many(players.items())
+    training = store.frame(list(players))
+    ModelRegistry(tmp_path / 'models').publish(
+        CAREER_PHASE_PIPELINE, CareerPhasePipeline().fit(training, age_labels(training['Age'])), {'version': 'test'})
+
+    pooled = score_store(store, tmp_path / 'models', workers=2, chunk_size=25, squad_size=22)
+    direct = score_league(store.frame(store.ids, 22), tmp_path / 'models', workers=1)
+    for column in ('id', 'Career_Phase', 'Confidence', 'Recommendation'):
+        assert pooled[column].tolist() == direct[column].tolist()
+
+
+if __name__ == "__main__":
+    test_attach_reads_the_published_rows_without_copying()
+    test_versioned_handoff_keeps_recent_generations()
+    print("All shared corpus tests passed")
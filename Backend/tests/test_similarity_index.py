@@ -0,0 +1,122 @@
+import sys
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add Backend directory to system path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.model.similarity_index import SimilarityIndex
+
+POSITIONS = ['Goalkeeper', 'Centre-Back', 'Central Midfield', 'Centre-Forward']
+
+
+def make_records(n, start=0, seed=0):
+    rng = np.random.default_rng(seed)
+    records = []
+    for i in range(start, start + n):
+        apps = int(rng.integers(0, 40))
+        records.append((str(i), {
+            'Full name': f'Player {i}',
+            'Date of birth/Age': f"2000-01-01 ({int(rng.integers(17, 36))})",
+            'Position': POSITIONS[i % len(POSITIONS)],
+            'Market value': f"€{rng.uniform(0.1, 50):.2f}m",
+            'careerStats': [{'Appearances': str(apps), 'Goals': str(int(apps * rng.uniform(0, 0.6))),
+                             'Assists': str(int(apps * rng.uniform(0, 0.3))),
+                             'Minutes': str(int(apps * rng.uniform(20, 90)))}]
+        }))
+    return records
+
+
+def brute_force(index, pid, k, mask):
+    query = index.vectors[index.rows[pid]].astype(np.float64)
+    dist = ((index.vectors[:len(index.ids)] - query) ** 2).sum(axis=1)
+    dist[~mask] = np.inf
+    dist[index.rows[pid]] = np.inf
+    order = np.argsort(dist, kind='stable')[:k]
+    return [index.ids[row] for row in order if np.isfinite(dist[row])]
+
+
+def test_filtered_knn_matches_brute_force():
+    index = SimilarityIndex(capacity=16)
+    index.CHUNK_SIZE = 97  # Several chunks, so partial top-k results get merged
+    index.build(make_records(500))
+    assert len(index) == 500
+
+    filters = {'phase': 'peak', 'position': 'Centre-Forward', 'max_value': 20e6}
+    for pid in ('3', '250', '499'):
+        expected = brute_force(index, pid, 8, index._mask(**filters))
+        found = index.query(pid, k=8, **filters)
+        assert [row['id'] for row in found] == expected
+        assert all(row['career_phase'] == 'peak' and row['position'] == 'Centre-Forward'
+                   and row['market_value'] <= 20e6 for row in found)
+        assert [row['distance'] for row in found] == sorted(row['distance'] for row in found)
+
+
+def test_incremental_inserts_keep_fitted_statistics():
+    index = SimilarityIndex(capacity=16)
+    records = make_records(200)
+    index.build(records)
+    stats = {key: value.copy() for key, value in index.stats.items()}
+    before = index.vectors[index.rows['10']].copy()
+
+    # Grows past the initial capacity and replaces an existing player
+    index.upsert_many(make_records(1500, start=200, seed=1))
+    index.upsert('10', records[11][1])
+    assert len(index) == 1700
+    assert all(np.array_equal(stats[key], index.stats[key]) for key in stats)
+    assert np.array_equal(index.vectors[index.rows['10']], index.vectors[index.rows['11']])
+    assert not np.array_equal(before, index.vectors[index.rows['10']])
+
+    assert index.query('11', k=1)[0]['id'] == '10'
+    assert index.remove('10') and '10' not in index
+    assert '10' not in [row['id'] for row in index.query('11', k=20)]
+
+
+def test_neighbours_without_a_market_value_serialize():
+    records = make_records(40)
+    records[5][1]['Market value'] = '-'
+    index = SimilarityIndex()
+    index.build(records)
+    found = index.query(records[5][0], k=3) + index.query(records[6][0], k=39)
+    unknown = [row for row in found if row['id'] == records[5][0]]
+    assert unknown and unknown[0]['market_value'] is None
+    json.dumps(found, allow_nan=False)
+    assert records[5][0] not in [row['id'] for row in index.query(records[6][0], k=39, max_value=1e9)]
+
+
+def test_queries_run_alongside_growing_inserts():
+    index = SimilarityIndex(capacity=16)
+    index.build(make_records(50))
+    errors = []
+
+    def query():
+        try:
+            for _ in range(200):
+                found = index.query('0', k=5)
+                assert len(found) == 5 and all(row is not None for row in found)
+        except Exception as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=query) for _ in range(2)]
+    for thread in readers:
+        thread.start()
+    for start in range(50, 2050, 50):
+        index.upsert_many(make_records(50, start=start, seed=start))
+    for thread in readers:
+        thread.join()
+    assert not errors and len(index) == 2050
+
+    for k in (0, -1):
+        with pytest.raises(ValueError):
+            index.query('0', k=k)
+
+
+if __name__ == "__main__":
+    test_filtered_knn_matches_brute_force()
+    test_incremental_inserts_keep_fitted_statistics()
+    test_neighbours_without_a_market_value_serialize()
+    test_queries_run_alongside_growing_inserts()
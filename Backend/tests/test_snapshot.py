@@ -0,0 +1,52 @@
+import sys
+import json
+from pathlib import Path
+
+# Add Backend directory to system path
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pandas as pd
+from app.data.player_store import PlayerStore
+from app.data.snapshot import export_corpus_snapshot, load_snapshot_frame, read_manifest
+
+PLAYERS = {
+    "1": {"id": "1", "Full name": "Young", "Date of birth/Age": "2004-01-01 (19)",
+          "Position": "Left Winger", "Market value": "€500k",
+          "careerStats": [{"Appearances": "10", "Goals": "2", "Assists": "1", "Minutes": "640"}]},
+    "2": {"id": "2", "Full name": "Prime", "Date of birth/Age": "1996-01-01 (27)",
+          "Position": "Centre-Back", "Market value": "€15.00m",
+          "careerStats": [{"Appearances": "30", "Goals": "1", "Assists": "0", "Minutes": "2.700"},
+                          {"Appearances": "28", "Goals": "2", "Assists": "1", "Minutes": "2.400"}]},
+    "3": {"id": "3", "Full name": "Veteran", "Date of birth/Age": "1989-01-01 (34)",
+          "Position": "Centre-Back", "Market value": "-", "careerStats": []},
+}
+
+
+def make_store(tmp_path):
+    data_file = tmp_path / "players.json"
+    with open(data_file, 'w', encoding='utf-8') as f:
+        json.dump(PLAYERS, f)
+    return PlayerStore(data_file)
+
+
+def test_snapshot_roundtrip(tmp_path):
+    for fmt in ('arrow', 'parquet'):
+        out = export_corpus_snapshot(make_store(tmp_path), tmp_path / fmt, fmt=fmt)
+        df = load_snapshot_frame(out).set_index('id').sort_index()
+
+        assert read_manifest(out)['rows'] == 3
+        assert str(df['position'].dtype) == 'category'
+        assert str(df['career_phase'].dtype) == 'category'
+        assert df['age'].dtype.itemsize == 1, "Small ints should be downcast"
+        assert df.loc['2', 'career_games'] == 58
+        assert df.loc['2', 'career_minutes'] == 5100
+        assert df.loc['1', 'market_value'] == 500000
+        assert pd.isna(df.loc['3', 'market_value'])
+        assert list(df['career_phase'].astype(str)) == ['breakthrough', 'peak', 'twilight']
+
+
+def test_partition_selection(tmp_path):
+    out = export_corpus_snapshot(make_store(tmp_path), tmp_path / "snap")
+    peak = load_snapshot_frame(out, partitions=['peak'], columns=['id', 'age'])
+    assert list(peak.columns) == ['id', 'age']
+    assert list(peak['id']) == ['2']
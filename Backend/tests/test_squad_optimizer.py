@@ -0,0 +1,96 @@
+import sys
+import itertools
+from pathlib import Path
+
+import pytest
+
+# Add Backend directory to system path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.data.player_index import PlayerIndex
+from app.data.player_records import flatten_player
+from app.model.team_balance import TeamBalanceOptimizer
+from app.model.squad_optimizer import MAX_MOVES, SquadCompositionOptimizer, index_candidates
+from tests.test_player_index import make_records
+
+SQUAD_AGES = [18, 21, 22, 23, 24, 26, 27, 27, 28, 28, 29, 29, 30, 31, 32, 33, 34, 34, 35, 36]
+POOL = [
+    {'id': 'c1', 'name': 'Teen', 'age': 18, 'market_value': 4e6},
+    {'id': 'c2', 'name': 'Teen Star', 'age': 19, 'market_value': 25e6},
+    {'id': 'c3', 'name': 'Prospect', 'age': 22, 'market_value': 6e6},
+    {'id': 'c4', 'name': 'Prospect B', 'age': 24, 'market_value': 9e6},
+    {'id': 'c5', 'name': 'Prime', 'age': 27, 'market_value': 30e6},
+    {'id': 'c6', 'name': 'Veteran', 'age': 33, 'market_value': 1e6},
+    {'id': 'c7', 'name': 'No Value', 'age': 20, 'market_value': None},
+    {'id': 'c8', 'name': 'No Age', 'age': 0, 'market_value': 1e5},
+]
+
+
+def make_squad():
+    return [{'id': f's{i}', 'age': age, 'market_value': f'€{i + 1}.00m'} for i, age in enumerate(SQUAD_AGES)]
+
+
+def brute_force_best(squad, pool, budget, max_moves):
+    optimizer = TeamBalanceOptimizer()
+    limits = optimizer.ideal_composition['squad_size']
+    pool = [p for p in pool if p['market_value'] is not None and p['age'] > 0]
+    best = None
+    for n_add in range(max_moves + 1):
+        for adds in itertools.combinations(pool, n_add):
+            if sum(p['market_value'] for p in adds) > budget:
+                continue
+            for n_remove in range(max_moves - n_add + 1):
+                for removed in itertools.combinations(range(len(squad)), n_remove):
+                    new_squad = [p for i, p in enumerate(squad) if i not in removed] + list(adds)
+                    if not limits['min'] <= len(new_squad) <= limits['max']:
+                        continue
+                    score = optimizer.analyze_squad_balance(new_squad)['balance_scores']['overall_balance']
+                    best = score if best is None else max(best, score)
+    return best
+
+
+def test_search_is_exact_against_brute_force():
+    optimizer = SquadCompositionOptimizer()
+    for budget in (float('inf'), 12e6):
+        result = optimizer.optimize(make_squad(), POOL, budget=budget, max_moves=3, top_n=3)
+        best = result['options'][0]
+        assert abs(best['balance_scores']['overall_balance'] - brute_force_best(make_squad(), POOL, budget, 3)) < 1e-12
+        assert best['cost'] <= budget
+        assert best['balance_scores']['overall_balance'] > result['current_balance']['overall_balance']
+        assert all(p['id'] != 'c7' for p in best['add']), "Players without a value cannot be costed"
+        offered = {p['id'] for option in result['options'] for p in option['add']}
+        assert 'c8' not in offered, "Players without a known age cannot be classed"
+
+        scores = [o['balance_scores']['overall_balance'] for o in result['options']]
+        assert scores == sorted(scores, reverse=True)
+
+
+def test_small_squad_is_filled_to_minimum_size():
+    optimizer = SquadCompositionOptimizer()
+    pool = [{'id': f'c{i}', 'age': 17 + i % 20, 'market_value': 1e6} for i in range(200)]
+    squad = [{'id': f's{i}', 'age': 20 + i} for i in range(11)]
+    result = optimizer.optimize(squad, pool, max_moves=2, top_n=1)
+    assert result['options'][0]['squad_size'] == 20
+    assert len(result['options'][0]['add']) == 9
+
+    # The search never runs past MAX_MOVES, however far a squad is from the bounds
+    assert optimizer.moves_needed(11, 2) == 9 and optimizer.moves_needed(15, 50) == MAX_MOVES
+    for size in (0, 9, 39):
+        with pytest.raises(ValueError):
+            optimizer.moves_needed(size, 2)
+    with pytest.raises(ValueError):
+        optimizer.optimize([{'id': 's1', 'age': 25}], pool, max_moves=2)
+
+
+def test_index_candidates_match_the_full_corpus():
+    records = make_records(400, seed=3)
+    index = PlayerIndex(records)
+    optimizer = SquadCompositionOptimizer()
+    squad = make_squad() + [{'id': '5', 'age': 25}]
+    for budget, max_moves in ((float('inf'), 3), (8e6, 4)):
+        per_class = optimizer.moves_needed(len(squad), max_moves)
+        candidates = index_candidates(index, [p['id'] for p in squad], per_class, budget)
+        assert '5' not in {p['id'] for p in candidates}
+        assert len(candidates) <= 5 * per_class
+        full = [flatten_player(pid, record) for pid, record in records.items()]
+        assert optimizer.optimize(squad, candidates, budget, max_moves) == optimizer.optimize(squad, full, budget, max_moves)
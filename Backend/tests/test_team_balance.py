@@ -1,12 +1,14 @@
 import sys
 from pathlib import Path
+import numpy as np
 import pandas as pd
+import pytest
 
 # Add Backend directory to system path
 current_dir = Path(__file__).parent.parent
 sys.path.append(str(current_dir))
 
-from app.model.team_balance import TeamBalanceOptimizer
+from app.model.team_balance import MAX_SEASONS, TeamBalanceOptimizer, SquadBalanceState
 from app.model.roster_analyzer import RosterAnalyzer
 
 def test_team_balance():
@@ -86,5 +88,117 @@ def test_team_balance():
         print(f"Error during testing: {str(e)}")
         raise
 
+def test_kernel_matches_pandas_implementation():
+    """The NumPy kernel must reproduce the original DataFrame path exactly"""
+    optimizer = TeamBalanceOptimizer()
+    ages = [17, 19, 20, 21, 22, 24, 25, 25, 26, 27, 28, 29, 29, 30, 31, 33, 35]
+    squad = [
+        {'name': f'Player{i}', 'Date of birth/Age': f'2000-01-01 ({age})'}
+        for i, age in enumerate(ages)
+    ]
+
+    expected = optimizer._analyze_squad_balance_frame(pd.DataFrame(squad))
+    assert optimizer.analyze_squad_balance(squad) == expected
+    assert optimizer.analyze_squad_balance(pd.DataFrame(squad)) == expected
+
+    plain_ages = [{'name': 'A', 'age': 19}, {'name': 'B', 'age': '31'}, {'name': 'C', 'age': ''}]
+    assert optimizer.analyze_squad_balance(plain_ages) == \
+        optimizer._analyze_squad_balance_frame(pd.DataFrame(plain_ages))
+
+def test_league_batch_matches_single_squad_analysis():
+    optimizer = TeamBalanceOptimizer()
+    squads = {
+        'Young FC': [{'age': age} for age in [17, 18, 19, 20, 20, 21, 22, 23, 24, 25, 26]],
+        'Balanced United': [{'age': age} for age in [19, 20, 21, 22, 23, 24, 25, 26, 27, 27,
+                                                      28, 28, 29, 29, 30, 31, 32, 22, 23, 26]],
+        'Veterans City': [{'age': age} for age in [28, 29, 30, 31, 32, 33, 34, 35]],
+    }
+
+    names, ages, offsets = optimizer.pack_squads(squads)
+    ranking = optimizer.analyze_league_balance(ages, offsets, names)
+
+    assert [row['rank'] for row in ranking] == [1, 2, 3]
+    assert ranking[0]['squad'] == 'Balanced United'
+    scores = [row['overall_balance'] for row in ranking]
+    assert scores == sorted(scores, reverse=True)
+
+    for row in ranking:
+        single = optimizer.analyze_squad_balance(squads[row['squad']])
+        assert row['overall_balance'] == single['balance_scores']['overall_balance']
+        assert row['age_distribution'] == single['age_analysis']['current']
+        assert row['phase_gaps'] == single['phase_analysis']['gaps']
+        assert row['recommendations'] == single['recommendations']
+
+def test_incremental_state_tracks_full_analysis():
+    optimizer = TeamBalanceOptimizer()
+    squad = {str(i): {'id': str(i), 'age': age}
+             for i, age in enumerate([18, 20, 22, 24, 25, 27, 28, 29, 31, 33])}
+    state = SquadBalanceState(optimizer, list(squad.values()))
+    assert state.analysis() == optimizer.analyze_squad_balance(list(squad.values()))
+
+    delta = state.add_player({'id': '99', 'age': 23})
+    squad['99'] = {'id': '99', 'age': 23}
+    assert delta['action'] == 'add'
+    assert delta['changes']['squad_metrics']['total_players'] == 11
+    assert 'ideal' not in delta['changes']['age_analysis'], "Unchanged values are left out"
+    assert state.analysis() == optimizer.analyze_squad_balance(list(squad.values()))
+
+    state.remove_player('0')
+    del squad['0']
+    assert state.analysis() == optimizer.analyze_squad_balance(list(squad.values()))
+
+    # Re-adding an existing id replaces the player instead of double counting
+    state.add_player({'id': '1', 'age': 35})
+    squad['1'] = {'id': '1', 'age': 35}
+    assert state.analysis() == optimizer.analyze_squad_balance(list(squad.values()))
+
+    # Players sharing a name are still counted separately; players without an id are rejected
+    state.add_player({'id': '100', 'name': 'Silva', 'age': 26})
+    state.add_player({'id': '101', 'name': 'Silva', 'age': 30})
+    assert state.analysis()['squad_metrics']['total_players'] == len(squad) + 2
+    for player in ({'name': 'Nobody', 'age': 22}, {'id': None, 'age': 22}, {'id': '', 'age': 22}):
+        with pytest.raises(ValueError):
+            state.add_player(player)
+    assert state.analysis()['squad_metrics']['total_players'] == len(squad) + 2
+
+def test_aging_simulation_matches_aged_squads():
+    optimizer = TeamBalanceOptimizer()
+    squads = {
+        'Young': [{'age': a, 'market_value': '€2.00m'} for a in [17, 18, 19, 20, 21, 22, 23, 24, 25, 26]],
+        'Old': [{'age': a, 'market_value': '€5.00m'} for a in [27, 28, 29, 30, 31, 32, 33]]
+    }
+    names, ages, offsets = optimizer.pack_squads(squads)
+    values, peaks = optimizer.pack_squad_values(squads)
+    trajectories = optimizer.simulate_aging(ages, offsets, seasons=4, values=values,
+                                            peak_values=peaks, squad_names=names)
+
+    for row in trajectories:
+        assert row['seasons'] == [0, 1, 2, 3, 4]
+        for season in row['seasons']:
+            aged = [{'age': p['age'] + season} for p in squads[row['squad']]]
+            single = optimizer.analyze_squad_balance(aged)
+            assert row['overall_balance'][season] == single['balance_scores']['overall_balance']
+            assert row['average_age'][season] == single['squad_metrics']['average_age']
+            assert row['phase_distribution']['twilight'][season] == single['phase_analysis']['current']['twilight']
+
+    # Everyone in 'Old' is at or past the peak age of 27: season 0 is today's value,
+    # then each player loses 15% a season
+    old = trajectories[1]['squad_value']
+    assert abs(old[0] - 7 * 5e6) < 1e-3
+    assert abs(old[1] - 7 * 5e6 * 0.85) < 1e-3
+
+    # Pre-peak players still compound from their current value towards a given peak
+    young = optimizer.simulate_aging([25], [0, 1], seasons=3, values=np.array([4e6]),
+                                     peak_values=np.array([9e6]))[0]['squad_value']
+    np.testing.assert_allclose(young, [4e6, 6e6, 9e6, 9e6 * 0.85])
+
+    for seasons in (0, -1, MAX_SEASONS + 1):
+        with pytest.raises(ValueError):
+            optimizer.simulate_aging(ages, offsets, seasons=seasons)
+
 if __name__ == "__main__":
-    test_team_balance() 
\ No newline at end of file
+    test_team_balance()
+    test_kernel_matches_pandas_implementation()
+    test_league_batch_matches_single_squad_analysis()
+    test_incremental_state_tracks_full_analysis()
+    test_aging_simulation_matches_aged_squads()
\ No newline at end of file